@@ -40,6 +40,8 @@ class ParamType(IntEnum):
 
     VALIDATE_TRANSACTION = 600
 
+    GET_STATE_PROOF = 700
+
 
 class ValueType(IntEnum):
     IGNORE = 0
@@ -103,6 +105,8 @@ class ConstantKeys:
 
     FILTER = "filter"
 
+    KEY = "key"
+
     ICX_CALL = "icx_call"
     ICX_GET_BALANCE = "icx_getBalance"
     ICX_GET_TOTAL_SUPPLY = "icx_getTotalSupply"
@@ -220,3 +224,8 @@ type_convert_templates[ParamType.VALIDATE_TRANSACTION] = {
     ConstantKeys.METHOD: ValueType.STRING,
     ConstantKeys.PARAMS: type_convert_templates[ParamType.TRANSACTION_PARAMS_DATA]
 }
+
+type_convert_templates[ParamType.GET_STATE_PROOF] = {
+    ConstantKeys.ADDRESS: ValueType.ADDRESS,
+    ConstantKeys.KEY: ValueType.BYTES
+}
@@ -94,6 +94,63 @@ class StepCosts:
             yield (step_type, self._step_costs[step_type])
 
 
+class AddressList:
+    """
+    DB for address lists such as SCORE blacklist.
+    It is combined ArrayDB and DictDB in order to check membership without iterating the list.
+    The DictDB keeps index + 1 of each address in the ArrayDB.
+    """
+    _INDEX_POSTFIX = '_index'
+
+    def __init__(self, var_key: str, db: IconScoreDatabase):
+        self._addresses = ArrayDB(var_key, db, value_type=Address)
+        self._indexes = DictDB(var_key + self._INDEX_POSTFIX, db, value_type=int)
+
+    def put(self, address: Address):
+        self._addresses.put(address)
+        self._indexes[address] = len(self._addresses)
+
+    def remove(self, address: Address):
+        index = self._get_index(address)
+        if index < 0:
+            return
+
+        # move the topmost value to the place of the removed one
+        top = self._addresses.pop()
+        del self._indexes[address]
+        if top != address:
+            self._addresses[index] = top
+            self._indexes[top] = index + 1
+
+    def migrate(self):
+        """
+        Builds the indexes of the addresses which were put without them
+        """
+        for i, address in enumerate(self._addresses):
+            if self._indexes[address] != i + 1:
+                self._indexes[address] = i + 1
+
+    def _get_index(self, address: Address) -> int:
+        # the address of a stale index can be different,
+        # when the list has been changed by the previous version without indexes
+        index = self._indexes[address] - 1
+        if 0 <= index < len(self._addresses) and self._addresses[index] == address:
+            return index
+        return -1
+
+    def __contains__(self, address: Address):
+        return self._get_index(address) >= 0
+
+    def __iter__(self):
+        return self._addresses.__iter__()
+
+    def __len__(self):
+        return self._addresses.__len__()
+
+    def __getitem__(self, index: int):
+        return self._addresses[index]
+
+
 class Governance(IconScoreBase):
 
     _SCORE_STATUS = 'score_status'
@@ -122,9 +179,9 @@ class Governance(IconScoreBase):
     def __init__(self, db: IconScoreDatabase) -> None:
         super().__init__(db)
         self._score_status = DictDB(self._SCORE_STATUS, db, value_type=bytes, depth=3)
-        self._auditor_list = ArrayDB(self._AUDITOR_LIST, db, value_type=Address)
-        self._deployer_list = ArrayDB(self._DEPLOYER_LIST, db, value_type=Address)
-        self._score_black_list = ArrayDB(self._SCORE_BLACK_LIST, db, value_type=Address)
+        self._auditor_list = AddressList(self._AUDITOR_LIST, db)
+        self._deployer_list = AddressList(self._DEPLOYER_LIST, db)
+        self._score_black_list = AddressList(self._SCORE_BLACK_LIST, db)
         self._step_price = VarDB(self._STEP_PRICE, db, value_type=int)
         self._step_costs = StepCosts(db)
         self._max_step_limits = DictDB(self._MAX_STEP_LIMITS, db, value_type=int)
@@ -156,6 +213,11 @@ class Governance(IconScoreBase):
                 if step_type in self._step_costs:
                     self._step_costs._step_types.put(step_type)
 
+        # migrates from old DB of address lists without indexes.
+        self._auditor_list.migrate()
+        self._deployer_list.migrate()
+        self._score_black_list.migrate()
+
     def _get_current_status(self, score_address: Address):
         return self._score_status[score_address][CURRENT]
 
@@ -166,8 +228,8 @@ class Governance(IconScoreBase):
     def _fill_status_with_str(db: DictDB):
         count = 0
         status = {}
-        for key in VALID_STATUS_KEYS:
-            value: bytes = db[key]
+        values: list = db.get_many(VALID_STATUS_KEYS)
+        for key, value in zip(VALID_STATUS_KEYS, values):
             if value:
                 if key == STATUS:
                     status[key] = value.decode()
@@ -324,12 +386,7 @@ class Governance(IconScoreBase):
         if self.msg.sender != self.owner:
             if self.msg.sender != address:
                 self.revert('Invalid sender: not yourself')
-        # get the topmost value
-        top = self._auditor_list.pop()
-        if top != address:
-            for i in range(len(self._auditor_list)):
-                if self._auditor_list[i] == address:
-                    self._auditor_list[i] = top
+        self._auditor_list.remove(address)
         if DEBUG is True:
             self._print_auditor_list('removeAuditor')
 
@@ -356,12 +413,7 @@ class Governance(IconScoreBase):
         if self.msg.sender != self.owner:
             if self.msg.sender != address:
                 self.revert('Invalid sender: not yourself')
-        # get the topmost value
-        top = self._deployer_list.pop()
-        if top != address:
-            for i in range(len(self._deployer_list)):
-                if self._deployer_list[i] == address:
-                    self._deployer_list[i] = top
+        self._deployer_list.remove(address)
         if DEBUG is True:
             self._print_deployer_list('removeDeployer')
 
@@ -370,6 +422,12 @@ class Governance(IconScoreBase):
         Logger.debug(f'isDeployer address: {address}', TAG)
         return address in self._deployer_list
 
+    @property
+    def deployers(self) -> frozenset:
+        """All the deployers at once for the governance snapshot of iconservice
+        """
+        return frozenset(self._deployer_list)
+
     def _print_deployer_list(self, header: str):
         Logger.debug(f'{header}: list len = {len(self._deployer_list)}', TAG)
         for deployer in self._deployer_list:
@@ -396,12 +454,7 @@ class Governance(IconScoreBase):
         # check message sender, only owner can remove from blacklist
         if self.msg.sender != self.owner:
             self.revert('Invalid sender: not owner')
-        # get the topmost value
-        top = self._score_black_list.pop()
-        if top != address:
-            for i in range(len(self._score_black_list)):
-                if self._score_black_list[i] == address:
-                    self._score_black_list[i] = top
+        self._score_black_list.remove(address)
         if DEBUG is True:
             self._print_black_list('removeScoreFromBlackList')
 
@@ -410,6 +463,12 @@ class Governance(IconScoreBase):
         Logger.debug(f'isInBlackList address: {address}', TAG)
         return address in self._score_black_list
 
+    @property
+    def score_black_list(self) -> frozenset:
+        """All the SCOREs in the blacklist at once for the governance snapshot of iconservice
+        """
+        return frozenset(self._score_black_list)
+
     def _print_black_list(self, header: str):
         Logger.debug(f'{header}: list len = {len(self._score_black_list)}', TAG)
         for addr in self._score_black_list:
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Storage backends of KeyValueDatabase
+
+Every backend provides the subset of plyvel.DB interface used by KeyValueDatabase:
+get, put, delete, write_batch, iterator, snapshot, prefixed_db,
+compact_range, get_property and close.
+So plyvel.DB itself is the LevelDB backend.
+"""
+
+import os
+import sqlite3
+from bisect import bisect_left
+from threading import Lock
+from typing import Optional, Iterator, Tuple, List
+
+import plyvel
+
+from ..base.exception import DatabaseException
+from ..icon_constant import ConfigKey
+
+
+class BackendType(object):
+    LEVELDB = 'leveldb'
+    MEMORY = 'memory'
+    SQLITE = 'sqlite'
+
+
+# LevelDB config key -> plyvel.DB option name
+_LEVEL_DB_OPTION_NAMES = {
+    ConfigKey.LEVEL_DB_BLOCK_CACHE_SIZE: 'lru_cache_size',
+    ConfigKey.LEVEL_DB_WRITE_BUFFER_SIZE: 'write_buffer_size',
+    ConfigKey.LEVEL_DB_BLOOM_FILTER_BITS: 'bloom_filter_bits',
+    ConfigKey.LEVEL_DB_MAX_OPEN_FILES: 'max_open_files',
+    ConfigKey.LEVEL_DB_COMPRESSION: 'compression'
+}
+
+
+def make_level_db_options(conf: Optional[dict]) -> dict:
+    """Converts LevelDB config to the options of plyvel.DB
+
+    An absent or None value is left to the default of LevelDB.
+
+    :param conf: LevelDB config
+    :return: plyvel.DB options
+    """
+    options = {}
+    if not conf:
+        return options
+
+    for key, value in conf.items():
+        if key not in _LEVEL_DB_OPTION_NAMES:
+            raise DatabaseException(f'Unknown LevelDB option: {key}')
+        if value is None:
+            continue
+
+        if key == ConfigKey.LEVEL_DB_COMPRESSION:
+            # plyvel takes None to disable compression
+            if value not in ('snappy', 'none'):
+                raise DatabaseException(f'Invalid LevelDB compression: {value}')
+            value = None if value == 'none' else value
+        elif not isinstance(value, int) or value < 0:
+            raise DatabaseException(f'Invalid LevelDB option: {key}={value}')
+
+        options[_LEVEL_DB_OPTION_NAMES[key]] = value
+
+    return options
+
+
+def open_backend(path: str,
+                 backend_type: str = BackendType.LEVELDB,
+                 create_if_missing: bool = True,
+                 options: Optional[dict] = None):
+    """Opens a storage backend
+
+    :param path: db path. ignored by the memory backend
+    :param backend_type: one of BackendType
+    :param create_if_missing:
+    :param options: plyvel.DB options. used only by the LevelDB backend
+    :return: plyvel.DB compatible instance
+    """
+    if backend_type == BackendType.LEVELDB:
+        return plyvel.DB(path, create_if_missing=create_if_missing, **(options or {}))
+    elif backend_type == BackendType.MEMORY:
+        return MemoryBackend()
+    elif backend_type == BackendType.SQLITE:
+        return SqliteBackend(path, create_if_missing)
+
+    raise DatabaseException(f'Unknown db backend: {backend_type}')
+
+
+def get_prefix_end(prefix: bytes) -> Optional[bytes]:
+    """Returns the smallest key which is greater than all keys starting with prefix
+
+    :param prefix:
+    :return: None if there is no such key
+    """
+    prefix = prefix.rstrip(b'\xff')
+    if len(prefix) == 0:
+        return None
+
+    return prefix[:-1] + bytes([prefix[-1] + 1])
+
+
+def _get_items_in_range(items: List[Tuple[bytes, bytes]],
+                        start: Optional[bytes],
+                        stop: Optional[bytes],
+                        reverse: bool) -> List[Tuple[bytes, bytes]]:
+    """Returns the items in [start, stop) from the items sorted by key
+    """
+    begin = 0 if start is None else bisect_left(items, (start,))
+    end = len(items) if stop is None else bisect_left(items, (stop,))
+
+    items = items[begin:end]
+    if reverse:
+        items.reverse()
+    return items
+
+
+class _WriteBatch(object):
+    """Collects the changes and applies them to a backend at once on exit
+    """
+
+    def __init__(self, db, prefix: bytes = b'') -> None:
+        self._db = db
+        self._prefix = prefix
+        self._states = {}
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self._states[self._prefix + key] = value
+
+    def delete(self, key: bytes) -> None:
+        self._states[self._prefix + key] = None
+
+    def clear(self) -> None:
+        self._states.clear()
+
+    def write(self) -> None:
+        self._db.apply(self._states)
+        self._states = {}
+
+    def __enter__(self) -> '_WriteBatch':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.write()
+
+
+class _PrefixedDB(object):
+    """Prefixed view of a backend which does not support it natively
+    """
+
+    def __init__(self, db, prefix: bytes) -> None:
+        self._db = db
+        self._prefix = prefix
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        return self._db.get(self._prefix + key, default)
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self._db.put(self._prefix + key, value)
+
+    def delete(self, key: bytes) -> None:
+        self._db.delete(self._prefix + key)
+
+    def write_batch(self) -> '_WriteBatch':
+        return _WriteBatch(self._db, self._prefix)
+
+    def iterator(self,
+                 start: Optional[bytes] = None,
+                 stop: Optional[bytes] = None,
+                 reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        prefix = self._prefix
+        prefix_size = len(prefix)
+
+        start = prefix if start is None else prefix + start
+        stop = get_prefix_end(prefix) if stop is None else prefix + stop
+
+        items = self._db.iterator(start=start, stop=stop, reverse=reverse)
+        return ((key[prefix_size:], value) for key, value in items)
+
+    def snapshot(self):
+        raise DatabaseException('snapshot is not supported on prefixed db')
+
+    def prefixed_db(self, prefix: bytes) -> '_PrefixedDB':
+        return _PrefixedDB(self._db, self._prefix + prefix)
+
+    def close(self) -> None:
+        pass
+
+
+class _MemorySnapshot(object):
+    def __init__(self, data: dict) -> None:
+        self._data = data
+        self._items: Optional[List[Tuple[bytes, bytes]]] = None
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        return self._data.get(key, default)
+
+    def iterator(self,
+                 start: Optional[bytes] = None,
+                 stop: Optional[bytes] = None,
+                 reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        if self._items is None:
+            self._items = sorted(self._data.items())
+        return iter(_get_items_in_range(self._items, start, stop, reverse))
+
+    def release(self) -> None:
+        pass
+
+
+class MemoryBackend(object):
+    """Backend which keeps all states in memory
+
+    A snapshot shares the states with the backend until the next write (copy-on-write)
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._data = {}
+        # The snapshot sharing self._data. It is reused until the next write
+        self._snapshot: Optional['_MemorySnapshot'] = None
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        return self._data.get(key, default)
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self.apply({key: value})
+
+    def delete(self, key: bytes) -> None:
+        self.apply({key: None})
+
+    def write_batch(self) -> '_WriteBatch':
+        return _WriteBatch(self)
+
+    def apply(self, states: dict) -> None:
+        """Applies the changes at once
+
+        :param states: key/value pairs. None value means deletion
+        """
+        with self._lock:
+            # Readers may hold the current dict through a snapshot or an iterator
+            data = self._data if self._snapshot is None else dict(self._data)
+
+            for key, value in states.items():
+                if value is None:
+                    data.pop(key, None)
+                else:
+                    data[key] = value
+
+            self._data = data
+            self._snapshot = None
+
+    def iterator(self,
+                 start: Optional[bytes] = None,
+                 stop: Optional[bytes] = None,
+                 reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        return self.snapshot().iterator(start, stop, reverse)
+
+    def snapshot(self) -> '_MemorySnapshot':
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = _MemorySnapshot(self._data)
+            return self._snapshot
+
+    def prefixed_db(self, prefix: bytes) -> '_PrefixedDB':
+        return _PrefixedDB(self, prefix)
+
+    def compact_range(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> None:
+        pass
+
+    def get_property(self, name: bytes) -> Optional[bytes]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class _SqliteSnapshot(object):
+    """Read transaction on its own connection
+
+    In WAL mode, it keeps reading the states at the moment when it started.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.execute('BEGIN')
+        # The read transaction starts with the first read
+        self._conn.execute('SELECT count(*) FROM kv WHERE key = x\'\'').fetchall()
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM kv WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def iterator(self,
+                 start: Optional[bytes] = None,
+                 stop: Optional[bytes] = None,
+                 reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        with self._lock:
+            return SqliteBackend.select_range(self._conn, start, stop, reverse)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __del__(self):
+        self.release()
+
+
+class SqliteBackend(object):
+    """Backend which stores the states in a SQLite database file
+    """
+
+    _FILE_NAME = 'state.sqlite3'
+
+    def __init__(self, path: str, create_if_missing: bool = True) -> None:
+        if not os.path.isdir(path):
+            if not create_if_missing:
+                raise DatabaseException(f'Database not found: {path}')
+            os.makedirs(path)
+
+        self._path = os.path.join(path, self._FILE_NAME)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS kv (key BLOB PRIMARY KEY, value BLOB) WITHOUT ROWID')
+
+    def get(self, key: bytes, default: Optional[bytes] = None) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM kv WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def put(self, key: bytes, value: bytes) -> None:
+        self.apply({key: value})
+
+    def delete(self, key: bytes) -> None:
+        self.apply({key: None})
+
+    def write_batch(self) -> '_WriteBatch':
+        return _WriteBatch(self)
+
+    def apply(self, states: dict) -> None:
+        """Applies the changes in a transaction
+
+        :param states: key/value pairs. None value means deletion
+        """
+        puts = [(key, value) for key, value in states.items() if value is not None]
+        deletes = [(key,) for key, value in states.items() if value is None]
+
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN')
+            try:
+                conn.executemany('INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)', puts)
+                conn.executemany('DELETE FROM kv WHERE key = ?', deletes)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def iterator(self,
+                 start: Optional[bytes] = None,
+                 stop: Optional[bytes] = None,
+                 reverse: bool = False) -> Iterator[Tuple[bytes, bytes]]:
+        with self._lock:
+            return self.select_range(self._conn, start, stop, reverse)
+
+    def snapshot(self) -> '_SqliteSnapshot':
+        return _SqliteSnapshot(self._path)
+
+    def prefixed_db(self, prefix: bytes) -> '_PrefixedDB':
+        return _PrefixedDB(self, prefix)
+
+    def compact_range(self, start: Optional[bytes] = None, stop: Optional[bytes] = None) -> None:
+        """SQLite has no range compaction. The WAL file is merged into the db file instead
+        """
+        with self._lock:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def get_property(self, name: bytes) -> Optional[bytes]:
+        return None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def select_range(conn: 'sqlite3.Connection',
+                     start: Optional[bytes],
+                     stop: Optional[bytes],
+                     reverse: bool) -> Iterator[Tuple[bytes, bytes]]:
+        """Reads the items in [start, stop) at once
+
+        BLOBs are compared with memcmp() in SQLite, so the order is the same as LevelDB
+        """
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append('key >= ?')
+            params.append(start)
+        if stop is not None:
+            conditions.append('key < ?')
+            params.append(stop)
+
+        sql = 'SELECT key, value FROM kv'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY key DESC' if reverse else ' ORDER BY key'
+
+        return iter([(bytes(key), bytes(value)) for key, value in conn.execute(sql, params)])
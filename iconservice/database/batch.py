@@ -27,15 +27,27 @@ if TYPE_CHECKING:
 
 
 def digest(ordered_dict: OrderedDict):
+    """Returns sha3_256(b'|'.join(key0, value0, key1, value1, ...)) without the joined bytes
+
+    The items are fed to the hash one by one,
+    so that the states of a block are not copied into one giant bytes object.
+    A value of None is skipped.
+    """
     # items in data MUST be byte-like objects
-    data = []
+    h = hashlib.sha3_256()
+    update = h.update
+    separator = b''
 
     for key, value in ordered_dict.items():
-        data.append(key)
+        update(separator)
+        update(key)
+        separator = b'|'
+
         if value is not None:
-            data.append(value)
+            update(separator)
+            update(value)
 
-    return hashlib.sha3_256(b'|'.join(data)).digest()
+    return h.digest()
 
 
 class Batch(OrderedDict):
@@ -63,78 +75,119 @@ class Batch(OrderedDict):
 class TransactionBatch(MutableMapping):
     """Contains the states changed by a transaction.
 
+    All states are kept in one OrderedDict whatever the depth of inter-SCORE calls.
+    The previous values overwritten in a call are recorded in an undo journal,
+    so that reading a state is O(1) and reverting a call is O(the number of its writes).
+
     key: Score Address
     value: IconScoreBatch
     """
-    def __init__(self, tx_hash: Optional[bytes]=None) -> None:
+    # Marks a key which did not exist before it was written in the journal
+    _ABSENT = object()
+
+    def __init__(self, tx_hash: Optional[bytes]=None, track_reads: bool=False) -> None:
         """Constructor
 
         :param tx_hash: tx_hash
+        :param track_reads: if True, the keys and the key ranges read by the tx are recorded
         """
         super().__init__()
         self.hash = tx_hash
-        self._call_batches = [OrderedDict()]
+        self._states = OrderedDict()
+        # (key, previous value) written in the calls
+        self._journal = []
+        # The journal position where each call starts
+        self._call_starts = []
+        # Recorded by ContextDatabase for a speculative execution. None if not tracked
+        self.read_keys: Optional[set] = set() if track_reads else None
+        # [start, stop) of the iterations
+        self.read_ranges: Optional[list] = [] if track_reads else None
 
     def __getitem__(self, item):
-        for call_batch in reversed(self._call_batches):
-            if item in call_batch:
-                return call_batch[item]
-
-        return None
+        return self._states.get(item)
 
     def __setitem__(self, key, value):
-        call_batch: OrderedDict = self._call_batches[-1]
-        call_batch[key] = value
+        states = self._states
+
+        if self._call_starts:
+            self._journal.append((key, states.get(key, self._ABSENT)))
+        states[key] = value
 
     def __delitem__(self, key):
         raise ServerErrorException('To delete item is not allowed')
 
     def __contains__(self, item):
-        for call_batch in self._call_batches:
-            if item in call_batch:
-                return True
-
-        return False
+        return item in self._states
 
     def __iter__(self):
-        for call_batch in self._call_batches:
-            for key in call_batch:
-                yield key
+        return iter(self._states)
 
     def __len__(self):
-        length = 0
-
-        for call_batch in self._call_batches:
-            length += len(call_batch)
-
-        return length
+        return len(self._states)
 
     def enter_call(self):
-        self._call_batches.append(OrderedDict())
+        self._call_starts.append(len(self._journal))
 
     def revert_call(self):
-        call_batch: OrderedDict = self._call_batches[-1]
-        call_batch.clear()
+        """Restores the states which were there when the current call started
 
-    def leave_call(self):
-        call_batch: OrderedDict = self._call_batches.pop()
+        The position of a restored key is kept
+        and a key added in the call is removed, as if the call has never written it.
+        """
+        states = self._states
+
+        if not self._call_starts:
+            states.clear()
+            return
+
+        journal = self._journal
+        start: int = self._call_starts[-1]
+        for key, value in reversed(journal[start:]):
+            if value is self._ABSENT:
+                del states[key]
+            else:
+                states[key] = value
+        del journal[start:]
 
-        if call_batch:
-            self._call_batches[-1].update(call_batch)
+    def leave_call(self):
+        # The journal of the call is taken over by its caller
+        self._call_starts.pop()
+        if not self._call_starts:
+            self._journal.clear()
 
     def digest(self) -> bytes:
-        if len(self._call_batches) != 1:
-            raise ServerErrorException(f'Wrong call_batch count: {len(self._call_batches)}')
+        if self._call_starts:
+            raise ServerErrorException(f'Wrong call_batch count: {self.call_count}')
 
-        return digest(self._call_batches[0])
+        return digest(self._states)
 
     @property
     def call_count(self) -> int:
-        return len(self._call_batches)
+        return len(self._call_starts) + 1
+
+    def has_read_any(self, keys: set) -> bool:
+        """Returns True if the tx has read any of given keys
+
+        It is only available with track_reads
+
+        :param keys: keys written by other txs
+        """
+        if not self.read_keys.isdisjoint(keys):
+            return True
+
+        for start, stop in self.read_ranges:
+            for key in keys:
+                if (start is None or key >= start) and (stop is None or key < stop):
+                    return True
+
+        return False
 
     def clear(self):
+        # The reads are kept, as a failed tx still depends on what it has read
         self.hash = None
-        self._call_batches = [OrderedDict()]
+        self._states = OrderedDict()
+        self._journal = []
+        self._call_starts = []
 
 
 class BlockBatch(Batch):
@@ -143,14 +196,19 @@ class BlockBatch(Batch):
     key: Address
     value: IconScoreBatch
     """
-    def __init__(self, block: Optional['Block'] = None):
+    def __init__(self, block: Optional['Block'] = None, parent: Optional['BlockBatch'] = None):
         """Constructor
 
         :param block: block info
+        :param parent: BlockBatch of the parent block which has not been committed yet
         """
         super().__init__()
         self.block = block
+        # The states of the uncommitted ancestors are read through it.
+        # It is cut off once the parent block is committed
+        self.parent = parent
 
     def clear(self) -> None:
         self.block = None
+        self.parent = None
         super().clear()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+
+
+class LRUCache(object):
+    """Size-bounded read cache for the committed states in StateDB
+
+    Both present and absent keys are cached. An absent key is cached with None.
+    Every update increases the cache version so that a value read from StateDB
+    before the update is not put into the cache after the update.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Constructor
+
+        :param max_size: the max number of items to keep
+        """
+        self._lock = Lock()
+        self._items = OrderedDict()
+        self._max_size: int = max_size
+        self._version: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    @property
+    def hits(self) -> int:
+        with self._lock:
+            return self._hits
+
+    @property
+    def misses(self) -> int:
+        with self._lock:
+            return self._misses
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def get(self, key: bytes, version: Optional[int]=None) -> Tuple[bool, Optional[bytes]]:
+        """Returns a cached value for a given key
+
+        :param key:
+        :param version: if given, a miss is returned when the cache has been updated since it
+        :return: (hit, value)
+        """
+        with self._lock:
+            if key in self._items and (version is None or version == self._version):
+                self._items.move_to_end(key)
+                self._hits += 1
+                return True, self._items[key]
+
+            self._misses += 1
+            return False, None
+
+    def put(self, key: bytes, value: Optional[bytes], version: int) -> bool:
+        """Puts a value read from StateDB into the cache
+
+        The value is ignored if the cache has been updated since it was read.
+
+        :param key:
+        :param value: value read from StateDB. None means that the key is absent
+        :param version: cache version taken before reading the value from StateDB
+        :return: True if the value is cached
+        """
+        with self._lock:
+            if version != self._version:
+                return False
+
+            self._put(key, value)
+            return True
+
+    def update(self, states: dict) -> None:
+        """Applies the states which have just been written to StateDB
+
+        :param states: key/value pairs. None or empty value means deletion
+        """
+        with self._lock:
+            for key, value in states.items():
+                self._put(key, value if value else None)
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._version += 1
+
+    def _put(self, key: bytes, value: Optional[bytes]) -> None:
+        items = self._items
+
+        if key in items:
+            items.move_to_end(key)
+        items[key] = value
+
+        while len(items) > self._max_size:
+            items.popitem(last=False)
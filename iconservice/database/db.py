@@ -14,12 +14,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import TYPE_CHECKING, Optional
-
-import plyvel
+from concurrent.futures import Executor, Future
+from typing import TYPE_CHECKING, Optional, Iterator, Tuple, List, Iterable
 
 from iconcommons.logger import Logger
 from iconservice.base.exception import DatabaseException
+from iconservice.database.backend import BackendType, open_backend, get_prefix_end
+from iconservice.database.cache import LRUCache
 from iconservice.icon_constant import ICON_DB_LOG_TAG
 from iconservice.iconscore.icon_score_context import ContextGetter
 from iconservice.iconscore.icon_score_context import IconScoreContextType
@@ -27,6 +28,7 @@ from iconservice.iconscore.icon_score_context import IconScoreContextType
 if TYPE_CHECKING:
     from iconservice.iconscore.icon_score_context import IconScoreContext
     from iconservice.base.address import Address
+    from iconservice.database.batch import BlockBatch
 
 
 def _get_context_type(context: 'IconScoreContext') -> 'IconScoreContextType':
@@ -48,23 +50,107 @@ def _is_db_writable_on_context(context: 'IconScoreContext'):
         return not context.readonly
 
 
+def _get_range(prefix: Optional[bytes],
+               start: Optional[bytes],
+               stop: Optional[bytes]) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """Converts prefix, start and stop to a key range [start, stop)
+
+    plyvel does not allow prefix to be used with start or stop
+
+    :param prefix: only the keys starting with prefix are in the range
+    :param start: the first key of the range (inclusive)
+    :param stop: the last key of the range (exclusive)
+    :return: (start, stop)
+    """
+    if not prefix:
+        return start, stop
+
+    if start is None or start < prefix:
+        start = prefix
+
+    prefix_end = get_prefix_end(prefix)
+    if prefix_end is not None and (stop is None or stop > prefix_end):
+        stop = prefix_end
+
+    return start, stop
+
+
+def _is_in_range(key: bytes, start: Optional[bytes], stop: Optional[bytes]) -> bool:
+    return (start is None or key >= start) and (stop is None or key < stop)
+
+
+def _merge_items(items: Iterator[Tuple[bytes, bytes]],
+                 overlay: dict,
+                 reverse: bool) -> Iterator[Tuple[bytes, bytes]]:
+    """Merges the states in overlay on top of the ordered items from StateDB
+
+    A key whose value is None or empty in overlay is regarded as deleted
+
+    :param items: (key, value) pairs ordered by key
+    :param overlay: states which are not written to StateDB yet
+    :param reverse: True if items are in descending order
+    :return: (key, value) pairs ordered by key
+    """
+    keys = sorted(overlay, reverse=reverse)
+    i = 0
+
+    for key, value in items:
+        while i < len(keys) and (keys[i] > key if reverse else keys[i] < key):
+            overlay_key = keys[i]
+            i += 1
+            if overlay[overlay_key]:
+                yield overlay_key, overlay[overlay_key]
+
+        if i < len(keys) and keys[i] == key:
+            i += 1
+            value = overlay[key]
+            if not value:
+                continue
+
+        yield key, value
+
+    for overlay_key in keys[i:]:
+        if overlay[overlay_key]:
+            yield overlay_key, overlay[overlay_key]
+
+
+def _get_from_block_batches(block_batch: 'BlockBatch', key: bytes) -> Tuple[bool, Optional[bytes]]:
+    """Looks up a key in BlockBatch and then in the BlockBatches of its uncommitted ancestors
+
+    :param block_batch:
+    :param key:
+    :return: (found, value)
+    """
+    batch = block_batch
+    while batch is not None:
+        if key in batch:
+            return True, batch[key]
+        batch = batch.parent
+
+    return False, None
+
+
 class KeyValueDatabase(object):
     @staticmethod
     def from_path(path: str,
-                  create_if_missing: bool=True) -> 'KeyValueDatabase':
+                  create_if_missing: bool=True,
+                  backend: str=BackendType.LEVELDB,
+                  options: Optional[dict]=None) -> 'KeyValueDatabase':
         """
 
         :param path: db path
         :param create_if_missing:
+        :param backend: storage backend type
+        :param options: plyvel.DB options for the LevelDB backend
         :return: KeyValueDatabase instance
         """
-        db = plyvel.DB(path, create_if_missing=create_if_missing)
+        db = open_backend(path, backend, create_if_missing, options)
         return KeyValueDatabase(db)
 
-    def __init__(self, db: plyvel.DB) -> None:
+    def __init__(self, db) -> None:
         """Constructor
 
-        :param db: plyvel db instance
+        :param db: plyvel db instance or a backend compatible with it
         """
         self._db = db
 
@@ -76,6 +162,16 @@ class KeyValueDatabase(object):
         """
         return self._db.get(key)
 
+    def get_many(self, keys: Iterable[bytes]) -> dict:
+        """Get the values for the specified keys.
+
+        The keys are looked up in sorted order for better locality in LevelDB
+
+        :param keys: keys to retrieve
+        :return: key/value pairs. the value of an absent key is None
+        """
+        return {key: self._db.get(key) for key in sorted(set(keys))}
+
     def put(self, key: bytes, value: bytes) -> None:
         """Set a value for the specified key.
 
@@ -98,6 +194,22 @@ class KeyValueDatabase(object):
             self._db.close()
             self._db = None
 
+    def compact_range(self, start: Optional[bytes]=None, stop: Optional[bytes]=None) -> None:
+        """Compacts the underlying storage for the key range
+
+        :param start: the first key of the range (inclusive). None means the first key in db
+        :param stop: the last key of the range (exclusive). None means the last key in db
+        """
+        self._db.compact_range(start=start, stop=stop)
+
+    def get_property(self, name: bytes) -> Optional[bytes]:
+        """Returns an internal property of the underlying storage
+
+        :param name: property name. ex) b'leveldb.stats'
+        :return: None if the backend does not support it
+        """
+        return self._db.get_property(name)
+
     def get_sub_db(self, prefix: bytes) -> 'KeyValueDatabase':
         """Return a new prefixed database.
 
@@ -108,6 +220,40 @@ class KeyValueDatabase(object):
     def iterator(self) -> iter:
         return self._db.iterator()
 
+    def iterate(self,
+                prefix: Optional[bytes]=None,
+                start: Optional[bytes]=None,
+                stop: Optional[bytes]=None,
+                reverse: bool=False) -> Iterator[Tuple[bytes, bytes]]:
+        """Returns the key/value pairs in the order of keys
+
+        :param prefix: only the keys starting with prefix are returned
+        :param start: the first key to return (inclusive)
+        :param stop: the last key to return (exclusive)
+        :param reverse: if True, returns the pairs in descending order
+        :return: iterator of (key, value)
+        """
+        start, stop = _get_range(prefix, start, stop)
+        return self._db.iterator(start=start, stop=stop, reverse=reverse)
+
+    def get_snapshot(self, overlay: Optional[dict]=None) -> 'KeyValueDatabaseSnapshot':
+        """Returns a read-only view of the database at this moment
+
+        :param overlay: states to put on top of the snapshot
+        :return: KeyValueDatabaseSnapshot instance
+        """
+        return KeyValueDatabaseSnapshot(self._db.snapshot(), overlay)
+
+    def get_overlay_view(self, overlay: dict) -> 'KeyValueDatabaseSnapshot':
+        """Returns a read-only view of the database with overlay on top of it
+
+        Unlike get_snapshot(), writes to the database are visible through it.
+
+        :param overlay: states to put on top of the database
+        :return: KeyValueDatabaseSnapshot instance
+        """
+        return KeyValueDatabaseSnapshot(self._db, overlay)
+
     def write_batch(self, states: dict) -> None:
         """Write a batch to the database for the specified states dict.
 
@@ -125,6 +271,64 @@ class KeyValueDatabase(object):
                     wb.delete(key)
 
 
+class KeyValueDatabaseSnapshot(object):
+    """Read-only view of KeyValueDatabase at a certain moment
+
+    Writes to the database after the snapshot is taken are not visible through it.
+    """
+
+    def __init__(self, snapshot, overlay: Optional[dict]=None) -> None:
+        """Constructor
+
+        :param snapshot: snapshot instance of the backend
+        :param overlay: states being written to the database when the snapshot was taken
+        """
+        self._snapshot = snapshot
+        self._overlay = overlay
+        # The version of the read cache when this snapshot was taken
+        self.cache_version: Optional[int] = None
+
+    def get(self, key: bytes) -> bytes:
+        """Get the value for the specified key at the moment of the snapshot.
+
+        :param key: (bytes): key to retrieve
+        :return: value for the specified key, or None if not found
+        """
+        overlay = self._overlay
+        if overlay and key in overlay:
+            return overlay[key] or None
+
+        return self._snapshot.get(key)
+
+    def get_many(self, keys: Iterable[bytes]) -> dict:
+        """Get the values for the specified keys at the moment of the snapshot.
+
+        See KeyValueDatabase.get_many()
+        """
+        return {key: self.get(key) for key in sorted(set(keys))}
+
+    def iterator(self) -> iter:
+        return self._snapshot.iterator()
+
+    def iterate(self,
+                prefix: Optional[bytes]=None,
+                start: Optional[bytes]=None,
+                stop: Optional[bytes]=None,
+                reverse: bool=False) -> Iterator[Tuple[bytes, bytes]]:
+        """Returns the key/value pairs at the moment of the snapshot
+
+        See KeyValueDatabase.iterate()
+        """
+        start, stop = _get_range(prefix, start, stop)
+        items = self._snapshot.iterator(start=start, stop=stop, reverse=reverse)
+
+        if not self._overlay:
+            return items
+
+        overlay = {key: value for key, value in self._overlay.items() if _is_in_range(key, start, stop)}
+        return _merge_items(items, overlay, reverse)
+
+
 class DatabaseObserver(object):
     """ An abstract class of database observer.
     """
@@ -186,14 +390,27 @@ class ContextDatabase(object):
     Cache + LevelDB
     """
 
-    def __init__(self, db: 'KeyValueDatabase', is_shared: bool=False) -> None:
+    def __init__(self,
+                 db: 'KeyValueDatabase',
+                 is_shared: bool=False,
+                 cache: Optional['LRUCache']=None) -> None:
         """Constructor
 
         :param db: KeyValueDatabase instance
+        :param cache: read cache for the committed states in db
         """
         self.key_value_db = db
         # True: this db is shared with all SCOREs
         self._is_shared = is_shared
+        self._cache = cache
+        self._snapshot: Optional['KeyValueDatabaseSnapshot'] = None
+        # States handed to a background writer and not written to db yet
+        self._pending_states: Optional[dict] = None
+        self._pending_write: Optional['Future'] = None
+
+    @property
+    def cache(self) -> Optional['LRUCache']:
+        return self._cache
 
     def get(self, context: Optional['IconScoreContext'], key: bytes) -> bytes:
         """Returns value indicated by key from batch or StateDB
@@ -205,10 +422,69 @@ class ContextDatabase(object):
         context_type = _get_context_type(context)
 
         if context_type in (IconScoreContextType.DIRECT, IconScoreContextType.QUERY):
-            return self.key_value_db.get(key)
+            return self._get_from_state_db(context, key)
         else:
             return self.get_from_batch(context, key)
 
+    def get_many(self, context: Optional['IconScoreContext'], keys: List[bytes]) -> List[bytes]:
+        """Returns the values indicated by keys from batch or StateDB
+
+        :param context:
+        :param keys:
+        :return: values in the order of keys
+        """
+        context_type = _get_context_type(context)
+
+        if context_type in (IconScoreContextType.DIRECT, IconScoreContextType.QUERY):
+            states = self.get_many_from_state_db(context, keys)
+            return [states[key] for key in keys]
+        else:
+            return self.get_many_from_batch(context, keys)
+
+    def get_many_from_batch(self,
+                            context: 'IconScoreContext',
+                            keys: List[bytes]) -> List[bytes]:
+        """Returns the values for given keys
+
+        The keys found in TransactionBatch or BlockBatch are resolved in memory
+        and the others are read from StateDB at once
+
+        :param context:
+        :param keys:
+        :return: values in the order of keys
+        """
+        states = self._get_many_from_batch(context, keys)
+        return [states[key] for key in keys]
+
+    def _get_many_from_batch(self,
+                             context: 'IconScoreContext',
+                             keys: Iterable[bytes]) -> dict:
+        block_batch = context.block_batch
+        tx_batch = context.tx_batch
+
+        states = {}
+        state_db_keys = []
+        read_keys = tx_batch.read_keys
+
+        for key in keys:
+            if read_keys is not None:
+                read_keys.add(key)
+
+            if key in tx_batch:
+                states[key] = tx_batch[key]
+                continue
+
+            found, value = _get_from_block_batches(block_batch, key)
+            if found:
+                states[key] = value
+            else:
+                state_db_keys.append(key)
+
+        if state_db_keys:
+            states.update(self.get_many_from_state_db(context, state_db_keys))
+
+        return states
+
     def get_from_batch(self,
                        context: 'IconScoreContext',
                        key: bytes) -> bytes:
@@ -216,7 +492,7 @@ class ContextDatabase(object):
 
         Search order
         1. TransactionBatch
-        2. BlockBatch
+        2. BlockBatch and then the BlockBatches of its uncommitted ancestors
         3. StateDB
 
         :param context:
@@ -227,16 +503,207 @@ class ContextDatabase(object):
         block_batch = context.block_batch
         tx_batch = context.tx_batch
 
+        read_keys = tx_batch.read_keys
+        if read_keys is not None:
+            read_keys.add(key)
+
         # get value from tx_batch
         if key in tx_batch:
             return tx_batch[key]
 
-        # get value from block_batch
-        if key in block_batch:
-            return block_batch[key]
+        # get value from block_batch and its uncommitted ancestors
+        found, value = _get_from_block_batches(block_batch, key)
+        if found:
+            return value
 
         # get value from state_db
-        return self.key_value_db.get(key)
+        return self._get_from_state_db(context, key)
+
+    def iterate(self,
+                context: Optional['IconScoreContext'],
+                prefix: Optional[bytes]=None,
+                start: Optional[bytes]=None,
+                stop: Optional[bytes]=None,
+                reverse: bool=False) -> Iterator[Tuple[bytes, bytes]]:
+        """Returns the key/value pairs in the order of keys
+
+        The states in BlockBatch and TransactionBatch are merged on top of StateDB
+        in the same way as get_from_batch()
+
+        :param context:
+        :param prefix: only the keys starting with prefix are returned
+        :param start: the first key to return (inclusive)
+        :param stop: the last key to return (exclusive)
+        :param reverse: if True, returns the pairs in descending order
+        :return: iterator of (key, value)
+        """
+        snapshot = self._get_pinned_snapshot(context)
+        db = self._get_state_db() if snapshot is None else snapshot
+        items = db.iterate(prefix, start, stop, reverse)
+
+        context_type = _get_context_type(context)
+        if context_type in (IconScoreContextType.DIRECT, IconScoreContextType.QUERY):
+            return items
+
+        start, stop = _get_range(prefix, start, stop)
+        overlay = {}
+
+        tx_batch = context.tx_batch
+        if tx_batch.read_ranges is not None:
+            tx_batch.read_ranges.append((start, stop))
+
+        block_batches = []
+        batch = context.block_batch
+        while batch is not None:
+            block_batches.append(batch)
+            batch = batch.parent
+
+        # The states of a block overwrite the ones of its ancestors
+        for block_batch in reversed(block_batches):
+            for key, value in block_batch.items():
+                if _is_in_range(key, start, stop):
+                    overlay[key] = value
+
+        for key in tx_batch:
+            if _is_in_range(key, start, stop):
+                overlay[key] = tx_batch[key]
+
+        return _merge_items(items, overlay, reverse)
+
+    def _get_from_state_db(self,
+                           context: Optional['IconScoreContext'],
+                           key: bytes) -> bytes:
+        """Returns a committed value for a given key through the read cache
+
+        If the context has pinned a snapshot of this db,
+        the value is read at the moment of the snapshot.
+
+        :param context:
+        :param key:
+        :return: a value for a given key
+        """
+        snapshot = self._get_pinned_snapshot(context)
+        if snapshot is not None:
+            return self._get_from_snapshot(snapshot, key)
+
+        cache = self._cache
+        if cache is None:
+            return self._get_state_db().get(key)
+
+        hit, value = cache.get(key)
+        if hit:
+            return value
+
+        # The version MUST be taken before the pending states are looked up
+        version: int = cache.version
+        value = self._get_state_db().get(key)
+        cache.put(key, value, version)
+
+        return value
+
+    def get_many_from_state_db(self,
+                               context: Optional['IconScoreContext'],
+                               keys: Iterable[bytes]) -> dict:
+        """Returns the committed values for given keys through the read cache
+
+        The states in batches are not applied to the result.
+
+        :param context:
+        :param keys:
+        :return: key/value pairs
+        """
+        snapshot = self._get_pinned_snapshot(context)
+        cache = self._cache
+
+        if snapshot is not None:
+            db = snapshot
+            version = snapshot.cache_version
+        else:
+            version = None if cache is None else cache.version
+            db = self._get_state_db()
+
+        if cache is None or version is None:
+            return db.get_many(keys)
+
+        states = {}
+        missing_keys = []
+
+        for key in keys:
+            hit, value = cache.get(key, version)
+            if hit:
+                states[key] = value
+            else:
+                missing_keys.append(key)
+
+        if missing_keys:
+            missing_states = db.get_many(missing_keys)
+            for key, value in missing_states.items():
+                cache.put(key, value, version)
+            states.update(missing_states)
+
+        return states
+
+    def _get_from_snapshot(self,
+                           snapshot: 'KeyValueDatabaseSnapshot',
+                           key: bytes) -> bytes:
+        """The read cache is used only while it is consistent with the snapshot
+
+        :param snapshot:
+        :param key:
+        :return: a value for a given key
+        """
+        cache = self._cache
+        if cache is None or snapshot.cache_version is None:
+            return snapshot.get(key)
+
+        hit, value = cache.get(key, snapshot.cache_version)
+        if hit:
+            return value
+
+        value = snapshot.get(key)
+        cache.put(key, value, snapshot.cache_version)
+
+        return value
+
+    def _get_state_db(self):
+        """Returns the db to read the committed states from
+
+        While a background writer is writing states,
+        they are read from memory instead of db.
+        """
+        pending_states = self._pending_states
+        if pending_states is None:
+            return self.key_value_db
+
+        return self.key_value_db.get_overlay_view(pending_states)
+
+    def _get_pinned_snapshot(
+            self, context: Optional['IconScoreContext']) -> Optional['KeyValueDatabaseSnapshot']:
+        if context is None or not context.db_snapshots:
+            return None
+
+        return context.db_snapshots.get(self)
+
+    @property
+    def snapshot(self) -> Optional['KeyValueDatabaseSnapshot']:
+        """The latest snapshot taken by take_snapshot()
+        """
+        return self._snapshot
+
+    def take_snapshot(self) -> 'KeyValueDatabaseSnapshot':
+        """Takes a snapshot of the committed states in this db
+
+        It MUST be called on the thread which writes states to this db.
+
+        :return: snapshot
+        """
+        # The states being written are put on top of the snapshot
+        snapshot = self.key_value_db.get_snapshot(self._pending_states)
+        if self._cache is not None:
+            snapshot.cache_version = self._cache.version
+
+        self._snapshot = snapshot
+        return snapshot
 
     def put(self,
             context: Optional['IconScoreContext'],
@@ -254,7 +721,10 @@ class ContextDatabase(object):
         context_type = _get_context_type(context)
 
         if context_type == IconScoreContextType.DIRECT:
+            self.wait_for_pending_write()
             self.key_value_db.put(key, value)
+            if self._cache is not None:
+                self._cache.update({key: value})
         else:
             context.tx_batch[key] = value
 
@@ -270,7 +740,10 @@ class ContextDatabase(object):
         context_type = _get_context_type(context)
 
         if context_type == IconScoreContextType.DIRECT:
+            self.wait_for_pending_write()
             self.key_value_db.delete(key)
+            if self._cache is not None:
+                self._cache.update({key: None})
         else:
             context.tx_batch[key] = None
 
@@ -284,7 +757,10 @@ class ContextDatabase(object):
                 'close is not allowed on readonly context')
 
         if not self._is_shared:
-            return self.key_value_db.close()
+            try:
+                self.wait_for_pending_write()
+            finally:
+                self.key_value_db.close()
 
     def write_batch(self,
                     context: 'IconScoreContext',
@@ -294,13 +770,87 @@ class ContextDatabase(object):
             raise DatabaseException(
                 'write_batch is not allowed on readonly context')
 
-        return self.key_value_db.write_batch(states)
+        self.wait_for_pending_write()
+        self.key_value_db.write_batch(states)
+        if self._cache is not None:
+            self._cache.update(states)
+
+    def write_batch_async(self,
+                          context: 'IconScoreContext',
+                          states: dict,
+                          executor: 'Executor') -> 'Future':
+        """Hands states over to a background writer
+
+        Until the write is done, the states are read from memory
+        so that they are visible to all readers as if they were written.
+        The previous write is waited for before a new one starts.
+
+        :param context:
+        :param states: key/value pairs. states MUST NOT be changed after the call
+        :param executor: background writer
+        :return: future of the write
+        """
+        self.begin_pending_write(context, states)
+
+        future = executor.submit(self.write_pending_states)
+        self.set_pending_write(future)
+        return future
+
+    def begin_pending_write(self,
+                            context: 'IconScoreContext',
+                            states: dict) -> None:
+        """Makes states visible as committed ones before they are written to db
+
+        write_pending_states() MUST be called later on a background writer
+        and its future MUST be passed to set_pending_write().
+
+        :param context:
+        :param states: key/value pairs. states MUST NOT be changed after the call
+        """
+        if not _is_db_writable_on_context(context):
+            raise DatabaseException(
+                'write_batch is not allowed on readonly context')
+
+        self.wait_for_pending_write()
+
+        # The pending states MUST be visible before the cache is updated
+        self._pending_states = states
+        if self._cache is not None:
+            self._cache.update(states)
+
+    def write_pending_states(self) -> None:
+        """Writes the states given to begin_pending_write() to db
+        """
+        self.key_value_db.write_batch(self._pending_states)
+        self._pending_states = None
+
+    def set_pending_write(self, future: 'Future') -> None:
+        """
+        :param future: future of write_pending_states() which wait_for_pending_write() waits for
+        """
+        self._pending_write = future
+
+    def wait_for_pending_write(self) -> None:
+        """Waits until the states handed to a background writer are written to db
+
+        It raises the exception which the background writer has met.
+        """
+        pending_write = self._pending_write
+        if pending_write is None:
+            return
+
+        pending_write.result()
+        self._pending_write = None
 
     @staticmethod
     def from_path(path: str,
-                  create_if_missing: bool=True) -> 'ContextDatabase':
-        db = KeyValueDatabase.from_path(path, create_if_missing)
-        return ContextDatabase(db)
+                  create_if_missing: bool=True,
+                  cache_size: int=0,
+                  backend: str=BackendType.LEVELDB,
+                  options: Optional[dict]=None) -> 'ContextDatabase':
+        db = KeyValueDatabase.from_path(path, create_if_missing, backend, options)
+        cache = LRUCache(cache_size) if cache_size > 0 else None
+        return ContextDatabase(db, cache=cache)
 
 
 class IconScoreDatabase(ContextGetter):
@@ -336,6 +886,83 @@ class IconScoreDatabase(ContextGetter):
             self._observer.on_get(self._context, key, value)
         return value
 
+    def _get_without_observer(self, key: bytes) -> bytes:
+        """
+        Gets the value for the specified key without notifying the observer,
+        so that it is not charged as a get
+
+        :param key: key to retrieve
+        :return: value for the specified key, or None if not found
+        """
+        return self._context_db.get(self._context, self._hash_key(key))
+
+    def get_many(self, keys: List[bytes]) -> List[bytes]:
+        """
+        Gets the values for the specified keys at once.
+        Each key is charged as a get.
+
+        :param keys: keys to retrieve
+        :return: values in the order of keys, None for the key not found
+        """
+        context = self._context
+        values = self._context_db.get_many(context, [self._hash_key(key) for key in keys])
+        if self._observer:
+            for key, value in zip(keys, values):
+                self._observer.on_get(context, key, value)
+        return values
+
+    def iter_values(self, keys: Iterable[bytes], chunk_size: int=64) -> Iterator[bytes]:
+        """
+        Returns the values for the specified keys one by one.
+
+        The committed values are read from StateDB chunk by chunk ahead,
+        but each key is charged as a get only when its value is returned.
+        The values in batches are looked up when they are returned
+        so that the changes made during the iteration are visible.
+
+        :param keys: keys to retrieve
+        :param chunk_size: the number of keys to read from StateDB at once
+        :return: iterator of values
+        """
+        context = self._context
+
+        if _get_context_type(context) == IconScoreContextType.DIRECT:
+            # StateDB itself can be changed during the iteration
+            for key in keys:
+                yield self.get(key)
+            return
+
+        chunk = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) == chunk_size:
+                yield from self._iter_chunk_values(context, chunk)
+                chunk = []
+
+        if chunk:
+            yield from self._iter_chunk_values(context, chunk)
+
+    def _iter_chunk_values(self, context: 'IconScoreContext', keys: List[bytes]) -> Iterator[bytes]:
+        hashed_keys = [self._hash_key(key) for key in keys]
+        states = self._context_db.get_many_from_state_db(context, hashed_keys)
+        is_query = context.type == IconScoreContextType.QUERY
+        if not is_query and context.tx_batch.read_keys is not None:
+            context.tx_batch.read_keys.update(hashed_keys)
+
+        for key, hashed_key in zip(keys, hashed_keys):
+            if is_query:
+                value = states[hashed_key]
+            elif hashed_key in context.tx_batch:
+                value = context.tx_batch[hashed_key]
+            else:
+                found, value = _get_from_block_batches(context.block_batch, hashed_key)
+                if not found:
+                    value = states[hashed_key]
+
+            if self._observer:
+                self._observer.on_get(context, key, value)
+            yield value
+
     def put(self, key: bytes, value: bytes):
         """
         Sets a value for the specified key.
@@ -353,6 +980,37 @@ class IconScoreDatabase(ContextGetter):
                 self._observer.on_delete(self._context, key, old_value)
         self._context_db.put(self._context, hashed_key, value)
 
+    def iterate(self,
+                prefix: bytes=b'',
+                start: Optional[bytes]=None,
+                stop: Optional[bytes]=None,
+                reverse: bool=False) -> Iterator[Tuple[bytes, bytes]]:
+        """
+        Returns the key/value pairs of this db in the order of keys.
+        Each returned pair is charged as a get.
+
+        :param prefix: only the keys starting with prefix are returned
+        :param start: the first key to return (inclusive)
+        :param stop: the last key to return (exclusive)
+        :param reverse: if True, returns the pairs in descending order
+        :return: iterator of (key, value)
+        """
+        context = self._context
+        db_prefix = self._hash_key(b'')
+        db_prefix_size = len(db_prefix)
+
+        if start is not None:
+            start = db_prefix + start
+        if stop is not None:
+            stop = db_prefix + stop
+
+        items = self._context_db.iterate(context, db_prefix + prefix, start, stop, reverse)
+        for hashed_key, value in items:
+            key = hashed_key[db_prefix_size:]
+            if self._observer:
+                self._observer.on_get(context, key, value)
+            yield key, value
+
     def get_sub_db(self, prefix: bytes) -> 'IconScoreDatabase':
         """
         Returns sub db with a prefix
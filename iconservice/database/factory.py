@@ -16,37 +16,225 @@
 
 
 import os
+import zlib
+from concurrent.futures import Executor, Future
+from concurrent.futures.thread import ThreadPoolExecutor
 from enum import IntEnum
+from struct import pack, unpack_from
+from typing import TYPE_CHECKING, Dict, List, Optional, Iterator, Tuple
 
-from ..base.address import Address
-from ..icon_constant import ICON_DEX_DB_NAME
+from iconcommons.logger import Logger
+from ..base.address import Address, AddressPrefix, ICON_CONTRACT_ADDRESS_BYTES_SIZE
+from ..base.exception import DatabaseException
+from ..icon_constant import ICON_DEX_DB_NAME, ICON_DB_LOG_TAG, ICON_DEPLOY_DB_NAME, \
+    ICON_SCORE_DB_NAME_FORMAT, ICON_DEPLOY_STORAGE_PREFIX, ConfigKey, DEFAULT_SCORE_DB_SHARD_COUNT
+from .backend import BackendType, make_level_db_options
+from .cache import LRUCache
 from .db import KeyValueDatabase, ContextDatabase
 
+if TYPE_CHECKING:
+    from iconcommons.icon_config import IconConfig
+    from ..iconscore.icon_score_context import IconScoreContext
+
+
+def _encode_commit_record(batches: Dict[str, dict]) -> bytes:
+    """Serializes the states to write to each db
+
+    format: (name_size(4) | name | key_size(4) | key | value_size(4) | value)*
+    None value is stored as an empty one which also means deletion
+
+    :param batches: db name -> states
+    :return: commit record
+    """
+    data = []
+    for name, states in batches.items():
+        name = name.encode()
+        for key, value in states.items():
+            value = value or b''
+            data.append(pack(f'>I{len(name)}sI{len(key)}sI', len(name), name, len(key), key, len(value)))
+            data.append(value)
+
+    return b''.join(data)
+
+
+def _decode_commit_record(record: bytes) -> Dict[str, dict]:
+    batches = {}
+    offset = 0
+
+    while offset < len(record):
+        values = []
+        for _ in range(3):
+            size, = unpack_from('>I', record, offset)
+            offset += 4
+            values.append(record[offset:offset + size])
+            offset += size
+
+        name, key, value = values
+        batches.setdefault(name.decode(), {})[key] = value
+
+    return batches
+
 
 class ContextDatabaseFactory(object):
 
     class Mode(IntEnum):
+        # All states are kept in one db
         SINGLE_DB = 0
+        # ICX, deploy storage and SCORE states are kept in separate dbs.
+        # SCORE states are hashed into score_db_shard_count dbs by SCORE address.
         MULTIPLE_DB = 1
 
+    # Keys in the main db which ICX states are kept in
+    _LAYOUT_KEY = b'multi_db_layout'
+    _COMMIT_RECORD_KEY = b'multi_db_commit'
+    # Keys used by this factory for its own bookkeeping
+    INTERNAL_KEYS = (_LAYOUT_KEY, _COMMIT_RECORD_KEY)
+
     _state_db_root_path: str = None
     _mode: 'Mode' = Mode.SINGLE_DB
     _shared_context_db: 'ContextDatabase' = None
+    _cache_size: int = 0
+    _backend: str = BackendType.LEVELDB
+    _options: dict = {}
+    # MULTIPLE_DB mode only
+    _score_db_shard_count: int = 1
+    _context_dbs: Dict[str, 'ContextDatabase'] = {}
+    _writer_pool: Optional['ThreadPoolExecutor'] = None
 
     @classmethod
-    def open(cls, state_db_root_path: str, mode: 'Mode'):
+    def open(cls,
+             state_db_root_path: str,
+             mode: 'Mode',
+             cache_size: int = 0,
+             backend: str = BackendType.LEVELDB,
+             level_db_conf: Optional[dict] = None,
+             score_db_shard_count: int = 1):
+        """
+
+        :param state_db_root_path:
+        :param mode:
+        :param cache_size: the max number of items in the read cache of each db.
+            0 means no read cache
+        :param backend: storage backend type of each db
+        :param level_db_conf: LevelDB tuning options in IconConfig
+        :param score_db_shard_count: the number of dbs for SCORE states in MULTIPLE_DB mode.
+            It cannot be changed once StateDB is created
+        """
         cls.close()
 
         cls._state_db_root_path = state_db_root_path
         cls._mode = mode
+        cls._cache_size = cache_size
+        cls._backend = backend
+        cls._options = make_level_db_options(level_db_conf) if backend == BackendType.LEVELDB else {}
+
+        Logger.info(f'ContextDatabaseFactory open: mode={mode.name} '
+                    f'backend={backend} cache_size={cache_size} options={cls._options}', ICON_DB_LOG_TAG)
+
+        if mode == cls.Mode.MULTIPLE_DB:
+            if score_db_shard_count < 1:
+                raise DatabaseException(f'Invalid score_db_shard_count: {score_db_shard_count}')
+
+            cls._score_db_shard_count = score_db_shard_count
+            cls._open_multiple_db()
+
+    @classmethod
+    def open_by_config(cls, conf: 'IconConfig') -> None:
+        """Opens StateDB with the db settings in IconConfig
+
+        :param conf:
+        """
+        if conf.get(ConfigKey.MULTIPLE_DB, False):
+            mode = cls.Mode.MULTIPLE_DB
+        else:
+            mode = cls.Mode.SINGLE_DB
+
+        cls.open(conf[ConfigKey.STATE_DB_ROOT_PATH].rstrip('/'),
+                 mode,
+                 conf.get(ConfigKey.STATE_DB_CACHE_SIZE, 0),
+                 conf.get(ConfigKey.DB_BACKEND, BackendType.LEVELDB),
+                 conf.get(ConfigKey.LEVEL_DB),
+                 conf.get(ConfigKey.SCORE_DB_SHARD_COUNT, DEFAULT_SCORE_DB_SHARD_COUNT))
+
+    @classmethod
+    def _open_multiple_db(cls) -> None:
+        names = [ICON_DEX_DB_NAME, ICON_DEPLOY_DB_NAME]
+        names.extend(ICON_SCORE_DB_NAME_FORMAT.format(index=i) for i in range(cls._score_db_shard_count))
+
+        try:
+            for name in names:
+                cls._context_dbs[name] = cls._create_context_db(name)
+            cls._shared_context_db = cls._context_dbs[ICON_DEX_DB_NAME]
+
+            cls._check_layout(cls._shared_context_db.key_value_db)
+            cls._recover_commit()
+        except BaseException:
+            cls.close()
+            raise
+
+        cls._writer_pool = ThreadPoolExecutor(len(names) - 1, thread_name_prefix='db-writer')
+        Logger.info(f'MULTIPLE_DB mode: {names}', ICON_DB_LOG_TAG)
+
+    @classmethod
+    def _create_context_db(cls, name: str) -> 'ContextDatabase':
+        path = os.path.join(cls._state_db_root_path, name)
+        key_value_db = KeyValueDatabase.from_path(path, backend=cls._backend, options=cls._options)
+
+        # The lifetime of the db is managed by this factory
+        return ContextDatabase(key_value_db, is_shared=True, cache=cls._create_cache())
+
+    @classmethod
+    def _check_layout(cls, key_value_db: 'KeyValueDatabase') -> None:
+        """Prevents StateDB from being opened in another mode than the one it was created in
+
+        :param key_value_db: the main db
+        """
+        layout: Optional[bytes] = key_value_db.get(cls._LAYOUT_KEY)
+
+        if cls._mode == cls.Mode.SINGLE_DB:
+            if layout is not None:
+                raise DatabaseException(f'StateDB was created in MULTIPLE_DB mode: shards={layout.decode()}')
+            return
+
+        expected: bytes = str(cls._score_db_shard_count).encode()
+        if layout is None:
+            if next(key_value_db.iterate(), None) is not None:
+                raise DatabaseException('StateDB was created in SINGLE_DB mode')
+            key_value_db.put(cls._LAYOUT_KEY, expected)
+        elif layout != expected:
+            raise DatabaseException(
+                f'score_db_shard_count mismatch: {cls._score_db_shard_count} != {layout.decode()}')
+
+    @classmethod
+    def _recover_commit(cls) -> None:
+        """Finishes the last commit which had been interrupted before all dbs were written
+        """
+        key_value_db = cls._shared_context_db.key_value_db
+
+        record: Optional[bytes] = key_value_db.get(cls._COMMIT_RECORD_KEY)
+        if record is None:
+            return
+
+        batches = _decode_commit_record(record)
+        Logger.warning(f'Recover the last commit: {list(batches)}', ICON_DB_LOG_TAG)
+
+        for name, states in batches.items():
+            cls._context_dbs[name].key_value_db.write_batch(states)
+        key_value_db.delete(cls._COMMIT_RECORD_KEY)
 
     @classmethod
     def get_shared_db(cls) -> ContextDatabase:
         if cls._shared_context_db is None:
             path = os.path.join(cls._state_db_root_path, ICON_DEX_DB_NAME)
-            key_value_db = KeyValueDatabase.from_path(path)
+            key_value_db = KeyValueDatabase.from_path(path, backend=cls._backend, options=cls._options)
+            try:
+                cls._check_layout(key_value_db)
+            except BaseException:
+                key_value_db.close()
+                raise
+
             cls._shared_context_db = ContextDatabase(
-                key_value_db, is_shared=True)
+                key_value_db, is_shared=True, cache=cls._create_cache())
 
         return cls._shared_context_db
 
@@ -55,18 +243,213 @@ class ContextDatabaseFactory(object):
         if cls._mode == cls.Mode.SINGLE_DB:
             return cls.get_shared_db()
         else:
-            return cls.create_by_name(address.body.hex())
+            return cls.create_by_name(cls._get_db_name_by_key(address.to_bytes() + b'|'))
 
     @classmethod
     def create_by_name(cls, name: str) -> ContextDatabase:
         if cls._mode == cls.Mode.SINGLE_DB:
             return cls.get_shared_db()
         else:
-            path = os.path.join(cls._state_db_root_path, name)
-            return ContextDatabase.from_path(path)
+            context_db = cls._context_dbs.get(name)
+            if context_db is None:
+                raise DatabaseException(f'Unknown db name: {name}')
+            return context_db
+
+    @classmethod
+    def get_db_by_key(cls, key: bytes) -> ContextDatabase:
+        """Returns the db which a given key is stored in
+
+        :param key: key in a batch
+        :return: ContextDatabase
+        """
+        if cls._mode == cls.Mode.SINGLE_DB:
+            return cls.get_shared_db()
+        else:
+            return cls._context_dbs[cls._get_db_name_by_key(key)]
+
+    @classmethod
+    def _get_db_name_by_key(cls, key: bytes) -> str:
+        """Returns the name of the db which a given key belongs to in MULTIPLE_DB mode
+
+        :param key: key in a batch
+        :return: db name
+        """
+        if key.startswith(ICON_DEPLOY_STORAGE_PREFIX):
+            return ICON_DEPLOY_DB_NAME
+
+        # SCORE state key: contract address | [prefix |] key
+        size = ICON_CONTRACT_ADDRESS_BYTES_SIZE
+        if len(key) > size and key[0] == AddressPrefix.CONTRACT and key[size] == ord('|'):
+            index: int = zlib.crc32(key[:size]) % cls._score_db_shard_count
+            return ICON_SCORE_DB_NAME_FORMAT.format(index=index)
+
+        return ICON_DEX_DB_NAME
+
+    @classmethod
+    def _split_states(cls, states: dict) -> Dict[str, dict]:
+        """Splits the states of a block into the states of each db
+
+        The states of the other dbs are also recorded in the main db as a commit record.
+        Once the main db is written, the block is committed
+        and the other dbs are recovered from the record on the next open if they are not written.
+
+        :param states: key/value pairs
+        :return: db name -> states. The main db comes first
+        """
+        batches = {ICON_DEX_DB_NAME: {}}
+
+        for key, value in states.items():
+            name = cls._get_db_name_by_key(key)
+            batch = batches.get(name)
+            if batch is None:
+                batch = batches[name] = {}
+            batch[key] = value
+
+        other_batches = {name: batch for name, batch in batches.items() if name != ICON_DEX_DB_NAME}
+        # The record of the previous commit is removed if there is nothing to record
+        batches[ICON_DEX_DB_NAME][cls._COMMIT_RECORD_KEY] = \
+            _encode_commit_record(other_batches) if other_batches else None
+
+        return batches
+
+    @classmethod
+    def write_batch(cls, context: 'IconScoreContext', states: dict) -> None:
+        """Writes the states of a block to StateDB
+
+        In MULTIPLE_DB mode, the main db is written first with the commit record
+        and then the other dbs are written in parallel.
+
+        :param context:
+        :param states: key/value pairs
+        """
+        if cls._mode == cls.Mode.SINGLE_DB:
+            cls.get_shared_db().write_batch(context, states)
+            return
+
+        cls.wait_for_pending_write()
+
+        batches = cls._split_states(states)
+        cls._shared_context_db.write_batch(context, batches.pop(ICON_DEX_DB_NAME))
+
+        futures = [cls._writer_pool.submit(cls._context_dbs[name].write_batch, context, batch)
+                   for name, batch in batches.items()]
+        for future in futures:
+            future.result()
+
+    @classmethod
+    def write_batch_async(cls,
+                          context: 'IconScoreContext',
+                          states: dict,
+                          executor: 'Executor') -> 'Future':
+        """Hands the states of a block over to a background writer
+
+        See ContextDatabase.write_batch_async()
+
+        :param context:
+        :param states: key/value pairs. states MUST NOT be changed after the call
+        :param executor: background writer
+        :return: future of the write
+        """
+        if cls._mode == cls.Mode.SINGLE_DB:
+            return cls.get_shared_db().write_batch_async(context, states, executor)
+
+        cls.wait_for_pending_write()
+
+        batches = cls._split_states(states)
+        context_dbs = [cls._context_dbs[name] for name in batches]
+        for context_db, batch in zip(context_dbs, batches.values()):
+            context_db.begin_pending_write(context, batch)
+
+        future = executor.submit(cls._write_pending_states, context_dbs)
+        for context_db in context_dbs:
+            context_db.set_pending_write(future)
+
+        return future
+
+    @classmethod
+    def _write_pending_states(cls, context_dbs: List['ContextDatabase']) -> None:
+        """
+        :param context_dbs: the main db comes first
+        """
+        context_dbs[0].write_pending_states()
+
+        futures = [cls._writer_pool.submit(context_db.write_pending_states) for context_db in context_dbs[1:]]
+        for future in futures:
+            future.result()
+
+    @classmethod
+    def wait_for_pending_write(cls) -> None:
+        """Waits until the states handed to a background writer are written to all dbs
+        """
+        for context_db in cls._get_context_dbs():
+            context_db.wait_for_pending_write()
+
+    @classmethod
+    def take_snapshots(cls) -> dict:
+        """Takes snapshots of the committed states in all dbs
+
+        :return: ContextDatabase -> KeyValueDatabaseSnapshot
+        """
+        return {context_db: context_db.take_snapshot() for context_db in cls._get_context_dbs()}
+
+    @classmethod
+    def iterate_states(cls) -> Iterator[Tuple[bytes, bytes]]:
+        """Iterates over the committed states in all dbs db by db
+
+        The states are read from the snapshots taken when the iteration starts.
+        The keys used by this factory for its own bookkeeping are skipped.
+
+        :return: iterator of (key, value)
+        """
+        if cls._mode == cls.Mode.SINGLE_DB:
+            cls.get_shared_db()
+
+        cls.wait_for_pending_write()
+        snapshots = [context_db.key_value_db.get_snapshot() for context_db in cls._get_context_dbs()]
+        for snapshot in snapshots:
+            for key, value in snapshot.iterate():
+                if key not in cls.INTERNAL_KEYS:
+                    yield key, value
+
+    @classmethod
+    def get_key_value_dbs(cls) -> Dict[str, 'KeyValueDatabase']:
+        """Returns the opened dbs for maintenance
+
+        :return: db name -> KeyValueDatabase
+        """
+        if cls._mode == cls.Mode.MULTIPLE_DB:
+            return {name: context_db.key_value_db for name, context_db in cls._context_dbs.items()}
+
+        context_db = cls._shared_context_db
+        return {} if context_db is None else {ICON_DEX_DB_NAME: context_db.key_value_db}
+
+    @classmethod
+    def _get_context_dbs(cls) -> List['ContextDatabase']:
+        if cls._mode == cls.Mode.MULTIPLE_DB:
+            return list(cls._context_dbs.values())
+
+        context_db = cls._shared_context_db
+        return [] if context_db is None else [context_db]
+
+    @classmethod
+    def _create_cache(cls) -> Optional['LRUCache']:
+        if cls._cache_size > 0:
+            return LRUCache(cls._cache_size)
+        return None
 
     @classmethod
     def close(cls):
-        if cls._shared_context_db:
-            cls._shared_context_db.key_value_db.close()
+        context_dbs = cls._get_context_dbs()
+
+        try:
+            cls.wait_for_pending_write()
+        finally:
+            for context_db in context_dbs:
+                context_db.key_value_db.close()
+
             cls._shared_context_db = None
+            cls._context_dbs = {}
+
+            if cls._writer_pool is not None:
+                cls._writer_pool.shutdown()
+                cls._writer_pool = None
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Key space statistics of StateDB
+
+Keys are classified with the layouts used by iconservice
+- SCORE: address(21) | [container_id | name |] key  (IconScoreDatabase._hash_key)
+- deploy: isds|di|score_address, isds|dtp|tx_hash  (IconScoreDeployStorage)
+- icx: address(20 or 21) of an account
+- other: the rest such as last_block and total_supply
+"""
+
+import time
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from iconcommons.logger import Logger
+from ..base.address import Address, AddressPrefix
+from ..icon_constant import ICON_DB_LOG_TAG, ICON_DEPLOY_STORAGE_PREFIX
+from ..iconscore.icon_container_db import ARRAY_DB_ID, DICT_DB_ID, VAR_DB_ID
+from .factory import ContextDatabaseFactory
+
+if TYPE_CHECKING:
+    from .db import KeyValueDatabaseSnapshot
+
+GROUP_ICX = 'icx'
+GROUP_OTHER = 'other'
+
+CONTAINER_TYPE_NAMES = {ARRAY_DB_ID: 'ArrayDB', DICT_DB_ID: 'DictDB', VAR_DB_ID: 'VarDB'}
+# States written by SCORE with IconScoreDatabase.put() directly
+CONTAINER_RAW = 'raw'
+CONTAINER_DEPLOY = 'deploy'
+
+# Upper bounds of value size buckets. The last bucket has no bound
+VALUE_SIZE_BOUNDS = [16, 64, 256, 1024, 4096, 16384, 65536]
+
+_ADDRESS_SIZE = 21
+_DEPLOY_INFO_PREFIX = ICON_DEPLOY_STORAGE_PREFIX + b'di|'
+_DEPLOY_TX_PARAMS_PREFIX = ICON_DEPLOY_STORAGE_PREFIX + b'dtp|'
+# The offset of score_address in the value of deploy tx params: version(1) | deploy_type(1) | data_length(4)
+_DEPLOY_TX_PARAMS_SCORE_OFFSET = 6
+
+
+def _make_ranges() -> List[Tuple[Optional[bytes], Optional[bytes]]]:
+    """Splits the key space into ranges to scan in parallel
+
+    The keys of all SCOREs start with AddressPrefix.CONTRACT(0x01),
+    so that range is split again by the second byte.
+    """
+    contract = bytes([AddressPrefix.CONTRACT])
+    boundaries = [None, contract]
+    boundaries.extend(contract + bytes([i]) for i in range(0x10, 0x100, 0x10))
+    boundaries.append(bytes([AddressPrefix.CONTRACT + 1]))
+    boundaries.extend(bytes([i]) for i in range(0x10, 0x100, 0x10))
+    boundaries.append(None)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def classify_key(key: bytes, value: bytes) -> Tuple[str, Optional[str], Optional[str]]:
+    """Finds out who owns the state
+
+    :param key:
+    :param value:
+    :return: (group, container type, container name)
+        group is a SCORE address string, GROUP_ICX or GROUP_OTHER.
+        container type and name are None for the groups other than SCOREs
+    """
+    if key.startswith(ICON_DEPLOY_STORAGE_PREFIX):
+        if key.startswith(_DEPLOY_INFO_PREFIX):
+            address = key[len(_DEPLOY_INFO_PREFIX):]
+            return _to_score(address, CONTAINER_DEPLOY, 'di')
+        if key.startswith(_DEPLOY_TX_PARAMS_PREFIX):
+            offset = _DEPLOY_TX_PARAMS_SCORE_OFFSET
+            return _to_score(value[offset:offset + _ADDRESS_SIZE], CONTAINER_DEPLOY, 'dtp')
+        return GROUP_OTHER, None, None
+
+    if len(key) > _ADDRESS_SIZE and key[0] == AddressPrefix.CONTRACT and key[_ADDRESS_SIZE] == ord('|'):
+        container_type, name = CONTAINER_RAW, ''
+
+        sub_key = key[_ADDRESS_SIZE + 1:]
+        container_id = sub_key[:1]
+        if container_id in CONTAINER_TYPE_NAMES and sub_key[1:2] == b'|':
+            container_type = CONTAINER_TYPE_NAMES[container_id]
+            name = sub_key[2:].split(b'|', 1)[0].decode('utf-8', 'backslashreplace')
+
+        return _to_score(key[:_ADDRESS_SIZE], container_type, name)
+
+    if len(key) in (_ADDRESS_SIZE - 1, _ADDRESS_SIZE):
+        return GROUP_ICX, None, None
+
+    return GROUP_OTHER, None, None
+
+
+def _to_score(address: bytes, container_type: str, name: str) -> Tuple[str, Optional[str], Optional[str]]:
+    if len(address) != _ADDRESS_SIZE:
+        return GROUP_OTHER, None, None
+
+    return str(Address.from_bytes(address)), container_type, name
+
+
+class KeySpaceStats(object):
+    """Key count, value size histogram and container breakdown of a group of states
+    """
+
+    def __init__(self) -> None:
+        self.key_count = 0
+        self.key_size = 0
+        self.value_size = 0
+        self.value_size_histogram = [0] * (len(VALUE_SIZE_BOUNDS) + 1)
+        # container type -> container name -> key count
+        self.containers: Dict[str, Dict[str, int]] = {}
+
+    def add(self, key: bytes, value: bytes,
+            container_type: Optional[str] = None, name: Optional[str] = None) -> None:
+        self.key_count += 1
+        self.key_size += len(key)
+        self.value_size += len(value)
+        self.value_size_histogram[_get_bucket(len(value))] += 1
+
+        if container_type is not None:
+            names = self.containers.get(container_type)
+            if names is None:
+                names = self.containers[container_type] = {}
+            names[name] = names.get(name, 0) + 1
+
+    def merge(self, other: 'KeySpaceStats') -> None:
+        self.key_count += other.key_count
+        self.key_size += other.key_size
+        self.value_size += other.value_size
+        for i, count in enumerate(other.value_size_histogram):
+            self.value_size_histogram[i] += count
+
+        for container_type, other_names in other.containers.items():
+            names = self.containers.get(container_type)
+            if names is None:
+                names = self.containers[container_type] = {}
+            for name, count in other_names.items():
+                names[name] = names.get(name, 0) + count
+
+    def to_dict(self) -> dict:
+        labels = [f'<={bound}' for bound in VALUE_SIZE_BOUNDS] + [f'>{VALUE_SIZE_BOUNDS[-1]}']
+
+        stats = {
+            'keys': self.key_count,
+            'keyBytes': self.key_size,
+            'valueBytes': self.value_size,
+            'valueSizes': dict(zip(labels, self.value_size_histogram))
+        }
+        if self.containers:
+            stats['containers'] = {
+                container_type: {
+                    'keys': sum(names.values()),
+                    'names': names
+                }
+                for container_type, names in self.containers.items()
+            }
+
+        return stats
+
+
+def _get_bucket(size: int) -> int:
+    for i, bound in enumerate(VALUE_SIZE_BOUNDS):
+        if size <= bound:
+            return i
+    return len(VALUE_SIZE_BOUNDS)
+
+
+class StateInspector(object):
+    """Scans the snapshots of StateDB and aggregates the statistics of each SCORE
+
+    The key space of each db is split into ranges which are scanned by a thread pool.
+    """
+
+    def __init__(self, max_workers: int = 4, skip_keys: Iterable[bytes] = ()) -> None:
+        """Constructor
+
+        :param max_workers: the number of threads which scan key ranges
+        :param skip_keys: keys not to count such as bookkeeping keys of ContextDatabaseFactory
+        """
+        self._max_workers = max_workers
+        self._skip_keys = frozenset(skip_keys)
+
+    def inspect(self, snapshots: Iterable['KeyValueDatabaseSnapshot']) -> Dict[str, 'KeySpaceStats']:
+        """
+        :param snapshots: snapshots of the dbs of StateDB
+        :return: group -> KeySpaceStats. See classify_key() for the groups
+        """
+        tasks = [(snapshot, start, stop) for snapshot in snapshots for start, stop in _make_ranges()]
+        groups: Dict[str, 'KeySpaceStats'] = {}
+
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(self._max_workers) as executor:
+            for result in executor.map(lambda task: self._scan(*task), tasks):
+                for group, stats in result.items():
+                    if group in groups:
+                        groups[group].merge(stats)
+                    else:
+                        groups[group] = stats
+
+        Logger.info(f'inspect: {len(tasks)} ranges {time.monotonic() - start_time:.3f}s', ICON_DB_LOG_TAG)
+        return groups
+
+    def _scan(self, snapshot: 'KeyValueDatabaseSnapshot',
+              start: Optional[bytes], stop: Optional[bytes]) -> Dict[str, 'KeySpaceStats']:
+        groups: Dict[str, 'KeySpaceStats'] = {}
+        skip_keys = self._skip_keys
+
+        for key, value in snapshot.iterate(start=start, stop=stop):
+            if key in skip_keys:
+                continue
+
+            group, container_type, name = classify_key(key, value)
+            stats = groups.get(group)
+            if stats is None:
+                stats = groups[group] = KeySpaceStats()
+            stats.add(key, value, container_type, name)
+
+        return groups
+
+
+def make_report(groups: Dict[str, 'KeySpaceStats'], top: Optional[int] = None) -> dict:
+    """Makes a report of StateInspector.inspect() which can be dumped to json
+
+    :param groups: the result of StateInspector.inspect()
+    :param top: the number of SCOREs to report in the descending order of key count. None means all
+    :return: report
+    """
+    total = KeySpaceStats()
+    for stats in groups.values():
+        total.merge(stats)
+
+    scores = sorted(
+        ((group, stats) for group, stats in groups.items() if group not in (GROUP_ICX, GROUP_OTHER)),
+        key=lambda item: item[1].key_count, reverse=True)
+
+    return {
+        'total': total.to_dict(),
+        GROUP_ICX: groups.get(GROUP_ICX, KeySpaceStats()).to_dict(),
+        GROUP_OTHER: groups.get(GROUP_OTHER, KeySpaceStats()).to_dict(),
+        'scoreCount': len(scores),
+        'scores': {group: stats.to_dict() for group, stats in scores[:top]}
+    }
+
+
+def inspect_state(max_workers: int = 4, top: Optional[int] = None) -> dict:
+    """Inspects the committed states in StateDB opened by ContextDatabaseFactory
+
+    :param max_workers: the number of threads which scan key ranges
+    :param top: the number of SCOREs to report. None means all
+    :return: report. See make_report()
+    """
+    ContextDatabaseFactory.get_shared_db()
+    ContextDatabaseFactory.wait_for_pending_write()
+    snapshots = [db.get_snapshot() for db in ContextDatabaseFactory.get_key_value_dbs().values()]
+
+    inspector = StateInspector(max_workers, ContextDatabaseFactory.INTERNAL_KEYS)
+    return make_report(inspector.inspect(snapshots), top)
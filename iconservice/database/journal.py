@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reverse diffs of the last committed blocks which revert them one at a time
+
+A reverse diff has the values of the keys in a block as they were before the block was committed.
+It is written before the states of the block, so a diff newer than the last block can be left by a crash.
+
+record: key = height(8) / value = version(1) | block_hash(32) | zlib compressed entries
+- entry: key_size(4) | key | value_size(4) | value, value_size is 0xffffffff if the key was absent
+"""
+
+import zlib
+from struct import Struct
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from iconcommons.logger import Logger
+from ..base.exception import DatabaseException
+from ..icon_constant import ICON_DB_LOG_TAG
+from .backend import BackendType
+from .db import KeyValueDatabase
+from .factory import ContextDatabaseFactory
+
+if TYPE_CHECKING:
+    from ..base.block import Block
+    from ..iconscore.icon_score_context import IconScoreContext
+
+_VERSION = 0
+_HEADER = Struct('>B32s')
+_HEIGHT = Struct('>Q')
+_SIZE = Struct('>I')
+_ABSENT = 0xffffffff
+
+
+def _encode(block_hash: bytes, diff: dict) -> bytes:
+    entries = []
+    for key, value in diff.items():
+        entries.append(_SIZE.pack(len(key)))
+        entries.append(key)
+        if value is None:
+            entries.append(_SIZE.pack(_ABSENT))
+        else:
+            entries.append(_SIZE.pack(len(value)))
+            entries.append(value)
+
+    return _HEADER.pack(_VERSION, block_hash) + zlib.compress(b''.join(entries))
+
+
+def _decode(data: bytes) -> Tuple[bytes, dict]:
+    version, block_hash = _HEADER.unpack_from(data)
+    if version != _VERSION:
+        raise DatabaseException(f'Unknown reverse diff version: {version}')
+
+    buf = zlib.decompress(data[_HEADER.size:])
+    diff = {}
+    offset = 0
+    while offset < len(buf):
+        key_size, = _SIZE.unpack_from(buf, offset)
+        offset += 4
+        key = buf[offset:offset + key_size]
+        offset += key_size
+
+        value_size, = _SIZE.unpack_from(buf, offset)
+        offset += 4
+        if value_size == _ABSENT:
+            diff[key] = None
+        else:
+            diff[key] = buf[offset:offset + value_size]
+            offset += value_size
+
+    return block_hash, diff
+
+
+def make_reverse_diff(states: dict) -> dict:
+    """Reads the values which the states of a block are about to overwrite
+
+    The states of the previous block which are being written to StateDB are taken into account.
+
+    :param states: states of a block to commit
+    :return: key -> the value before the block. None if the key is absent
+    """
+    return {key: ContextDatabaseFactory.get_db_by_key(key).get(None, key) for key in states}
+
+
+class ReverseDiffJournal(object):
+    """Keeps the reverse diffs of the last committed blocks in its own db
+    """
+
+    @staticmethod
+    def from_path(path: str,
+                  max_blocks: int,
+                  backend: str = BackendType.LEVELDB) -> 'ReverseDiffJournal':
+        """
+        :param path: db path
+        :param max_blocks: the number of the last blocks which can be reverted
+        :param backend: storage backend type
+        :return: ReverseDiffJournal instance
+        """
+        return ReverseDiffJournal(KeyValueDatabase.from_path(path, backend=backend), max_blocks)
+
+    def __init__(self, key_value_db: 'KeyValueDatabase', max_blocks: int) -> None:
+        """Constructor
+
+        :param key_value_db: db for the reverse diffs
+        :param max_blocks: the number of the last blocks which can be reverted
+        """
+        self._db = key_value_db
+        self._max_blocks = max_blocks
+
+    @property
+    def max_blocks(self) -> int:
+        return self._max_blocks
+
+    def record(self, block: 'Block', diff: dict) -> None:
+        """Writes the reverse diff of a block and drops the ones beyond max_blocks
+
+        :param block: block to commit
+        :param diff: the result of make_reverse_diff()
+        """
+        states = {_HEIGHT.pack(block.height): _encode(block.hash, diff)}
+
+        stop: int = block.height - self._max_blocks + 1
+        if stop > 0:
+            for key, _ in self._db.iterate(stop=_HEIGHT.pack(stop)):
+                states[key] = None
+
+        self._db.write_batch(states)
+
+    def get(self, height: int) -> Optional[Tuple[bytes, dict]]:
+        """
+        :param height: block height
+        :return: (block hash, reverse diff) or None
+        """
+        data: bytes = self._db.get(_HEIGHT.pack(height))
+        if data is None:
+            return None
+        return _decode(data)
+
+    def get_heights(self) -> List[int]:
+        """Returns the heights of the blocks which have reverse diffs in ascending order
+        """
+        return [_HEIGHT.unpack(key)[0] for key, _ in self._db.iterate()]
+
+    def discard_uncommitted(self, last_block: Optional['Block']) -> None:
+        """Drops the reverse diffs left by a crash before their blocks were written
+
+        :param last_block: the last committed block
+        """
+        start: int = 0 if last_block is None else last_block.height
+        states = {}
+        for key, value in self._db.iterate(start=_HEIGHT.pack(start)):
+            height: int = _HEIGHT.unpack(key)[0]
+            if last_block is None or height > last_block.height or _HEADER.unpack_from(value)[1] != last_block.hash:
+                states[key] = None
+
+        if states:
+            Logger.warning(f'Discard reverse diffs of uncommitted blocks: {len(states)}', ICON_DB_LOG_TAG)
+            self._db.write_batch(states)
+
+    def revert(self, context: 'IconScoreContext', last_block: 'Block') -> dict:
+        """Puts the states of StateDB back to the ones before the last block
+
+        :param context: context which can write to StateDB directly
+        :param last_block: the last committed block
+        :return: the reverse diff which has been applied
+        """
+        ContextDatabaseFactory.wait_for_pending_write()
+
+        record = self.get(last_block.height)
+        if record is None or record[0] != last_block.hash:
+            raise DatabaseException(f'No reverse diff: block({last_block})')
+
+        diff: dict = record[1]
+        ContextDatabaseFactory.write_batch(context, diff)
+        self._db.delete(_HEIGHT.pack(last_block.height))
+
+        Logger.info(f'Revert block({last_block}): {len(diff)} states', ICON_DB_LOG_TAG)
+        return diff
+
+    def close(self) -> None:
+        self._db.close()
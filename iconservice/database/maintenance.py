@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from threading import Condition, Thread
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from iconcommons.logger import Logger
+from ..icon_constant import ICON_DB_LOG_TAG
+
+if TYPE_CHECKING:
+    from .db import KeyValueDatabase
+
+
+def get_level_stats(db: 'KeyValueDatabase') -> List[dict]:
+    """Returns the number of files and the size of each level in LevelDB
+
+    :param db:
+    :return: [{'level': int, 'files': int, 'sizeMb': int}, ...]. empty if not supported by the backend
+    """
+    stats: Optional[bytes] = db.get_property(b'leveldb.stats')
+    if stats is None:
+        return []
+
+    levels = []
+    # Level  Files Size(MB) Time(sec) Read(MB) Write(MB)
+    for line in stats.decode().splitlines():
+        columns = line.split()
+        if len(columns) == 6 and all(column.isdigit() for column in columns):
+            levels.append({'level': int(columns[0]), 'files': int(columns[1]), 'sizeMb': int(columns[2])})
+
+    return levels
+
+
+class CompactionScheduler(object):
+    """Compacts the dbs of StateDB on a background thread
+
+    A compaction is triggered
+    - every block_interval committed blocks
+    - once idle_time seconds have passed since the last commit
+    - by request()
+
+    The key space of each db is compacted slice by slice
+    and no slice is started while a commit is writing states.
+    """
+
+    # Boundaries of the slices of the key space. None means the end of the key space
+    _SLICE_BOUNDARIES = [None] + [bytes([i]) for i in range(0x10, 0x100, 0x10)] + [None]
+
+    def __init__(self,
+                 get_dbs: Callable[[], Dict[str, 'KeyValueDatabase']],
+                 block_interval: int = 0,
+                 idle_time: float = 0) -> None:
+        """Constructor
+
+        :param get_dbs: returns the dbs to compact. db name -> KeyValueDatabase
+        :param block_interval: the number of committed blocks between compactions. 0 means disabled
+        :param idle_time: idle seconds after a commit to start a compaction. 0 means disabled
+        """
+        self._get_dbs = get_dbs
+        self._block_interval = block_interval
+        self._idle_time = idle_time
+
+        self._condition = Condition()
+        self._thread: Optional['Thread'] = None
+        self._running = False
+        self._requested = False
+        self._commits_in_progress = 0
+        self._last_commit_time: float = 0
+        self._blocks_since_compaction = 0
+
+        self._compaction_count = 0
+        self._last_compaction_time: Optional[float] = None
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+
+        self._thread = Thread(target=self._run, name='db-compaction', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the thread after the running slice of compaction
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def request(self) -> None:
+        """Requests a compaction regardless of the triggers
+        """
+        with self._condition:
+            self._requested = True
+            self._condition.notify_all()
+
+    def on_commit_begin(self) -> None:
+        with self._condition:
+            self._commits_in_progress += 1
+
+    def on_commit_end(self) -> None:
+        """Called when the states of a block have been written
+        """
+        with self._condition:
+            self._commits_in_progress -= 1
+            self._blocks_since_compaction += 1
+            self._last_commit_time = time.monotonic()
+            self._condition.notify_all()
+
+    def get_stats(self) -> dict:
+        """
+        :return: compaction stats and the level stats of each db
+        """
+        dbs = {name: get_level_stats(db) for name, db in self._get_dbs().items()}
+
+        with self._condition:
+            return {
+                'compactionCount': self._compaction_count,
+                'lastCompactionTimeMs':
+                    None if self._last_compaction_time is None else int(self._last_compaction_time * 1000),
+                'blocksSinceCompaction': self._blocks_since_compaction,
+                'dbs': dbs
+            }
+
+    def _get_trigger(self) -> Optional[str]:
+        if self._requested:
+            return 'request'
+
+        if self._block_interval > 0 and self._blocks_since_compaction >= self._block_interval:
+            return 'block'
+
+        if self._get_idle_wait_time() == 0:
+            return 'idle'
+
+        return None
+
+    def _get_idle_wait_time(self) -> Optional[float]:
+        """
+        :return: seconds left before idle compaction. None if it is not scheduled
+        """
+        if self._idle_time <= 0 or self._blocks_since_compaction == 0 or self._commits_in_progress > 0:
+            return None
+
+        return max(0.0, self._last_commit_time + self._idle_time - time.monotonic())
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                trigger = self._get_trigger()
+                while self._running and trigger is None:
+                    self._condition.wait(self._get_idle_wait_time())
+                    trigger = self._get_trigger()
+
+                if not self._running:
+                    return
+
+                self._requested = False
+                self._blocks_since_compaction = 0
+
+            try:
+                self._compact(trigger)
+            except BaseException as e:
+                Logger.exception(f'Compaction failed: {e}', ICON_DB_LOG_TAG)
+
+    def _compact(self, trigger: str) -> None:
+        Logger.info(f'Compaction start: trigger={trigger}', ICON_DB_LOG_TAG)
+        start_time = time.monotonic()
+        boundaries = self._SLICE_BOUNDARIES
+
+        for db in self._get_dbs().values():
+            for start, stop in zip(boundaries[:-1], boundaries[1:]):
+                if not self._wait_for_commits():
+                    Logger.info('Compaction stopped', ICON_DB_LOG_TAG)
+                    return
+                db.compact_range(start, stop)
+
+        elapsed = time.monotonic() - start_time
+        with self._condition:
+            self._compaction_count += 1
+            self._last_compaction_time = elapsed
+
+        Logger.info(f'Compaction end: {elapsed:.3f}s {self.get_stats()}', ICON_DB_LOG_TAG)
+
+    def _wait_for_commits(self) -> bool:
+        """Waits until no commit is writing states
+
+        :return: False if the scheduler has been stopped
+        """
+        with self._condition:
+            while self._running and self._commits_in_progress > 0:
+                self._condition.wait()
+            return self._running
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""State file which carries all states in StateDB to bootstrap a new node
+
+format: header | chunk* | end chunk
+- header: magic(8) | version(1)
+- chunk: type(1) | payload_size(4) | crc32 of payload(4) | payload
+- data chunk payload: zlib compressed (key_size(4) | key | value_size(4) | value)*
+- end chunk payload: the number of states(8) | digest(32)
+"""
+
+import hashlib
+import zlib
+from struct import Struct, pack, unpack_from
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, Tuple
+
+from iconcommons.logger import Logger
+from ..base.exception import DatabaseException
+from ..icon_constant import ICON_DB_LOG_TAG
+from .factory import ContextDatabaseFactory
+
+if TYPE_CHECKING:
+    from .db import ContextDatabase
+
+_MAGIC = b'ICONSTAT'
+_VERSION = 0
+_CHUNK_HEADER = Struct('>BII')
+_CHUNK_DATA = 1
+_CHUNK_END = 2
+
+# The size of states before compression in a data chunk
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+# The size of states in a write batch on import
+DEFAULT_BATCH_SIZE = 64 * 1024 * 1024
+
+
+class StateDigest(object):
+    """Digest of a set of states which does not depend on their order
+
+    It is the sum of the hashes of all key/value pairs modulo 2^256,
+    so StateDB can be verified with any db layout.
+    """
+
+    def __init__(self) -> None:
+        self._sum = 0
+        self.count = 0
+
+    def add(self, key: bytes, value: bytes) -> None:
+        data = b''.join([pack('>I', len(key)), key, value])
+        self._sum = (self._sum + int.from_bytes(hashlib.sha3_256(data).digest(), 'big')) % (1 << 256)
+        self.count += 1
+
+    @property
+    def digest(self) -> bytes:
+        return self._sum.to_bytes(32, 'big')
+
+
+class StateFileWriter(object):
+    def __init__(self, fp: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """Constructor
+
+        :param fp: file opened in binary write mode
+        :param chunk_size: the size of states before compression in a data chunk
+        """
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._records = []
+        self._size = 0
+        self._digest = StateDigest()
+
+        fp.write(_MAGIC + pack('>B', _VERSION))
+
+    def write(self, key: bytes, value: bytes) -> None:
+        self._records.append(pack('>I', len(key)))
+        self._records.append(key)
+        self._records.append(pack('>I', len(value)))
+        self._records.append(value)
+        self._size += len(key) + len(value) + 8
+        self._digest.add(key, value)
+
+        if self._size >= self._chunk_size:
+            self._flush()
+
+    def close(self) -> Tuple[int, bytes]:
+        """Writes the end chunk
+
+        :return: (the number of states, digest)
+        """
+        self._flush()
+
+        digest = self._digest
+        self._write_chunk(_CHUNK_END, pack('>Q', digest.count) + digest.digest)
+        return digest.count, digest.digest
+
+    def _flush(self) -> None:
+        if self._records:
+            self._write_chunk(_CHUNK_DATA, zlib.compress(b''.join(self._records)))
+            self._records = []
+            self._size = 0
+
+    def _write_chunk(self, chunk_type: int, payload: bytes) -> None:
+        self._fp.write(_CHUNK_HEADER.pack(chunk_type, len(payload), zlib.crc32(payload)))
+        self._fp.write(payload)
+
+
+class StateFileReader(object):
+    def __init__(self, fp: BinaryIO) -> None:
+        """Constructor
+
+        :param fp: file opened in binary read mode
+        """
+        self._fp = fp
+        # (the number of states, digest) recorded in the end chunk
+        self.count: int = None
+        self.digest: bytes = None
+
+        header = fp.read(len(_MAGIC) + 1)
+        if len(header) != len(_MAGIC) + 1 or header[:len(_MAGIC)] != _MAGIC:
+            raise DatabaseException('Invalid state file')
+        if header[len(_MAGIC)] != _VERSION:
+            raise DatabaseException(f'Unsupported state file version: {header[len(_MAGIC)]}')
+
+    def __iter__(self) -> Iterator[Tuple[bytes, bytes]]:
+        """Reads the states and checks them with the end chunk
+
+        :return: iterator of (key, value)
+        """
+        digest = StateDigest()
+
+        while True:
+            chunk_type, payload = self._read_chunk()
+            if chunk_type == _CHUNK_END:
+                break
+
+            data = zlib.decompress(payload)
+            offset = 0
+            while offset < len(data):
+                size, = unpack_from('>I', data, offset)
+                key = data[offset + 4:offset + 4 + size]
+                offset += 4 + size
+
+                size, = unpack_from('>I', data, offset)
+                value = data[offset + 4:offset + 4 + size]
+                offset += 4 + size
+
+                digest.add(key, value)
+                yield key, value
+
+        count, = unpack_from('>Q', payload)
+        self.count, self.digest = count, payload[8:]
+        if (digest.count, digest.digest) != (self.count, self.digest):
+            raise DatabaseException('State file digest mismatch')
+
+    def _read_chunk(self) -> Tuple[int, bytes]:
+        header = self._fp.read(_CHUNK_HEADER.size)
+        if len(header) < _CHUNK_HEADER.size:
+            raise DatabaseException('Truncated state file')
+
+        chunk_type, size, crc = _CHUNK_HEADER.unpack(header)
+        payload = self._fp.read(size)
+        if len(payload) < size:
+            raise DatabaseException('Truncated state file')
+        if zlib.crc32(payload) != crc:
+            raise DatabaseException('Corrupted state file')
+        if chunk_type not in (_CHUNK_DATA, _CHUNK_END):
+            raise DatabaseException(f'Unknown chunk type: {chunk_type}')
+
+        return chunk_type, payload
+
+
+def export_state(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, bytes]:
+    """Streams all states in StateDB opened by ContextDatabaseFactory to a file
+
+    :param file_path: state file path
+    :param chunk_size: the size of states before compression in a data chunk
+    :return: (the number of states, digest)
+    """
+    with open(file_path, 'wb') as fp:
+        writer = StateFileWriter(fp, chunk_size)
+        for key, value in ContextDatabaseFactory.iterate_states():
+            writer.write(key, value)
+        count, digest = writer.close()
+
+    Logger.info(f'export_state: {file_path} count={count} digest={digest.hex()}', ICON_DB_LOG_TAG)
+    return count, digest
+
+
+def import_state(file_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[int, bytes]:
+    """Bulk-loads a state file into empty StateDB opened by ContextDatabaseFactory
+
+    The states are written in large batches without sync
+    and StateDB is verified with the digest in the file at the end.
+
+    :param file_path: state file path
+    :param batch_size: the size of states in a write batch
+    :return: (the number of states, digest)
+    """
+    if next(ContextDatabaseFactory.iterate_states(), None) is not None:
+        raise DatabaseException('StateDB is not empty')
+
+    batches: Dict['ContextDatabase', dict] = {}
+    size = 0
+
+    with open(file_path, 'rb') as fp:
+        reader = StateFileReader(fp)
+        for key, value in reader:
+            context_db = ContextDatabaseFactory.get_db_by_key(key)
+            batch = batches.get(context_db)
+            if batch is None:
+                batch = batches[context_db] = {}
+            batch[key] = value
+
+            size += len(key) + len(value)
+            if size >= batch_size:
+                _write_batches(batches)
+                size = 0
+
+        _write_batches(batches)
+
+    digest = StateDigest()
+    for key, value in ContextDatabaseFactory.iterate_states():
+        digest.add(key, value)
+    if (digest.count, digest.digest) != (reader.count, reader.digest):
+        raise DatabaseException(
+            f'StateDB digest mismatch: {digest.count} {digest.digest.hex()} != {reader.count} {reader.digest.hex()}')
+
+    Logger.info(f'import_state: {file_path} count={reader.count} digest={reader.digest.hex()}', ICON_DB_LOG_TAG)
+    return reader.count, reader.digest
+
+
+def _write_batches(batches: Dict['ContextDatabase', dict]) -> None:
+    for context_db, batch in batches.items():
+        context_db.key_value_db.write_batch(batch)
+    batches.clear()
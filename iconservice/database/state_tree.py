@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sparse Merkle tree which commits to all states in StateDB
+
+The path of a state is sha3_256(key) and a tree has 256 levels.
+A subtree which has only one leaf is replaced with the leaf and an empty subtree is EMPTY_HASH,
+so that the shape of the tree only depends on the set of states.
+
+- leaf: sha3_256(b'\\x00' | path | sha3_256(value))
+- branch: sha3_256(b'\\x01' | left | right)
+
+Nodes are stored in StateDB by their hashes and are never modified.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from ..base.exception import DatabaseException
+from ..icon_constant import DEFAULT_STATE_TREE_NODE_CACHE_SIZE
+from ..utils import sha3_256
+from .cache import LRUCache
+
+if TYPE_CHECKING:
+    from .db import ContextDatabase
+    from ..iconscore.icon_score_context import IconScoreContext
+
+EMPTY_HASH = bytes(32)
+
+STATE_TREE_PREFIX = b'smt|'
+# The root hash of the tree which commits to the last committed states
+STATE_TREE_ROOT_KEY = STATE_TREE_PREFIX + b'root'
+
+_LEAF = b'\x00'
+_BRANCH = b'\x01'
+_HASH_SIZE = 32
+
+
+def _get_bit(path: bytes, depth: int) -> int:
+    return (path[depth >> 3] >> (7 - (depth & 7))) & 1
+
+
+def _hash_leaf(path: bytes, value_hash: bytes) -> bytes:
+    return sha3_256(_LEAF + path + value_hash)
+
+
+def _hash_branch(left: bytes, right: bytes) -> bytes:
+    return sha3_256(_BRANCH + left + right)
+
+
+def _get_node_key(node_hash: bytes) -> bytes:
+    return STATE_TREE_PREFIX + node_hash
+
+
+class StateTree(object):
+    """Maintains the sparse Merkle tree of the states in a ContextDatabase
+
+    An update only creates the nodes on the paths of the changed states.
+    The nodes read from StateDB are kept in a size-bounded cache.
+    """
+
+    def __init__(self,
+                 context_db: 'ContextDatabase',
+                 node_cache_size: int = DEFAULT_STATE_TREE_NODE_CACHE_SIZE,
+                 excluded_keys: Iterable[bytes] = ()) -> None:
+        """Constructor
+
+        :param context_db: db where the nodes and the root hash are stored
+        :param node_cache_size: the max number of nodes to cache
+        :param excluded_keys: keys which are not committed to by the tree such as the last block info
+        """
+        self._db = context_db
+        self._node_cache = LRUCache(node_cache_size)
+        self._excluded_keys = frozenset(excluded_keys)
+
+    @property
+    def node_cache(self) -> 'LRUCache':
+        return self._node_cache
+
+    def is_tree_key(self, key: bytes) -> bool:
+        """Returns True if the state of a given key is committed to by the tree
+        """
+        return not key.startswith(STATE_TREE_PREFIX) and key not in self._excluded_keys
+
+    def get_root_hash(self, context: Optional['IconScoreContext'] = None) -> Optional[bytes]:
+        """Returns the root hash of the committed states
+
+        :param context: None for the latest states or a query context for its pinned snapshot
+        :return: None if the tree has never been built
+        """
+        return self._db.get(context, STATE_TREE_ROOT_KEY)
+
+    def update(self, root_hash: bytes, states: dict, parent_nodes: Optional[dict] = None) -> Tuple[bytes, dict]:
+        """Applies changed states to the tree without writing it
+
+        :param root_hash: the root hash of the tree to update
+        :param states: changed states. None or empty value means deletion
+        :param parent_nodes: nodes of uncommitted parent blocks which are not in StateDB yet
+        :return: (new root hash, new nodes to write to StateDB with the states)
+        """
+        items = sorted(
+            (sha3_256(key), sha3_256(value) if value else None)
+            for key, value in states.items() if self.is_tree_key(key))
+
+        inherited = {}
+        if parent_nodes:
+            for key, node in parent_nodes.items():
+                if key != STATE_TREE_ROOT_KEY:
+                    inherited[key[len(STATE_TREE_PREFIX):]] = node
+
+        nodes = dict(inherited)
+        new_root_hash = self._update(root_hash, 0, items, nodes)
+
+        new_nodes = {_get_node_key(node_hash): node for node_hash, node in nodes.items()
+                     if node_hash not in inherited}
+        new_nodes[STATE_TREE_ROOT_KEY] = new_root_hash
+        return new_root_hash, new_nodes
+
+    def on_commit(self, states: dict) -> None:
+        """Caches the nodes which have just been written to StateDB
+
+        :param states: the states written to StateDB
+        """
+        cache = self._node_cache
+        version: int = cache.version
+
+        for key, value in states.items():
+            if key.startswith(STATE_TREE_PREFIX) and key != STATE_TREE_ROOT_KEY:
+                cache.put(key, value, version)
+
+    def get_proof(self, key: bytes, context: Optional['IconScoreContext'] = None) -> dict:
+        """Returns the proof of the state of a given key
+
+        The proof shows either the leaf of the key or that the key is absent.
+
+        :param key:
+        :param context: None for the latest states or a query context for its pinned snapshot
+        :return: {'root': root hash, 'siblings': [sibling hashes from the root],
+            'leaf': {'path': path, 'valueHash': value hash} or None}
+        """
+        root_hash = self.get_root_hash(context)
+        if root_hash is None:
+            raise DatabaseException('State tree is not available')
+
+        path = sha3_256(key)
+        siblings = []
+        leaf = None
+        node_hash = root_hash
+
+        while node_hash != EMPTY_HASH:
+            node = self._get_node(node_hash, None, context)
+            if node[:1] == _LEAF:
+                leaf = {'path': node[1:1 + _HASH_SIZE], 'valueHash': node[1 + _HASH_SIZE:]}
+                break
+
+            left, right = node[1:1 + _HASH_SIZE], node[1 + _HASH_SIZE:]
+            if _get_bit(path, len(siblings)) == 0:
+                node_hash, sibling = left, right
+            else:
+                node_hash, sibling = right, left
+            siblings.append(sibling)
+
+        return {'root': root_hash, 'siblings': siblings, 'leaf': leaf}
+
+    def _update(self, node_hash: bytes, depth: int, items: List[tuple], nodes: dict) -> bytes:
+        """
+        :param node_hash: the subtree to update
+        :param depth: the depth of the subtree
+        :param items: sorted (path, value hash) under the subtree. None value hash means deletion
+        :param nodes: new nodes are put into it
+        :return: the hash of the updated subtree
+        """
+        if not items:
+            return node_hash
+
+        if node_hash == EMPTY_HASH:
+            return self._build(depth, [item for item in items if item[1] is not None], nodes)
+
+        node = self._get_node(node_hash, nodes)
+        if node[:1] == _LEAF:
+            path = node[1:1 + _HASH_SIZE]
+            leaves = [item for item in items if item[1] is not None]
+            if all(item[0] != path for item in items):
+                leaves.append((path, node[1 + _HASH_SIZE:]))
+                leaves.sort()
+            return self._build(depth, leaves, nodes)
+
+        index = _split(items, depth)
+        left = self._update(node[1:1 + _HASH_SIZE], depth + 1, items[:index], nodes)
+        right = self._update(node[1 + _HASH_SIZE:], depth + 1, items[index:], nodes)
+        return self._make_branch(left, right, nodes)
+
+    def _build(self, depth: int, leaves: List[tuple], nodes: dict) -> bytes:
+        """Builds a subtree from sorted leaves
+        """
+        if not leaves:
+            return EMPTY_HASH
+
+        if len(leaves) == 1:
+            path, value_hash = leaves[0]
+            node_hash = _hash_leaf(path, value_hash)
+            nodes[node_hash] = _LEAF + path + value_hash
+            return node_hash
+
+        index = _split(leaves, depth)
+        left = self._build(depth + 1, leaves[:index], nodes)
+        right = self._build(depth + 1, leaves[index:], nodes)
+        return self._make_branch(left, right, nodes)
+
+    def _make_branch(self, left: bytes, right: bytes, nodes: dict) -> bytes:
+        # A leaf without a sibling moves up to keep the tree compact
+        if right == EMPTY_HASH and (left == EMPTY_HASH or self._get_node(left, nodes)[:1] == _LEAF):
+            return left
+        if left == EMPTY_HASH and self._get_node(right, nodes)[:1] == _LEAF:
+            return right
+
+        node_hash = _hash_branch(left, right)
+        nodes[node_hash] = _BRANCH + left + right
+        return node_hash
+
+    def _get_node(self,
+                  node_hash: bytes,
+                  nodes: Optional[dict],
+                  context: Optional['IconScoreContext'] = None) -> bytes:
+        if nodes is not None and node_hash in nodes:
+            return nodes[node_hash]
+
+        key = _get_node_key(node_hash)
+        cache = self._node_cache
+        hit, node = cache.get(key)
+        if hit:
+            return node
+
+        version: int = cache.version
+        node = self._db.get(context, key)
+        if node is None:
+            raise DatabaseException(f'State tree node not found: {node_hash.hex()}')
+        cache.put(key, node, version)
+        return node
+
+
+def _split(items: List[tuple], depth: int) -> int:
+    """Returns the index of the first item whose path has 1 at depth
+    """
+    for i, item in enumerate(items):
+        if _get_bit(item[0], depth) == 1:
+            return i
+    return len(items)
+
+
+def verify_proof(root_hash: bytes, key: bytes, value: Optional[bytes], proof: dict) -> bool:
+    """Verifies the state of a key with a proof made by StateTree.get_proof()
+
+    :param root_hash: trusted root hash
+    :param key:
+    :param value: the state to verify. None means that the key is absent
+    :param proof: {'siblings': [...], 'leaf': {'path': ..., 'valueHash': ...} or None}
+    :return: True if the proof is valid
+    """
+    path = sha3_256(key)
+    siblings: List[bytes] = proof['siblings']
+    leaf: Optional[Dict[str, bytes]] = proof['leaf']
+    depth = len(siblings)
+
+    if leaf is None:
+        if value is not None:
+            return False
+        node_hash = EMPTY_HASH
+    else:
+        leaf_path, value_hash = leaf['path'], leaf['valueHash']
+        if value is None:
+            # Another leaf is at the place of the key
+            if leaf_path == path:
+                return False
+        elif leaf_path != path or value_hash != sha3_256(value):
+            return False
+
+        if any(_get_bit(leaf_path, i) != _get_bit(path, i) for i in range(depth)):
+            return False
+        node_hash = _hash_leaf(leaf_path, value_hash)
+
+    for i in reversed(range(depth)):
+        if _get_bit(path, i) == 0:
+            node_hash = _hash_branch(node_hash, siblings[i])
+        else:
+            node_hash = _hash_branch(siblings[i], node_hash)
+
+    return node_hash == root_hash
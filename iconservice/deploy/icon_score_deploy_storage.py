@@ -21,7 +21,7 @@ from typing import TYPE_CHECKING, Optional, Tuple
 from . import DeployType, DeployState
 from ..base.address import Address, ICON_EOA_ADDRESS_BYTES_SIZE, ICON_CONTRACT_ADDRESS_BYTES_SIZE
 from ..base.exception import ServerErrorException
-from ..icon_constant import DEFAULT_BYTE_SIZE, REVISION_2
+from ..icon_constant import DEFAULT_BYTE_SIZE, REVISION_2, ICON_DEPLOY_STORAGE_PREFIX
 from ..iconscore.icon_score_context_util import IconScoreContextUtil
 
 if TYPE_CHECKING:
@@ -207,7 +207,7 @@ class IconScoreDeployInfo(object):
 
 
 class IconScoreDeployStorage(object):
-    _DEPLOY_STORAGE_PREFIX = b'isds|'
+    _DEPLOY_STORAGE_PREFIX = ICON_DEPLOY_STORAGE_PREFIX
     _DEPLOY_STORAGE_DEPLOY_INFO_PREFIX = _DEPLOY_STORAGE_PREFIX + b'di|'
     _DEPLOY_STORAGE_DEPLOY_TX_PARAMS_PREFIX = _DEPLOY_STORAGE_PREFIX + b'dtp|'
 
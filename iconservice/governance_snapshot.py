@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+from typing import TYPE_CHECKING, Optional
+
+from iconcommons.logger import Logger
+
+from .base.address import GOVERNANCE_SCORE_ADDRESS
+from .base.exception import ServerErrorException
+from .icon_constant import ICON_SERVICE_LOG_TAG, IconScoreContextType, IconServiceFlag
+from .iconscore.icon_score_context import ContextContainer
+from .iconscore.icon_score_context_util import IconScoreContextUtil
+from .iconscore.icon_score_step import StepType
+
+if TYPE_CHECKING:
+    from .base.address import Address
+    from .iconscore.icon_score_context import IconScoreContext
+
+
+class GovernanceSnapshot(object):
+    """Governance parameters which the txs of a block see
+
+    They are read from the governance SCORE at once and shared by the txs
+    until a governance tx succeeds, instead of being loaded on every tx and every SCORE call.
+    A snapshot is never changed after it is made.
+    """
+
+    def __init__(self,
+                 revision: int,
+                 service_flag: int,
+                 score_black_list: Optional[frozenset],
+                 deployers: Optional[frozenset],
+                 step_price: int,
+                 step_costs: dict,
+                 max_step_limits: dict) -> None:
+        """Constructor
+
+        :param revision: revision code
+        :param service_flag: IconServiceFlag bits
+        :param score_black_list: SCORE addresses which can not be called.
+            None if the governance SCORE does not have the list
+        :param deployers: EOA addresses which can deploy SCOREs with the deployer white list on.
+            None if the governance SCORE does not have the list
+        :param step_price: step price. 0 with the fee service flag off
+        :param step_costs: StepType -> cost
+        :param max_step_limits: IconScoreContextType -> max step limit
+        """
+        self._revision = revision
+        self._service_flag = service_flag
+        self._score_black_list = score_black_list
+        self._deployers = deployers
+        self._step_price = step_price
+        self._step_costs = step_costs
+        self._max_step_limits = max_step_limits
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def service_flag(self) -> int:
+        return self._service_flag
+
+    @property
+    def step_price(self) -> int:
+        return self._step_price
+
+    @property
+    def step_costs(self) -> dict:
+        """Returns a copy so as not to change the snapshot
+        """
+        return dict(self._step_costs)
+
+    def get_max_step_limit(self, context_type: 'IconScoreContextType') -> int:
+        return self._max_step_limits.get(context_type, 0)
+
+    def is_service_flag_on(self, flag: 'IconServiceFlag') -> bool:
+        return self._service_flag & flag == flag
+
+    @property
+    def has_address_lists(self) -> bool:
+        """Returns True if the membership of the address lists can be checked with the snapshot
+        """
+        return self._score_black_list is not None and self._deployers is not None
+
+    def is_in_score_black_list(self, address: 'Address') -> bool:
+        return address in self._score_black_list
+
+    def is_deployer(self, address: 'Address') -> bool:
+        return address in self._deployers
+
+    @staticmethod
+    def from_context(context: 'IconScoreContext') -> 'GovernanceSnapshot':
+        """Reads the governance parameters on the states which a context sees
+
+        The reads are not charged to the tx of the context.
+
+        :param context: context whose tx_batch has no pending states
+        :return: snapshot
+        """
+        read_context = copy.copy(context)
+        read_context.step_counter = None
+
+        try:
+            ContextContainer._push_context(read_context)
+            governance = IconScoreContextUtil.get_icon_score(read_context, GOVERNANCE_SCORE_ADDRESS)
+            if governance is None:
+                raise ServerErrorException(f'governance_score is None')
+
+            revision = 0
+            if hasattr(governance, 'revision_code'):
+                revision = governance.revision_code
+
+            service_flag = context.icon_service_flag
+            try:
+                service_flag = governance.service_config
+            except AttributeError:
+                pass
+
+            step_price = 0
+            # Gets the step price if the fee flag is on
+            if service_flag & IconServiceFlag.FEE == IconServiceFlag.FEE:
+                step_price = governance.getStepPrice()
+
+            step_costs = {}
+            for key, value in governance.getStepCosts().items():
+                try:
+                    step_costs[StepType(key)] = value
+                except ValueError:
+                    # Pass the unknown step type
+                    pass
+
+            max_step_limits = {IconScoreContextType.INVOKE: governance.getMaxStepLimit("invoke"),
+                               IconScoreContextType.QUERY: governance.getMaxStepLimit("query")}
+
+            # The lists are read on demand with the governance SCORE which does not provide them
+            try:
+                score_black_list = governance.score_black_list
+                deployers = governance.deployers
+            except AttributeError:
+                Logger.info('No address lists in governance SCORE: read on demand', ICON_SERVICE_LOG_TAG)
+                score_black_list = deployers = None
+            else:
+                if not isinstance(score_black_list, frozenset) or not isinstance(deployers, frozenset):
+                    Logger.warning(f'Invalid address lists in governance SCORE: '
+                                   f'{type(score_black_list)}, {type(deployers)}: read on demand', ICON_SERVICE_LOG_TAG)
+                    score_black_list = deployers = None
+
+            return GovernanceSnapshot(revision,
+                                      service_flag,
+                                      score_black_list,
+                                      deployers,
+                                      step_price,
+                                      step_costs,
+                                      max_step_limits)
+        finally:
+            ContextContainer._pop_context()
+
@@ -11,7 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from .icon_constant import ConfigKey
+from .icon_constant import ConfigKey, DEFAULT_STATE_DB_CACHE_SIZE, DEFAULT_QUERY_THREAD_COUNT, \
+    DEFAULT_SCORE_DB_SHARD_COUNT, DEFAULT_STATE_TREE_NODE_CACHE_SIZE
 
 
 default_icon_config = {
@@ -24,6 +25,42 @@ default_icon_config = {
     ConfigKey.AMQP_KEY: "7100",
     ConfigKey.AMQP_TARGET: "127.0.0.1",
     ConfigKey.BUILTIN_SCORE_OWNER: "hxebf3a409845cd09dcb5af31ed5be5e34e2af9433",
+    ConfigKey.STATE_DB_CACHE_SIZE: DEFAULT_STATE_DB_CACHE_SIZE,
+    ConfigKey.QUERY_THREAD_COUNT: DEFAULT_QUERY_THREAD_COUNT,
+    # The number of threads which execute the txs of a block speculatively. 0 disables it
+    ConfigKey.INVOKE_THREAD_COUNT: 0,
+    ConfigKey.DB_BACKEND: "leveldb",
+    ConfigKey.ASYNC_COMMIT: False,
+    ConfigKey.MULTIPLE_DB: False,
+    ConfigKey.SCORE_DB_SHARD_COUNT: DEFAULT_SCORE_DB_SHARD_COUNT,
+    # The number of the last committed blocks which can be reverted. 0 disables it
+    ConfigKey.REVERSE_DIFF_BLOCKS: 0,
+    # The same values as the defaults of LevelDB
+    ConfigKey.LEVEL_DB: {
+        ConfigKey.LEVEL_DB_BLOCK_CACHE_SIZE: 8 * 1024 * 1024,
+        ConfigKey.LEVEL_DB_WRITE_BUFFER_SIZE: 4 * 1024 * 1024,
+        ConfigKey.LEVEL_DB_BLOOM_FILTER_BITS: 0,
+        ConfigKey.LEVEL_DB_MAX_OPEN_FILES: 1000,
+        ConfigKey.LEVEL_DB_COMPRESSION: "snappy"
+    },
+    # 0 disables each trigger. Compaction can still be requested through the message queue
+    ConfigKey.DB_MAINTENANCE: {
+        ConfigKey.DB_MAINTENANCE_COMPACTION_BLOCK_INTERVAL: 0,
+        ConfigKey.DB_MAINTENANCE_COMPACTION_IDLE_TIME: 0
+    },
+    # Sparse Merkle tree of all states which serves state proofs
+    ConfigKey.STATE_TREE: {
+        ConfigKey.STATE_TREE_ENABLED: False,
+        ConfigKey.STATE_TREE_NODE_CACHE_SIZE: DEFAULT_STATE_TREE_NODE_CACHE_SIZE
+    },
+    # Candidate blocks beyond the memory budget(bytes) are spilled to the path.
+    # 0 disables spilling and an empty path means a temporary directory.
+    # With persist, candidate blocks survive a restart
+    ConfigKey.PRECOMMIT: {
+        ConfigKey.PRECOMMIT_MEMORY_BUDGET: 0,
+        ConfigKey.PRECOMMIT_SPILL_PATH: "",
+        ConfigKey.PRECOMMIT_PERSIST: False
+    },
     ConfigKey.SERVICE: {
         ConfigKey.SERVICE_FEE: False,
         ConfigKey.SERVICE_AUDIT: False,
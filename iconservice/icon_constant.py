@@ -40,6 +40,26 @@ MAX_EXTERNAL_CALL_COUNT = 1 + 1024
 MAX_CALL_STACK_SIZE = 64
 
 ICON_DEX_DB_NAME = 'icon_dex'
+# Names of the dbs for deploy storage and SCORE states in MULTIPLE_DB mode
+ICON_DEPLOY_DB_NAME = 'deploy'
+ICON_SCORE_DB_NAME_FORMAT = 'score_{index}'
+# Directory in the state db root path where precommit data are persisted
+PRECOMMIT_DIR_NAME = 'precommit'
+# Name of the db for the reverse diffs of committed blocks
+REVERSE_DIFF_DB_NAME = 'reverse_diff'
+# Prefix of the keys in deploy storage
+ICON_DEPLOY_STORAGE_PREFIX = b'isds|'
+
+# The max number of items in the read cache of StateDB
+DEFAULT_STATE_DB_CACHE_SIZE = 100_000
+
+# The number of dbs which SCORE states are hashed into in MULTIPLE_DB mode
+DEFAULT_SCORE_DB_SHARD_COUNT = 1
+# The max number of the state tree nodes to cache
+DEFAULT_STATE_TREE_NODE_CACHE_SIZE = 100_000
+
+# The number of threads which handle queries
+DEFAULT_QUERY_THREAD_COUNT = 4
 
 ICX_TRANSFER_EVENT_LOG = 'ICXTransfer(Address,Address,int)'
 
@@ -54,6 +74,8 @@ BUILTIN_SCORE_ADDRESS_MAPPER = {'governance': "cx0000000000000000000000000000000
 
 REVISION_2 = 2
 REVISION_3 = 3
+# Address lists of the governance SCORE are read from the snapshot of a block without GET steps
+REVISION_4 = 4
 
 
 class ConfigKey:
@@ -70,6 +92,30 @@ class ConfigKey:
     AMQP_TARGET = 'amqpTarget'
     CONFIG = 'config'
     TBEARS_MODE = 'tbearsMode'
+    STATE_DB_CACHE_SIZE = 'stateDbCacheSize'
+    QUERY_THREAD_COUNT = 'queryThreadCount'
+    INVOKE_THREAD_COUNT = 'invokeThreadCount'
+    DB_BACKEND = 'dbBackend'
+    ASYNC_COMMIT = 'asyncCommit'
+    MULTIPLE_DB = 'multipleDb'
+    SCORE_DB_SHARD_COUNT = 'scoreDbShardCount'
+    LEVEL_DB = 'levelDb'
+    LEVEL_DB_BLOCK_CACHE_SIZE = 'blockCacheSize'
+    LEVEL_DB_WRITE_BUFFER_SIZE = 'writeBufferSize'
+    LEVEL_DB_BLOOM_FILTER_BITS = 'bloomFilterBits'
+    LEVEL_DB_MAX_OPEN_FILES = 'maxOpenFiles'
+    LEVEL_DB_COMPRESSION = 'compression'
+    DB_MAINTENANCE = 'dbMaintenance'
+    DB_MAINTENANCE_COMPACTION_BLOCK_INTERVAL = 'compactionBlockInterval'
+    DB_MAINTENANCE_COMPACTION_IDLE_TIME = 'compactionIdleTime'
+    STATE_TREE = 'stateTree'
+    STATE_TREE_ENABLED = 'enabled'
+    STATE_TREE_NODE_CACHE_SIZE = 'nodeCacheSize'
+    PRECOMMIT = 'precommit'
+    PRECOMMIT_MEMORY_BUDGET = 'memoryBudget'
+    PRECOMMIT_SPILL_PATH = 'spillPath'
+    PRECOMMIT_PERSIST = 'persist'
+    REVERSE_DIFF_BLOCKS = 'reverseDiffBlocks'
 
 
 class EnableThreadFlag(IntFlag):
@@ -24,8 +24,9 @@ from iconservice.base.block import Block
 from iconservice.base.exception import ExceptionCode, IconServiceBaseException
 from iconservice.base.type_converter import TypeConverter, ParamType
 from iconservice.icon_constant import ICON_INNER_LOG_TAG, ICON_SERVICE_LOG_TAG, \
-    EnableThreadFlag, ENABLE_THREAD_FLAG
+    EnableThreadFlag, ENABLE_THREAD_FLAG, ConfigKey, DEFAULT_QUERY_THREAD_COUNT
 from iconservice.icon_service_engine import IconServiceEngine
+from iconservice.query_worker_pool import QueryWorkerPool
 from iconservice.utils import check_error_response, to_camel_case
 
 if TYPE_CHECKING:
@@ -45,8 +46,11 @@ class IconScoreInnerTask(object):
         self._icon_service_engine = IconServiceEngine()
         self._open()
 
+        query_thread_count: int = self._conf.get(ConfigKey.QUERY_THREAD_COUNT, DEFAULT_QUERY_THREAD_COUNT)
+        Logger.info(f'query thread count: {query_thread_count}', ICON_INNER_LOG_TAG)
+
         self._thread_pool = {THREAD_INVOKE: ThreadPoolExecutor(1),
-                             THREAD_QUERY: ThreadPoolExecutor(1),
+                             THREAD_QUERY: QueryWorkerPool(query_thread_count),
                              THREAD_VALIDATE: ThreadPoolExecutor(1)}
 
     def _open(self):
@@ -124,9 +128,11 @@ class IconScoreInnerTask(object):
     async def query(self, request: dict):
         Logger.info(f'query request with {request}', ICON_INNER_LOG_TAG)
         if self._is_thread_flag_on(EnableThreadFlag.QUERY):
+            query_pool: 'QueryWorkerPool' = self._thread_pool[THREAD_QUERY]
+            Logger.debug(f'query queue depths: {query_pool.queue_depths}', ICON_INNER_LOG_TAG)
+
             loop = get_event_loop()
-            return await loop.run_in_executor(self._thread_pool[THREAD_QUERY],
-                                              self._query, request)
+            return await loop.run_in_executor(query_pool, self._query, request)
         else:
             return self._query(request)
 
@@ -239,6 +245,82 @@ class IconScoreInnerTask(object):
             Logger.info(f'pre_validate_check response with {response}', ICON_INNER_LOG_TAG)
             return response
 
+    @message_queue_task
+    async def compact_db(self):
+        Logger.info('compact_db request', ICON_INNER_LOG_TAG)
+        return self._compact_db()
+
+    def _compact_db(self):
+        response = None
+        try:
+            # It only wakes up the compaction thread
+            self._icon_service_engine.compact_db()
+            response = MakeResponse.make_response(ExceptionCode.OK)
+        except IconServiceBaseException as icon_e:
+            self._log_exception(icon_e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(icon_e.code, icon_e.message)
+        except Exception as e:
+            self._log_exception(e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(ExceptionCode.SERVER_ERROR, str(e))
+        finally:
+            Logger.info(f'compact_db response with {response}', ICON_INNER_LOG_TAG)
+            return response
+
+    @message_queue_task
+    async def get_db_stats(self):
+        Logger.info('get_db_stats request', ICON_INNER_LOG_TAG)
+        if self._is_thread_flag_on(EnableThreadFlag.QUERY):
+            loop = get_event_loop()
+            return await loop.run_in_executor(self._thread_pool[THREAD_QUERY], self._get_db_stats)
+        else:
+            return self._get_db_stats()
+
+    def _get_db_stats(self):
+        response = None
+        try:
+            stats = self._icon_service_engine.get_db_stats()
+            response = MakeResponse.make_response(stats)
+        except IconServiceBaseException as icon_e:
+            self._log_exception(icon_e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(icon_e.code, icon_e.message)
+        except Exception as e:
+            self._log_exception(e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(ExceptionCode.SERVER_ERROR, str(e))
+        finally:
+            Logger.info(f'get_db_stats response with {response}', ICON_INNER_LOG_TAG)
+            return response
+
+    @message_queue_task
+    async def get_state_proof(self, params: dict):
+        Logger.info(f'get_state_proof request with {params}', ICON_INNER_LOG_TAG)
+        if self._is_thread_flag_on(EnableThreadFlag.QUERY):
+            loop = get_event_loop()
+            return await loop.run_in_executor(self._thread_pool[THREAD_QUERY], self._get_state_proof, params)
+        else:
+            return self._get_state_proof(params)
+
+    def _get_state_proof(self, params: dict):
+        response = None
+        try:
+            converted_params = TypeConverter.convert(params, ParamType.GET_STATE_PROOF)
+            # The key of an account is its address
+            if 'address' in converted_params:
+                key: bytes = converted_params['address'].to_bytes()
+            else:
+                key: bytes = converted_params['key']
+
+            proof = self._icon_service_engine.get_state_proof(key)
+            response = MakeResponse.make_response(proof)
+        except IconServiceBaseException as icon_e:
+            self._log_exception(icon_e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(icon_e.code, icon_e.message)
+        except Exception as e:
+            self._log_exception(e, ICON_SERVICE_LOG_TAG)
+            response = MakeResponse.make_error_response(ExceptionCode.SERVER_ERROR, str(e))
+        finally:
+            Logger.info(f'get_state_proof response with {response}', ICON_INNER_LOG_TAG)
+            return response
+
     @message_queue_task
     async def change_block_hash(self, params):
         return ExceptionCode.OK
@@ -16,15 +16,21 @@
 
 import argparse
 import asyncio
+import json
 import subprocess
 import sys
 from enum import IntEnum
-from typing import TYPE_CHECKING
+from os import makedirs
+from typing import TYPE_CHECKING, Optional
 
 from iconcommons.icon_config import IconConfig
 from iconcommons.logger import Logger
+from iconservice.database.backend import BackendType
+from iconservice.database.factory import ContextDatabaseFactory
 from iconservice.icon_config import default_icon_config
-from iconservice.icon_constant import ICON_SCORE_QUEUE_NAME_FORMAT, ICON_SERVICE_PROCTITLE_FORMAT, ConfigKey
+from iconservice.icon_constant import ICON_SCORE_QUEUE_NAME_FORMAT, ICON_SERVICE_PROCTITLE_FORMAT, ConfigKey, \
+    ICON_DEX_DB_NAME, REVERSE_DIFF_DB_NAME
+from iconservice.icx.icx_storage import IcxStorage
 
 if TYPE_CHECKING:
     from .icon_inner_service import IconScoreInnerStub
@@ -35,6 +41,7 @@ ICON_SERVICE_CLI = 'IconServiceCli'
 class ExitCode(IntEnum):
     SUCCEEDED = 0
     COMMAND_IS_WRONG = 1
+    FAILED = 2
 
 
 def main():
@@ -45,6 +52,10 @@ def main():
     iconservice commands:
         start : iconservice start
         stop : iconservice stop
+        export : export StateDB to a state file while iconservice is stopped
+        import : import a state file to empty StateDB while iconservice is stopped
+        inspect : print key space statistics of StateDB per SCORE while iconservice is stopped
+        revert : revert the last committed blocks with their reverse diffs while iconservice is stopped
 
         -c : json configure file path
         -sc : icon score root path ex).score
@@ -54,12 +65,15 @@ def main():
         -ch : loopchain channel ex) loopchain_default
         -fg : foreground process
         -tbears : tbears mode
+        -f : state file path for export and import, report file path for inspect
+        -n : the number of SCOREs with the most keys to report for inspect
+        -b : the number of blocks to revert
     """)
 
     parser.add_argument('command', type=str,
                         nargs='*',
-                        choices=['start', 'stop'],
-                        help='iconservice type [start|stop]')
+                        choices=['start', 'stop', 'export', 'import', 'inspect', 'revert'],
+                        help='iconservice type [start|stop|export|import|inspect|revert]')
     parser.add_argument("-sc", dest=ConfigKey.SCORE_ROOT_PATH, type=str, default=None,
                         help="icon score root path  example : .score")
     parser.add_argument("-st", dest=ConfigKey.STATE_DB_ROOT_PATH, type=str, default=None,
@@ -76,6 +90,12 @@ def main():
                         help="icon score service run foreground")
     parser.add_argument("-tbears", dest=ConfigKey.TBEARS_MODE, action='store_true',
                         help="tbears mode")
+    parser.add_argument("-f", dest='stateFile', type=str, default=None,
+                        help="state file path for export and import  example : state.dat")
+    parser.add_argument("-n", dest='top', type=int, default=20,
+                        help="the number of SCOREs to report for inspect")
+    parser.add_argument("-b", dest='blockCount', type=int, default=1,
+                        help="the number of blocks to revert")
 
     args = parser.parse_args()
 
@@ -102,6 +122,14 @@ def main():
         result = _start(conf)
     elif command == 'stop' and len(args.command) == 1:
         result = _stop(conf)
+    elif command == 'export' and len(args.command) == 1 and args.stateFile:
+        result = _export_state(conf, args.stateFile)
+    elif command == 'import' and len(args.command) == 1 and args.stateFile:
+        result = _import_state(conf, args.stateFile)
+    elif command == 'inspect' and len(args.command) == 1:
+        result = _inspect_state(conf, args.stateFile, args.top)
+    elif command == 'revert' and len(args.command) == 1:
+        result = _revert_blocks(conf, args.blockCount)
     else:
         parser.print_help()
         result = ExitCode.COMMAND_IS_WRONG.value
@@ -127,6 +155,124 @@ def _stop(conf: 'IconConfig') -> int:
     return ExitCode.SUCCEEDED
 
 
+def _export_state(conf: 'IconConfig', file_path: str) -> int:
+    from .database.state_file import export_state
+
+    if _is_running_icon_service(conf):
+        print('stop iconservice before export')
+        return ExitCode.COMMAND_IS_WRONG
+
+    ContextDatabaseFactory.open_by_config(conf)
+    try:
+        block_height = _get_last_block_height()
+        count, digest = export_state(file_path)
+    except BaseException as e:
+        Logger.exception(e, ICON_SERVICE_CLI)
+        print(f'export failed: {e}')
+        return ExitCode.FAILED
+    finally:
+        ContextDatabaseFactory.close()
+
+    print(f'exported {count} states at block {block_height}: digest={digest.hex()}')
+    Logger.info(f'export_command done!', ICON_SERVICE_CLI)
+    return ExitCode.SUCCEEDED
+
+
+def _import_state(conf: 'IconConfig', file_path: str) -> int:
+    from .database.state_file import import_state
+
+    if _is_running_icon_service(conf):
+        print('stop iconservice before import')
+        return ExitCode.COMMAND_IS_WRONG
+
+    makedirs(conf[ConfigKey.STATE_DB_ROOT_PATH], exist_ok=True)
+    ContextDatabaseFactory.open_by_config(conf)
+    try:
+        count, digest = import_state(file_path)
+        block_height = _get_last_block_height()
+    except BaseException as e:
+        Logger.exception(e, ICON_SERVICE_CLI)
+        print(f'import failed: {e}')
+        return ExitCode.FAILED
+    finally:
+        ContextDatabaseFactory.close()
+
+    print(f'imported {count} states at block {block_height}: digest={digest.hex()}')
+    Logger.info(f'import_command done!', ICON_SERVICE_CLI)
+    return ExitCode.SUCCEEDED
+
+
+def _inspect_state(conf: 'IconConfig', file_path: Optional[str], top: int) -> int:
+    from .database.inspector import inspect_state
+
+    if _is_running_icon_service(conf):
+        print('stop iconservice before inspect')
+        return ExitCode.COMMAND_IS_WRONG
+
+    ContextDatabaseFactory.open_by_config(conf)
+    try:
+        report = inspect_state(top=top)
+    except BaseException as e:
+        Logger.exception(e, ICON_SERVICE_CLI)
+        print(f'inspect failed: {e}')
+        return ExitCode.FAILED
+    finally:
+        ContextDatabaseFactory.close()
+
+    text = json.dumps(report, indent=2)
+    if file_path:
+        with open(file_path, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    Logger.info(f'inspect_command done!', ICON_SERVICE_CLI)
+    return ExitCode.SUCCEEDED
+
+
+def _revert_blocks(conf: 'IconConfig', count: int) -> int:
+    from .base.exception import DatabaseException
+    from .database.journal import ReverseDiffJournal
+    from .iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+
+    if _is_running_icon_service(conf):
+        print('stop iconservice before revert')
+        return ExitCode.COMMAND_IS_WRONG
+
+    state_db_root_path: str = conf[ConfigKey.STATE_DB_ROOT_PATH].rstrip('/')
+    ContextDatabaseFactory.open_by_config(conf)
+    journal = ReverseDiffJournal.from_path(
+        f'{state_db_root_path}/{REVERSE_DIFF_DB_NAME}',
+        conf.get(ConfigKey.REVERSE_DIFF_BLOCKS, 0),
+        conf.get(ConfigKey.DB_BACKEND, BackendType.LEVELDB))
+    try:
+        storage = IcxStorage(ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME))
+        context = IconScoreContext(IconScoreContextType.DIRECT)
+
+        for _ in range(count):
+            storage.load_last_block_info(None)
+            if storage.last_block is None:
+                raise DatabaseException('No block to revert')
+            journal.revert(context, storage.last_block)
+            print(f'reverted block {storage.last_block.height}: 0x{storage.last_block.hash.hex()}')
+    except BaseException as e:
+        Logger.exception(e, ICON_SERVICE_CLI)
+        print(f'revert failed: {e}')
+        return ExitCode.FAILED
+    finally:
+        journal.close()
+        ContextDatabaseFactory.close()
+
+    Logger.info(f'revert_command done!', ICON_SERVICE_CLI)
+    return ExitCode.SUCCEEDED
+
+
+def _get_last_block_height() -> Optional[int]:
+    storage = IcxStorage(ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME))
+    storage.load_last_block_info(None)
+    return None if storage.last_block is None else storage.last_block.height
+
+
 def _start_process(conf: 'IconConfig'):
     Logger.info('start_server() start')
     python_module_string = 'iconservice.icon_service'
@@ -14,6 +14,9 @@
 # limitations under the License.
 
 
+import copy
+from collections import OrderedDict
+from concurrent.futures.thread import ThreadPoolExecutor
 from math import ceil
 from os import makedirs
 from typing import TYPE_CHECKING, List, Any, Optional
@@ -27,12 +30,19 @@ from .base.exception import ExceptionCode, RevertException, ScoreErrorException
 from .base.exception import IconServiceBaseException, ServerErrorException
 from .base.message import Message
 from .base.transaction import Transaction
+from .database.backend import BackendType
 from .database.batch import BlockBatch, TransactionBatch
 from .database.factory import ContextDatabaseFactory
+from .database.journal import ReverseDiffJournal, make_reverse_diff
+from .database.maintenance import CompactionScheduler
+from .database.state_tree import StateTree, EMPTY_HASH, STATE_TREE_ROOT_KEY
 from .deploy.icon_builtin_score_loader import IconBuiltinScoreLoader
 from .deploy.icon_score_deploy_engine import IconScoreDeployEngine
 from .deploy.icon_score_deploy_storage import IconScoreDeployStorage
-from .icon_constant import ICON_DEX_DB_NAME, ICON_SERVICE_LOG_TAG, IconServiceFlag, ConfigKey
+from .governance_snapshot import GovernanceSnapshot
+from .icon_constant import ICON_DEX_DB_NAME, ICON_SERVICE_LOG_TAG, IconServiceFlag, ConfigKey, \
+    ICON_DEPLOY_DB_NAME, DEFAULT_STATE_TREE_NODE_CACHE_SIZE, PRECOMMIT_DIR_NAME, REVERSE_DIFF_DB_NAME, \
+    ICON_DEPLOY_STORAGE_PREFIX
 from .iconscore.icon_pre_validator import IconPreValidator
 from .iconscore.icon_score_context import IconScoreContext, IconScoreFuncType, ContextContainer
 from .iconscore.icon_score_context import IconScoreContextType
@@ -47,7 +57,8 @@ from .iconscore.icon_score_trace import Trace, TraceType
 from .icx.icx_account import AccountType
 from .icx.icx_engine import IcxEngine
 from .icx.icx_storage import IcxStorage
-from .precommit_data_manager import PrecommitData, PrecommitDataManager, PrecommitFlag
+from .parallel_invoker import ParallelInvoker, Speculation, is_speculative
+from .precommit_data_manager import PrecommitData, PrecommitDataManager, PrecommitFlag, TransactionCheckpoint
 from .utils import byte_length_of_int
 from .utils import is_lowercase_hex_string
 from .utils import sha3_256, int_to_bytes
@@ -56,7 +67,6 @@ from .utils.bloom import BloomFilter
 
 if TYPE_CHECKING:
     from .iconscore.icon_score_event_log import EventLog
-    from .builtin_scores.governance.governance import Governance
     from iconcommons.icon_config import IconConfig
 
 
@@ -67,6 +77,9 @@ class IconServiceEngine(ContextContainer):
     It is contained in IconInnerService.
     """
 
+    # The number of states applied to the state tree at once when it is built
+    _STATE_TREE_BUILD_BATCH_SIZE = 100_000
+
     def __init__(self) -> None:
         """Constructor
 
@@ -79,6 +92,18 @@ class IconServiceEngine(ContextContainer):
         self._icon_score_deploy_engine = None
         self._step_counter_factory = None
         self._icon_pre_validator = None
+        # (last committed block, db snapshots) pinned by query contexts
+        self._committed_snapshot: tuple = (None, {}, None)
+        # Governance parameters of the last committed block
+        self._governance_snapshot: Optional['GovernanceSnapshot'] = None
+        # Background writer for asynchronous commit. None means synchronous commit
+        self._commit_executor: Optional['ThreadPoolExecutor'] = None
+        self._compaction_scheduler: Optional['CompactionScheduler'] = None
+        # Sparse Merkle tree of all states. None if it is disabled
+        self._state_tree: Optional['StateTree'] = None
+        # Reverse diffs of the last committed blocks. None if it is disabled
+        self._reverse_diff_journal: Optional['ReverseDiffJournal'] = None
+        self._parallel_invoker: Optional['ParallelInvoker'] = None
 
         # JSON-RPC handlers
         self._handlers = {
@@ -107,16 +132,15 @@ class IconServiceEngine(ContextContainer):
         makedirs(score_root_path, exist_ok=True)
         makedirs(state_db_root_path, exist_ok=True)
 
-        # Share one context db with all SCOREs
-        ContextDatabaseFactory.open(
-            state_db_root_path, ContextDatabaseFactory.Mode.SINGLE_DB)
+        ContextDatabaseFactory.open_by_config(self._conf)
 
         self._icx_engine = IcxEngine()
         self._icon_score_deploy_engine = IconScoreDeployEngine()
 
         self._icx_context_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
         self._icx_storage = IcxStorage(self._icx_context_db)
-        icon_score_deploy_storage = IconScoreDeployStorage(self._icx_context_db)
+        icon_score_deploy_storage = IconScoreDeployStorage(
+            ContextDatabaseFactory.create_by_name(ICON_DEPLOY_DB_NAME))
 
         IconScoreMapper.icon_score_loader = IconScoreLoader(score_root_path)
         IconScoreMapper.deploy_storage = icon_score_deploy_storage
@@ -140,7 +164,118 @@ class IconServiceEngine(ContextContainer):
         self._load_builtin_scores()
         self._init_global_value_by_governance_score()
 
+        state_tree_conf: dict = self._conf.get(ConfigKey.STATE_TREE) or {}
+        if state_tree_conf.get(ConfigKey.STATE_TREE_ENABLED, False):
+            self._open_state_tree(state_tree_conf)
+
         self._precommit_data_manager.last_block = self._icx_storage.last_block
+        self._take_committed_snapshot()
+
+        reverse_diff_blocks: int = self._conf.get(ConfigKey.REVERSE_DIFF_BLOCKS, 0)
+        if reverse_diff_blocks > 0:
+            self._reverse_diff_journal = ReverseDiffJournal.from_path(
+                f'{state_db_root_path}/{REVERSE_DIFF_DB_NAME}',
+                reverse_diff_blocks,
+                self._conf.get(ConfigKey.DB_BACKEND, BackendType.LEVELDB))
+            self._reverse_diff_journal.discard_uncommitted(self._icx_storage.last_block)
+
+        precommit_conf: dict = self._conf.get(ConfigKey.PRECOMMIT) or {}
+        self._precommit_data_manager.open_spill_store(
+            precommit_conf.get(ConfigKey.PRECOMMIT_MEMORY_BUDGET, 0),
+            precommit_conf.get(ConfigKey.PRECOMMIT_SPILL_PATH, ''))
+        if precommit_conf.get(ConfigKey.PRECOMMIT_PERSIST, False):
+            # Candidate blocks invoked before a restart need not be invoked again
+            count: int = self._precommit_data_manager.open_store(
+                f'{state_db_root_path}/{PRECOMMIT_DIR_NAME}', self._load_score_mapper)
+            Logger.info(f'{count} precommit data restored', ICON_SERVICE_LOG_TAG)
+
+        invoke_thread_count: int = self._conf.get(ConfigKey.INVOKE_THREAD_COUNT, 0)
+        if invoke_thread_count > 0:
+            Logger.info(f'parallel invoke enabled: {invoke_thread_count} threads', ICON_SERVICE_LOG_TAG)
+            self._parallel_invoker = ParallelInvoker(invoke_thread_count)
+
+        if self._conf.get(ConfigKey.ASYNC_COMMIT, False):
+            Logger.info('async commit enabled', ICON_SERVICE_LOG_TAG)
+            self._commit_executor = ThreadPoolExecutor(1, thread_name_prefix='commit')
+
+        maintenance_conf: dict = self._conf.get(ConfigKey.DB_MAINTENANCE) or {}
+        self._compaction_scheduler = CompactionScheduler(
+            ContextDatabaseFactory.get_key_value_dbs,
+            maintenance_conf.get(ConfigKey.DB_MAINTENANCE_COMPACTION_BLOCK_INTERVAL, 0),
+            maintenance_conf.get(ConfigKey.DB_MAINTENANCE_COMPACTION_IDLE_TIME, 0))
+        self._compaction_scheduler.start()
+
+    @staticmethod
+    def _load_score_mapper(scores: list) -> 'IconScoreMapper':
+        """Loads the SCOREs deployed in a restored candidate block
+
+        :param scores: [(score address, tx hash)]
+        :return: IconScoreMapper for PrecommitData
+        """
+        score_mapper = IconScoreMapper()
+        for address, tx_hash in scores:
+            score_mapper.put_score_info(address, score_mapper.load_score(address, tx_hash), tx_hash)
+        return score_mapper
+
+    def _open_state_tree(self, state_tree_conf: dict) -> None:
+        """Opens the state tree and builds it from all states in StateDB if it has never been built
+
+        :param state_tree_conf:
+        """
+        self._state_tree = StateTree(
+            self._icx_context_db,
+            state_tree_conf.get(ConfigKey.STATE_TREE_NODE_CACHE_SIZE, DEFAULT_STATE_TREE_NODE_CACHE_SIZE),
+            (IcxStorage.LAST_BLOCK_KEY,))
+
+        if self._state_tree.get_root_hash() is not None:
+            return
+
+        Logger.info('Building state tree', ICON_SERVICE_LOG_TAG)
+        context = IconScoreContext(IconScoreContextType.DIRECT)
+        root_hash = EMPTY_HASH
+        states = {}
+
+        for key, value in ContextDatabaseFactory.iterate_states():
+            if self._state_tree.is_tree_key(key):
+                states[key] = value
+
+            if len(states) >= self._STATE_TREE_BUILD_BATCH_SIZE:
+                root_hash = self._write_state_tree_nodes(context, root_hash, states)
+                states.clear()
+
+        root_hash = self._write_state_tree_nodes(context, root_hash, states)
+        # The root is written last not to leave a half-built tree behind on failure
+        ContextDatabaseFactory.write_batch(context, {STATE_TREE_ROOT_KEY: root_hash})
+        Logger.info(f'State tree built: root={root_hash.hex()}', ICON_SERVICE_LOG_TAG)
+
+    def _write_state_tree_nodes(self, context: 'IconScoreContext', root_hash: bytes, states: dict) -> bytes:
+        root_hash, nodes = self._state_tree.update(root_hash, states)
+        del nodes[STATE_TREE_ROOT_KEY]
+        ContextDatabaseFactory.write_batch(context, nodes)
+        return root_hash
+
+    def _take_committed_snapshot(self) -> None:
+        """Publishes the committed states to query contexts
+
+        It is called on the thread which writes states to StateDB after every commit.
+        Queries pin the published snapshots, so that they never see a partially written block
+        and can run in parallel with invoke and commit.
+        """
+        block = self._icx_storage.last_block
+        snapshots = ContextDatabaseFactory.take_snapshots()
+        self._committed_snapshot = (block, snapshots, self._governance_snapshot)
+
+    def _pin_committed_snapshot(self, context: 'IconScoreContext') -> 'Block':
+        """Pins the last committed snapshot to a given context
+        with the governance parameters of the last committed block
+
+        :param context:
+        :return: the last committed block
+        """
+        block, snapshots, governance_snapshot = self._committed_snapshot
+        context.db_snapshots = snapshots
+        self._set_governance_snapshot(context, governance_snapshot)
+        return block
 
     @staticmethod
     def _make_service_flag(flag_table: dict) -> int:
@@ -163,76 +298,38 @@ class IconServiceEngine(ContextContainer):
         finally:
             self._pop_context()
 
-    def _init_global_value_by_governance_score(self):
+    def _init_global_value_by_governance_score(self, snapshot: Optional['GovernanceSnapshot'] = None):
         """Initialize step_counter_factory with parameters
         managed by governance SCORE
 
+        :param snapshot: the governance parameters which have been read in the last committed block
         :return:
         """
-        context = IconScoreContext(IconScoreContextType.QUERY)
-        # Clarifies that This Context does not count steps
-        context.step_counter = None
-
-        try:
-            self._push_context(context)
-            # Gets the governance SCORE
-            governance_score = self._get_governance_score(context)
-
-            step_price = self._get_step_price_from_governance(context, governance_score)
-            step_costs = self._get_step_costs_from_governance(governance_score)
-            max_step_limits = self._get_step_max_limits_from_governance(governance_score)
-
-            # Keep properties into the counter factory
-            self._step_counter_factory.set_step_properties(
-                step_price, step_costs, max_step_limits)
-
-        finally:
-            self._pop_context()
-
-    def _set_revision_to_context(self, context):
-        try:
-            self._push_context(context)
-            governance_score = self._get_governance_score(context)
-            if hasattr(governance_score, 'revision_code'):
-                context.revision = governance_score.revision_code
-        finally:
-            self._pop_context()
-
-    @staticmethod
-    def _get_governance_score(context) -> 'Governance':
-        governance_score: 'Governance' = IconScoreContextUtil.get_icon_score(
-            context, GOVERNANCE_SCORE_ADDRESS)
-        if governance_score is None:
-            raise ServerErrorException(f'governance_score is None')
-        return governance_score
-
-    @staticmethod
-    def _get_step_price_from_governance(context: 'IconScoreContext', governance) -> int:
-        step_price = 0
-        # Gets the step price if the fee flag is on
-        if IconScoreContextUtil.is_service_flag_on(context, IconServiceFlag.FEE):
-            step_price = governance.getStepPrice()
-
-        return step_price
+        if snapshot is None:
+            context = IconScoreContext(IconScoreContextType.QUERY)
+            # Clarifies that This Context does not count steps
+            context.step_counter = None
+            snapshot = GovernanceSnapshot.from_context(context)
+
+        # Keep properties into the counter factory
+        self._step_counter_factory.set_step_properties(
+            snapshot.step_price,
+            snapshot.step_costs,
+            {context_type: snapshot.get_max_step_limit(context_type)
+             for context_type in (IconScoreContextType.INVOKE, IconScoreContextType.QUERY)})
+        self._governance_snapshot = snapshot
 
     @staticmethod
-    def _get_step_costs_from_governance(governance) -> dict:
-        step_costs = {}
-        # Gets the step costs
-        for key, value in governance.getStepCosts().items():
-            try:
-                step_costs[StepType(key)] = value
-            except ValueError:
-                # Pass the unknown step type
-                pass
-
-        return step_costs
+    def _set_governance_snapshot(context: 'IconScoreContext',
+                                 snapshot: Optional['GovernanceSnapshot']) -> None:
+        """Makes a context use the governance parameters of a snapshot
 
-    @staticmethod
-    def _get_step_max_limits_from_governance(governance) -> dict:
-        # Gets the max step limit
-        return {IconScoreContextType.INVOKE: governance.getMaxStepLimit("invoke"),
-                IconScoreContextType.QUERY: governance.getMaxStepLimit("query")}
+        :param context:
+        :param snapshot: None if the parameters are read from the governance SCORE on demand
+        """
+        context.governance_snapshot = snapshot
+        if snapshot is not None:
+            context.revision = snapshot.revision
 
     def _validate_deployer_whitelist(
             self, context: 'IconScoreContext', params: dict):
@@ -247,10 +344,7 @@ class IconServiceEngine(ContextContainer):
 
         try:
             self._push_context(context)
-            # Gets the governance SCORE
-            governance_score = self._get_governance_score(context)
-
-            if not governance_score.isDeployer(_from):
+            if not IconScoreContextUtil.is_deployer(context, _from):
                 raise ServerErrorException(f'Invalid deployer: no permission (address: {_from})')
         finally:
             self._pop_context()
@@ -264,10 +358,7 @@ class IconServiceEngine(ContextContainer):
 
         try:
             self._push_context(context)
-            # Gets the governance SCORE
-            governance_score = self._get_governance_score(context)
-
-            if governance_score.isInScoreBlackList(_to):
+            if IconScoreContextUtil.is_in_score_blacklist(context, _to):
                 raise ServerErrorException(f'The Score is in Black List (address: {_to})')
         finally:
             self._pop_context()
@@ -276,6 +367,24 @@ class IconServiceEngine(ContextContainer):
         """Free all resources occupied by IconServiceEngine
         including db, memory and so on
         """
+        if self._compaction_scheduler is not None:
+            self._compaction_scheduler.stop()
+            self._compaction_scheduler = None
+
+        try:
+            # Waits for the last block to be written before shutdown.
+            # A failed write is raised after all resources are released
+            self._wait_for_pending_commit()
+        finally:
+            self._close_resources()
+
+    def _close_resources(self) -> None:
+        if self._reverse_diff_journal is not None:
+            self._reverse_diff_journal.close()
+            self._reverse_diff_journal = None
+        self._precommit_data_manager.close_spill_store()
+        self._precommit_data_manager.close_store()
+
         self._icon_score_mapper.clear_garbage_score()
         context = IconScoreContext(IconScoreContextType.DIRECT)
         self._push_context(context)
@@ -284,8 +393,19 @@ class IconServiceEngine(ContextContainer):
             self._icon_score_mapper.close()
         finally:
             self._pop_context()
-            ContextDatabaseFactory.close()
-            self._clear_context()
+            try:
+                # It raises the failed write again after the dbs are closed
+                ContextDatabaseFactory.close()
+            finally:
+                self._clear_context()
+
+                if self._commit_executor is not None:
+                    self._commit_executor.shutdown()
+                    self._commit_executor = None
+
+                if self._parallel_invoker is not None:
+                    self._parallel_invoker.shutdown()
+                    self._parallel_invoker = None
 
     def invoke(self,
                block: 'Block',
@@ -306,17 +426,21 @@ class IconServiceEngine(ContextContainer):
             return precommit_data.block_result, precommit_data.state_root_hash
 
         # Check for block validation before invoke
-        self._precommit_data_manager.validate_block_to_invoke(block)
+        # parent is not None if the block is invoked on top of an uncommitted block
+        parent: Optional['PrecommitData'] = self._precommit_data_manager.validate_block_to_invoke(block)
 
         context = IconScoreContext(IconScoreContextType.INVOKE)
         context.step_counter = self._step_counter_factory.create(IconScoreContextType.INVOKE)
         context.block = block
-        context.block_batch = BlockBatch(Block.from_block(block))
+        context.block_batch = BlockBatch(Block.from_block(block), None if parent is None else parent.block_batch)
         context.tx_batch = TransactionBatch()
         context.new_icon_score_mapper = IconScoreMapper()
-        self._set_revision_to_context(context)
+        self._set_governance_snapshot(context, self._governance_snapshot)
+        if parent is not None:
+            self._inherit_from_parent(context, parent)
         block_result = []
         precommit_flag = PrecommitFlag.NONE
+        checkpoints = []
 
         if block.height == 0:
             # Assume that there is only one tx in genesis_block
@@ -325,35 +449,189 @@ class IconServiceEngine(ContextContainer):
             context.block_batch.update(context.tx_batch)
             context.tx_batch.clear()
         else:
-            for index, tx_request in enumerate(tx_requests):
-                tx_result = self._invoke_request(context, tx_request, index)
-                block_result.append(tx_result)
-                context.block_batch.update(context.tx_batch)
-                context.tx_batch.clear()
-                self._update_revision_if_necessary(context, tx_result)
-                tx_precommit_flag = self._generate_precommit_flag(tx_result)
-                self._update_step_properties_if_necessary(context, tx_precommit_flag)
-                precommit_flag |= tx_precommit_flag
+            # The leading txs executed in another candidate block on the same parent are not executed again
+            reusable = self._precommit_data_manager.find_checkpoints(
+                block, [tx_request['params']['txHash'] for tx_request in tx_requests])
+            if reusable:
+                Logger.info(f'Reuse {len(reusable)}/{len(tx_requests)} txs: block({block})', ICON_SERVICE_LOG_TAG)
+
+            speculation: Optional['Speculation'] = None
+            try:
+                for index, tx_request in enumerate(tx_requests):
+                    if index < len(reusable):
+                        checkpoint = reusable[index]
+                        tx_result = self._resume_from_checkpoint(context, checkpoint)
+                    else:
+                        speculation = self._speculate_if_necessary(context, tx_requests, index, speculation)
+                        tx_result = None
+                        if speculation is not None:
+                            tx_result = speculation.take(context, index)
+                        if tx_result is None:
+                            tx_result = self._invoke_request(context, tx_request, index)
+                        checkpoint = self._make_checkpoint(context, tx_request, tx_result)
+                    checkpoints.append(checkpoint)
+
+                    block_result.append(tx_result)
+                    if speculation is not None:
+                        speculation.on_merged(context.tx_batch)
+                    context.block_batch.update(context.tx_batch)
+                    context.tx_batch.clear()
+                    self._add_fee(context, tx_request, tx_result, speculation)
+                    tx_precommit_flag = checkpoint.precommit_flag
+                    self._update_governance_snapshot_if_necessary(context, tx_precommit_flag)
+                    precommit_flag |= tx_precommit_flag
+                self._icx_engine.deposit_fee(context)
+            finally:
+                if speculation is not None:
+                    speculation.close()
 
         # Save precommit data
         # It will be written to levelDB on commit
         precommit_data = PrecommitData(
-            context.block_batch, block_result, context.new_icon_score_mapper, precommit_flag)
+            context.block_batch, block_result, context.new_icon_score_mapper, precommit_flag, parent)
+        precommit_data.checkpoints = checkpoints
+        precommit_data.governance_snapshot = context.governance_snapshot
+        if self._state_tree is not None:
+            # Only the paths of the changed states are updated
+            _, precommit_data.state_tree_nodes = self._update_state_tree(context.block_batch, parent)
         self._precommit_data_manager.push(precommit_data)
 
         return block_result, precommit_data.state_root_hash
 
-    def _update_revision_if_necessary(self, context, tx_result):
+    def _speculate_if_necessary(self,
+                                context: 'IconScoreContext',
+                                tx_requests: list,
+                                index: int,
+                                speculation: Optional['Speculation']) -> Optional['Speculation']:
+        """Starts executing the txs from index in parallel once the previous speculation has ended
+
+        :param context: invoke context
+        :param tx_requests: txs in the block
+        :param index: the index of the tx to invoke
+        :param speculation: the current speculation
+        :return: the speculation which covers the tx or None
         """
-        Updates the revision code of given context if governance or its states has been updated
-        :param context: current context
-        :param tx_result: transaction result
-        :return:
+        if speculation is not None:
+            if index < speculation.end:
+                return speculation
+            speculation.close()
+
+        if self._parallel_invoker is None or not is_speculative(tx_requests[index]):
+            return None
+
+        # The txs executed in parallel read the treasury with the fees of the txs before them
+        self._icx_engine.deposit_fee(context)
+        return self._parallel_invoker.speculate(context, tx_requests, index, self._invoke_request)
+
+    def _add_fee(self,
+                 context: 'IconScoreContext',
+                 tx_request: dict,
+                 tx_result: 'TransactionResult',
+                 speculation: Optional['Speculation']) -> None:
+        """Adds the fee charged for a tx to the fees of the block after its states are merged
+
+        :param context: invoke context
+        :param tx_request: tx request
+        :param tx_result: tx result with the final step_used and step_price
+        :param speculation: the current speculation
         """
-        if tx_result.to == GOVERNANCE_SCORE_ADDRESS and \
-                tx_result.status == TransactionResult.SUCCESS:
-            # If the tx is heading for Governance, updates the revision
-            self._set_revision_to_context(context)
+        fee: int = tx_result.step_used * tx_result.step_price
+        if fee == 0:
+            return
+
+        self._icx_engine.add_fee(context, tx_request['params']['from'], fee)
+        if speculation is not None:
+            speculation.on_written(self._icx_engine.fee_treasury_address.to_bytes())
+
+    def _inherit_from_parent(self, context: 'IconScoreContext', parent: 'PrecommitData') -> None:
+        """Makes the context see what the uncommitted ancestors of the block have changed
+        in addition to their states
+
+        :param context: invoke context
+        :param parent: precommit data of the uncommitted parent block
+        """
+        chain = parent.get_chain()
+
+        # SCOREs deployed in the ancestors are not in the global IconScoreMapper yet
+        for precommit_data in reversed(chain):
+            if precommit_data.score_mapper:
+                context.new_icon_score_mapper.update(precommit_data.score_mapper)
+
+        # Governance parameters of the committed block are not valid anymore
+        precommit_flag = PrecommitFlag.NONE
+        for precommit_data in chain:
+            precommit_flag |= precommit_data.precommit_flag
+        self._update_governance_snapshot_if_necessary(context, precommit_flag, parent.governance_snapshot)
+
+    def _make_checkpoint(self,
+                         context: 'IconScoreContext',
+                         tx_request: dict,
+                         tx_result: 'TransactionResult') -> 'TransactionCheckpoint':
+        """Keeps what a tx has done before its states are merged into the block batch
+
+        :param context: invoke context
+        :param tx_request: tx request which has just been invoked
+        :param tx_result: tx result
+        """
+        params: dict = tx_request['params']
+        to: 'Address' = params['to']
+
+        # An icx transfer to an EOA never sees the block
+        # as long as the tx has its own timestamp
+        block_independent: bool = 'timestamp' in params and \
+            params.get('dataType') not in ('call', 'deploy') and not to.is_contract
+
+        score_info = None
+        if tx_result.score_address is not None:
+            score_info = context.new_icon_score_mapper.get(tx_result.score_address)
+
+        return TransactionCheckpoint(
+            tx_result.tx_hash, OrderedDict(context.tx_batch), tx_result,
+            self._generate_precommit_flag(tx_result), block_independent, score_info, context.pending_fee)
+
+    def _resume_from_checkpoint(self,
+                                context: 'IconScoreContext',
+                                checkpoint: 'TransactionCheckpoint') -> 'TransactionResult':
+        """Puts what a tx has done in another candidate block into the context instead of invoking it
+
+        :param context: invoke context
+        :param checkpoint: checkpoint of the tx
+        :return: tx result for the block of the context
+        """
+        for key, value in checkpoint.states.items():
+            context.tx_batch[key] = value
+
+        # The treasury account written by the tx has already received the fees deposited before it was read
+        if self._icx_engine.fee_treasury_address.to_bytes() in checkpoint.states:
+            context.pending_fee = checkpoint.pending_fee
+
+        if checkpoint.score_info is not None:
+            context.new_icon_score_mapper[checkpoint.tx_result.score_address] = checkpoint.score_info
+
+        tx_result = copy.copy(checkpoint.tx_result)
+        tx_result.block_height = context.block.height
+        tx_result.block_hash = context.block.hash
+
+        context.cumulative_step_used += tx_result.step_used
+        tx_result.cumulative_step_used = context.cumulative_step_used
+        return tx_result
+
+    def _update_state_tree(self, block_batch: 'BlockBatch', parent: Optional['PrecommitData']) -> tuple:
+        """Updates the state tree of the parent block with the states changed in a block
+
+        :param block_batch: states changed in a block
+        :param parent: precommit data of the uncommitted parent block
+        :return: (new root hash, new nodes)
+        """
+        if parent is None:
+            return self._state_tree.update(self._state_tree.get_root_hash(), block_batch)
+
+        # The nodes of the uncommitted ancestors are not in StateDB yet
+        parent_nodes = {}
+        for precommit_data in reversed(parent.get_chain()):
+            parent_nodes.update(precommit_data.state_tree_nodes)
+
+        return self._state_tree.update(parent_nodes[STATE_TREE_ROOT_KEY], block_batch, parent_nodes)
 
     @staticmethod
     def _generate_precommit_flag(tx_result) -> PrecommitFlag:
@@ -371,30 +649,28 @@ class IconServiceEngine(ContextContainer):
 
         return precommit_flag
 
-    def _update_step_properties_if_necessary(self, context, precommit_flag):
+    def _update_governance_snapshot_if_necessary(self,
+                                                 context: 'IconScoreContext',
+                                                 precommit_flag: 'PrecommitFlag',
+                                                 snapshot: Optional['GovernanceSnapshot'] = None) -> None:
         """
-        Updates step properties to the step counter if the pre-commit flag is set
+        Reads the governance parameters again and updates the revision and the step properties
+        of the context if the pre-commit flag is set
 
         :param context: current context
         :param precommit_flag: pre-commit flag
+        :param snapshot: the parameters which have already been read on the states of the context
         """
         if precommit_flag & PrecommitFlag.STEP_ALL_CHANGED == PrecommitFlag.NONE:
             return
 
-        try:
-            self._push_context(context)
-            governance_score = self._get_governance_score(context)
-
-            step_price: int = self._get_step_price_from_governance(context, governance_score)
-            context.step_counter.set_step_price(step_price)
-
-            step_costs: int = self._get_step_costs_from_governance(governance_score)
-            context.step_counter.set_step_costs(step_costs)
+        if snapshot is None:
+            snapshot = GovernanceSnapshot.from_context(context)
+        self._set_governance_snapshot(context, snapshot)
 
-            max_step_limits: dict = self._get_step_max_limits_from_governance(governance_score)
-            context.step_counter.set_max_step_limit(max_step_limits.get(context.type, 0))
-        finally:
-            self._pop_context()
+        context.step_counter.set_step_price(snapshot.step_price)
+        context.step_counter.set_step_costs(snapshot.step_costs)
+        context.step_counter.set_max_step_limit(snapshot.get_max_step_limit(context.type))
 
     @staticmethod
     def _is_genesis_block(
@@ -487,16 +763,71 @@ class IconServiceEngine(ContextContainer):
                                  timestamp=params.get('timestamp', context.block.timestamp),
                                  nonce=params.get('nonce', None))
 
-        context.msg = Message(sender=from_, value=params.get('value', 0))
         context.current_address = to
         context.event_logs: List['EventLog'] = []
         context.traces: List['Trace'] = []
         context.step_counter.reset(step_limit)
+
+        if method == 'icx_sendTransaction' and self._is_plain_transfer(params):
+            return self._invoke_transfer(context, params)
+
+        context.msg = Message(sender=from_, value=params.get('value', 0))
         context.msg_stack.clear()
         context.event_log_stack.clear()
 
         return self._call(context, method, params)
 
+    @staticmethod
+    def _is_plain_transfer(params: dict) -> bool:
+        """Returns True if a tx only transfers icx from an EOA to another EOA
+
+        :param params: params of icx_sendTransaction (v2 or v3)
+        """
+        return 'data' not in params and 'dataType' not in params and not params['to'].is_contract
+
+    def _invoke_transfer(self,
+                         context: 'IconScoreContext',
+                         params: dict) -> 'TransactionResult':
+        """Invokes a plain icx transfer without the handling which only a SCORE call needs
+
+        The result and the states are the same as the ones of _handle_icx_send_transaction()
+
+        :param context: invoke context which _invoke_request() has prepared
+        :param params: params of the transfer
+        :return: tx result
+        """
+        step_counter = context.step_counter
+        tx_result = TransactionResult(context.tx, context.block, params['to'])
+
+        self._push_context(context)
+        try:
+            try:
+                self._icon_pre_validator.execute_to_check_out_of_balance(params, step_counter.step_price)
+                # No data: the input step is always 0
+                step_counter.apply_step(StepType.DEFAULT, 1)
+                self._icx_engine.transfer(context, params['from'], params['to'], params.get('value', 0))
+                tx_result.status = TransactionResult.SUCCESS
+            except BaseException as e:
+                tx_result.failure = self._get_failure_from_exception(e)
+                context.tx_batch.clear()
+                context.traces.append(self._get_trace_from_exception(context.current_address, e))
+
+            step_used, step_price = self._charge_transaction_fee(
+                context, params, tx_result.status, step_counter.step_used)
+        finally:
+            self._pop_context()
+
+        context.cumulative_step_used += step_used
+        tx_result.step_used = step_used
+        tx_result.step_price = step_price
+        tx_result.cumulative_step_used = context.cumulative_step_used
+        tx_result.event_logs = context.event_logs
+        # An empty bloom as no event is emitted
+        tx_result.logs_bloom = BloomFilter()
+        tx_result.traces = context.traces
+
+        return tx_result
+
     def _estimate_step_by_request(self, request, context) -> int:
         """Calculates simply and estimates step with request data.
 
@@ -576,11 +907,10 @@ class IconServiceEngine(ContextContainer):
         """
         context = IconScoreContext(IconScoreContextType.ESTIMATION)
         context.step_counter = self._step_counter_factory.create(IconScoreContextType.INVOKE)
-        context.block = self._precommit_data_manager.last_block
+        context.block = self._pin_committed_snapshot(context)
         context.block_batch = BlockBatch(Block.from_block(context.block))
         context.tx_batch = TransactionBatch()
         context.new_icon_score_mapper = IconScoreMapper()
-        self._set_revision_to_context(context)
         # Fills the step_limit as the max step limit to proceed the transaction.
         step_limit: int = context.step_counter.max_step_limit
         context.step_counter.reset(step_limit)
@@ -610,9 +940,8 @@ class IconServiceEngine(ContextContainer):
         :return: the result of query
         """
         context = IconScoreContext(IconScoreContextType.QUERY)
-        context.block = self._icx_storage.last_block
+        context.block = self._pin_committed_snapshot(context)
         context.step_counter = self._step_counter_factory.create(IconScoreContextType.QUERY)
-        self._set_revision_to_context(context)
         step_limit: int = context.step_counter.max_step_limit
 
         if params:
@@ -647,8 +976,8 @@ class IconServiceEngine(ContextContainer):
         params: dict = request['params']
 
         context = IconScoreContext(IconScoreContextType.QUERY)
+        context.block = self._pin_committed_snapshot(context)
         context.step_counter = self._step_counter_factory.create(IconScoreContextType.QUERY)
-        self._set_revision_to_context(context)
 
         step_price: int = context.step_counter.step_price
         minimum_step: int = self._step_counter_factory.get_step_cost(StepType.DEFAULT)
@@ -690,10 +1019,13 @@ class IconServiceEngine(ContextContainer):
         """
 
         self._push_context(context)
-        handler = self._handlers[method]
-        ret_val = handler(context, params)
-        self._pop_context()
-        return ret_val
+        try:
+            handler = self._handlers[method]
+            return handler(context, params)
+        finally:
+            # The context stack is thread-local and a query thread is reused
+            # so the context should be popped even if the handler fails
+            self._pop_context()
 
     def _handle_icx_get_balance(self,
                                 context: 'IconScoreContext',
@@ -1104,19 +1436,124 @@ class IconServiceEngine(ContextContainer):
         if new_icon_score_mapper:
             self._icon_score_mapper.update(new_icon_score_mapper)
 
-        self._icx_context_db.write_batch(
-            context=context, states=block_batch)
+        # The block info is written together with the states
+        states = dict(block_batch)
+        self._icx_storage.put_block_info_to_batch(states, block_batch.block)
+        if precommit_data.state_tree_nodes:
+            states.update(precommit_data.state_tree_nodes)
+            self._state_tree.on_commit(precommit_data.state_tree_nodes)
+        if self._reverse_diff_journal is not None and block_batch.block.height > 0:
+            # Written ahead of the states. A diff left by a crash is discarded on open
+            self._reverse_diff_journal.record(block_batch.block, make_reverse_diff(states))
+
+        # Compaction is paused while the states are being written
+        scheduler = self._compaction_scheduler
+        scheduler.on_commit_begin()
+
+        if self._commit_executor is None:
+            try:
+                ContextDatabaseFactory.write_batch(context, states)
+            finally:
+                scheduler.on_commit_end()
+        else:
+            try:
+                future = ContextDatabaseFactory.write_batch_async(context, states, self._commit_executor)
+            except BaseException:
+                scheduler.on_commit_end()
+                raise
+            future.add_done_callback(lambda _: scheduler.on_commit_end())
 
-        self._icx_storage.put_block_info(context, block_batch.block)
         self._precommit_data_manager.commit(block_batch.block)
 
         if precommit_data.precommit_flag & PrecommitFlag.STEP_ALL_CHANGED != PrecommitFlag.NONE:
-            self._init_global_value_by_governance_score()
+            self._init_global_value_by_governance_score(precommit_data.governance_snapshot)
+
+        self._take_committed_snapshot()
+
+    def _wait_for_pending_commit(self) -> None:
+        """Waits until the states of the last committed block are written to StateDB
+        """
+        if self._commit_executor is None:
+            return
+
+        try:
+            ContextDatabaseFactory.wait_for_pending_write()
+        except BaseException as e:
+            Logger.exception(f'Failed to write the committed block: {e}', ICON_SERVICE_LOG_TAG)
+            raise
+
+    def compact_db(self) -> None:
+        """Requests a compaction of StateDB
+
+        It runs on a background thread and does not block the caller.
+        """
+        self._compaction_scheduler.request()
+
+    def get_db_stats(self) -> dict:
+        """Returns the compaction stats and the level stats of each db in StateDB
+        with the memory usage of precommit data
+        """
+        stats: dict = self._compaction_scheduler.get_stats()
+        stats['precommit'] = self._precommit_data_manager.get_stats()
+        return stats
+
+    def get_state_proof(self, key: bytes) -> dict:
+        """Returns the proof of a committed state against the root of the state tree
+
+        See StateTree.get_proof() and state_tree.verify_proof()
+
+        :param key: key of the state in StateDB
+        :return: proof with the block height, the key and the value
+        """
+        if self._state_tree is None:
+            raise ServerErrorException('State tree is disabled')
+
+        context = IconScoreContext(IconScoreContextType.QUERY)
+        block = self._pin_committed_snapshot(context)
+
+        proof = self._state_tree.get_proof(key, context)
+        proof['blockHeight'] = -1 if block is None else block.height
+        proof['key'] = key
+        proof['value'] = ContextDatabaseFactory.get_db_by_key(key).get(context, key)
+        return proof
+
+    def revert_block(self) -> 'Block':
+        """Reverts the last committed block with its reverse diff
+
+        Candidate blocks which have been invoked are thrown away.
+
+        :return: the last committed block after the revert
+        """
+        if self._reverse_diff_journal is None:
+            raise ServerErrorException('Reverse diff journal is disabled')
+
+        self._wait_for_pending_commit()
+
+        last_block: 'Block' = self._icx_storage.last_block
+        if last_block is None:
+            raise ServerErrorException('No block to revert')
+
+        context = IconScoreContext(IconScoreContextType.DIRECT)
+        diff: dict = self._reverse_diff_journal.revert(context, last_block)
+
+        self._precommit_data_manager.clear()
+        self._icx_storage.load_last_block_info(None)
+        self._precommit_data_manager.last_block = self._icx_storage.last_block
+
+        # SCOREs deployed or updated in the block are loaded again with the previous deploy info
+        deploy_info_prefix: bytes = ICON_DEPLOY_STORAGE_PREFIX + b'di|'
+        for key in diff:
+            if key.startswith(deploy_info_prefix):
+                self._icon_score_mapper.delete(Address.from_bytes(key[len(deploy_info_prefix):]))
+
+        self._init_global_value_by_governance_score()
+        self._take_committed_snapshot()
+
+        return self._icx_storage.last_block
 
     def rollback(self, block: 'Block') -> None:
-        """Throw away a precommit state
+        """Throw away a precommit state and the ones of its descendants
         in context.block_batch and IconScoreEngine
         """
-        # Check for block validation before rollback
-        self._precommit_data_manager.validate_precommit_block(block)
+        # The descendants of the block are thrown away as well
         self._precommit_data_manager.rollback(block)
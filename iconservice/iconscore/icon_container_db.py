@@ -187,6 +187,19 @@ class DictDB(object):
         """
         self.__remove(key)
 
+    def get_many(self, keys: list) -> list:
+        """
+        Gets the values of given keys at once
+
+        :param keys: keys
+        :return: values in the order of keys
+        """
+        if self.__depth != 1:
+            raise ContainerDBException(f'DictDB depth mismatch')
+
+        values = self._db.get_many([ContainerUtil.encode_key(key) for key in keys])
+        return [ContainerUtil.decode_object(value, self.__value_type) for value in values]
+
     def __setitem__(self, key: K, value: V) -> None:
         if self.__depth != 1:
             raise ContainerDBException(f'DictDB depth mismatch')
@@ -221,6 +234,9 @@ class ArrayDB(Iterator):
     """
     Utility classes wrapping the state DB.
     supports length and iterator, maintains order
+
+    The size is read from the state DB on every access instead of being kept in the instance,
+    because a SCORE instance is shared by the contexts of the txs executed in parallel.
     """
 
     __SIZE = 'size'
@@ -230,7 +246,6 @@ class ArrayDB(Iterator):
         prefix: bytes = ContainerUtil.create_db_prefix(type(self), var_key)
         self._db = db.get_sub_db(prefix)
 
-        self.__size = self.__get_size()
         self.__index = 0
         self.__value_type = value_type
 
@@ -240,10 +255,10 @@ class ArrayDB(Iterator):
 
         :param value: value to add
         """
+        size = self.__get_size()
         byte_value = ContainerUtil.encode_value(value)
-        self._db.put(ContainerUtil.encode_key(self.__size), byte_value)
-        self.__size += 1
-        self.__set_size()
+        self._db.put(ContainerUtil.encode_key(size), byte_value)
+        self.__set_size(size + 1)
 
     def pop(self) -> Optional[V]:
         """
@@ -251,14 +266,14 @@ class ArrayDB(Iterator):
 
         :return: last added value
         """
-        if self.__size == 0:
+        size = self.__get_size()
+        if size == 0:
             return None
 
-        index = self.__size - 1
+        index = size - 1
         last_val = self[index]
         self._db.delete(ContainerUtil.encode_key(index))
-        self.__size -= 1
-        self.__set_size()
+        self.__set_size(index)
         return last_val
 
     def get(self, index: int=0) -> V:
@@ -271,11 +286,23 @@ class ArrayDB(Iterator):
         return self[index]
 
     def __iter__(self):
-        self.__index = 0
-        return self
+        # Returns a new generator instead of self
+        # so that the same ArrayDB can be iterated by several threads at once
+        size = self.__get_size()
+        # Values are read ahead in chunks but charged one by one as they are returned
+        values = self._db.iter_values(ContainerUtil.encode_key(index) for index in range(size))
+
+        index = 0
+        while index < self.__get_size():
+            if index < size:
+                yield ContainerUtil.decode_object(next(values), self.__value_type)
+            else:
+                # The items put during the iteration
+                yield self[index]
+            index += 1
 
     def __next__(self) -> V:
-        if self.__index < self.__size:
+        if self.__index < self.__get_size():
             index = self.__index
             self.__index += 1
             return self[index]
@@ -283,18 +310,19 @@ class ArrayDB(Iterator):
             raise StopIteration
 
     def __len__(self):
-        return self.__size
+        return self.__get_size()
 
     def __get_size(self) -> int:
-        return ContainerUtil.decode_object(self._db.get(ArrayDB.__SIZE_BYTE_KEY), int)
+        # Not charged as a get: the size used to be read only once when the SCORE was loaded
+        return ContainerUtil.decode_object(self._db._get_without_observer(ArrayDB.__SIZE_BYTE_KEY), int)
 
-    def __set_size(self) -> None:
+    def __set_size(self, size: int) -> None:
         sub_db = self._db
-        byte_value = ContainerUtil.encode_value(self.__size)
+        byte_value = ContainerUtil.encode_value(size)
         sub_db.put(ArrayDB.__SIZE_BYTE_KEY, byte_value)
 
     def __setitem__(self, index: int, value: V) -> None:
-        if index >= self.__size:
+        if index >= self.__get_size():
             raise ContainerDBException(f'ArrayDB out of range')
         sub_db = self._db
         byte_value = ContainerUtil.encode_value(value)
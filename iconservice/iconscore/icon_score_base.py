@@ -361,7 +361,6 @@ class IconScoreBase(IconScoreObject, ContextGetter,
         self.__db = db
         self.__address = db.address
         self.__owner = self.get_owner(self.__address)
-        self.__icx = None
 
         if not self.__get_attr_dict(CONST_CLASS_EXTERNALS):
             raise ExternalException('this score has no external functions', '__init__', str(type(self)))
@@ -571,13 +570,9 @@ class IconScoreBase(IconScoreObject, ContextGetter,
 
         :return: :class:`.Icx` instance of icx
         """
-        if self.__icx is None:
-            self.__icx = Icx(self._context, self.__address)
-        else:
-            # Should update a new context in icx for every tx
-            self.__icx._context = self._context
-
-        return self.__icx
+        # A SCORE instance is shared by the invoke thread and the query threads
+        # so an Icx bound to the context of the current thread is created every time
+        return Icx(self._context, self.__address)
 
     @property
     def block_height(self) -> int:
@@ -34,6 +34,7 @@ if TYPE_CHECKING:
     from ..deploy.icon_score_deploy_engine import IconScoreDeployEngine
     from .icon_score_base import IconScoreBase
     from ..icx.icx_engine import IcxEngine
+    from ..governance_snapshot import GovernanceSnapshot
 
 _thread_local_data = threading.local()
 
@@ -91,6 +92,8 @@ class ContextGetter(object):
 
 class IconScoreContext(object):
 
+    # Shared by all threads. They are set only once in IconServiceEngine.open()
+    # before any invoke or query thread starts, and read-only after that.
     icon_score_mapper: 'IconScoreMapper' = None
     icon_score_deploy_engine: 'IconScoreDeployEngine' = None
     icx_engine: 'IcxEngine' = None
@@ -113,10 +116,16 @@ class IconScoreContext(object):
         self.msg: 'Message' = None
         self.current_address: 'Address' = None
         self.revision: int = 0
+        # Governance parameters of the block. None if they have to be read from the governance SCORE
+        self.governance_snapshot: Optional['GovernanceSnapshot'] = None
         self.block_batch: 'BlockBatch' = None
         self.tx_batch: 'TransactionBatch' = None
         self.new_icon_score_mapper: 'IconScoreMapper' = None
+        # ContextDatabase -> KeyValueDatabaseSnapshot pinned by this context
+        self.db_snapshots: Optional[dict] = None
         self.cumulative_step_used: int = 0
+        # Fees charged in the block which the treasury has not received yet
+        self.pending_fee: int = 0
         self.step_counter: 'IconScoreStepCounter' = None
         self.event_logs: List['EventLog'] = None
         self.traces: List['Trace'] = None
@@ -20,10 +20,11 @@ from typing import TYPE_CHECKING, Optional, Tuple
 from ..deploy import DeployState
 from ..base.address import GOVERNANCE_SCORE_ADDRESS
 from ..base.exception import ServerErrorException, InvalidParamsException
-from ..icon_constant import IconScoreContextType, DEFAULT_BYTE_SIZE, IconServiceFlag
+from ..icon_constant import IconScoreContextType, DEFAULT_BYTE_SIZE, IconServiceFlag, REVISION_4
 
 if TYPE_CHECKING:
     from .icon_score_context import IconScoreContext
+    from ..governance_snapshot import GovernanceSnapshot
     from .icon_score_base import IconScoreBase
     from ..base.address import Address
     from ..deploy.icon_score_deploy_storage import IconScoreDeployTXParams, IconScoreDeployInfo
@@ -86,13 +87,21 @@ class IconScoreContextUtil(object):
         if not score_address.is_contract:
             raise ServerErrorException(f'Invalid SCORE address: {score_address}')
 
+        if IconScoreContextUtil.is_in_score_blacklist(context, score_address):
+            raise ServerErrorException(f'SCORE in blacklist: {score_address}')
+
+    @staticmethod
+    def is_in_score_blacklist(context: 'IconScoreContext', score_address: 'Address') -> bool:
+        snapshot = IconScoreContextUtil._get_snapshot_with_address_lists(context)
+        if snapshot is not None:
+            return snapshot.is_in_score_black_list(score_address)
+
         # Gets the governance SCORE
         governance_score = IconScoreContextUtil.get_icon_score(context, GOVERNANCE_SCORE_ADDRESS)
         if governance_score is None:
             raise ServerErrorException(f'governance_score is None')
 
-        if governance_score.isInScoreBlackList(score_address):
-            raise ServerErrorException(f'SCORE in blacklist: {score_address}')
+        return governance_score.isInScoreBlackList(score_address)
 
     @staticmethod
     def validate_deployer(context: 'IconScoreContext', deployer: 'Address') -> None:
@@ -101,13 +110,35 @@ class IconScoreContextUtil(object):
         :param context:
         :param deployer: EOA address to deploy a SCORE
         """
+        if not IconScoreContextUtil.is_deployer(context, deployer):
+            raise ServerErrorException(f'Invalid deployer: no permission (address: {deployer})')
+
+    @staticmethod
+    def is_deployer(context: 'IconScoreContext', deployer: 'Address') -> bool:
+        snapshot = IconScoreContextUtil._get_snapshot_with_address_lists(context)
+        if snapshot is not None:
+            return snapshot.is_deployer(deployer)
+
         # Gets the governance SCORE
         governance_score = IconScoreContextUtil.get_icon_score(context, GOVERNANCE_SCORE_ADDRESS)
         if governance_score is None:
             raise ServerErrorException(f'governance_score is None')
 
-        if not governance_score.isDeployer(deployer):
-            raise ServerErrorException(f'Invalid deployer: no permission (address: {deployer})')
+        return governance_score.isDeployer(deployer)
+
+    @staticmethod
+    def _get_snapshot_with_address_lists(context: 'IconScoreContext') -> Optional['GovernanceSnapshot']:
+        """Returns the governance snapshot if the address lists can be checked with it
+
+        The governance SCORE charges GET steps for reading the lists,
+        so a context which counts steps reads them from the SCORE before REVISION_4.
+        """
+        snapshot = context.governance_snapshot
+        if snapshot is None or not snapshot.has_address_lists:
+            return None
+        if context.step_counter is not None and context.revision < REVISION_4:
+            return None
+        return snapshot
 
     @staticmethod
     def is_service_flag_on(context: 'IconScoreContext', flag: 'IconServiceFlag') -> bool:
@@ -120,6 +151,10 @@ class IconScoreContextUtil(object):
 
     @staticmethod
     def _get_service_flag(context: 'IconScoreContext') -> int:
+        snapshot = context.governance_snapshot
+        if snapshot is not None:
+            return snapshot.service_flag
+
         governance_score = IconScoreContextUtil.get_icon_score(context, GOVERNANCE_SCORE_ADDRESS)
         if governance_score is None:
             raise ServerErrorException(f'governance_score is None')
@@ -17,7 +17,7 @@
 import os
 
 from shutil import rmtree
-from threading import Lock
+from threading import RLock
 from typing import TYPE_CHECKING, Optional
 
 from iconcommons import Logger
@@ -39,6 +39,7 @@ class IconScoreMapper(object):
     """Icon score information mapping table
 
     This instance should be used as a singletone
+    A locked mapper can be shared by the invoke thread and the query threads
 
     key: icon_score_address
     value: IconScoreInfo
@@ -51,7 +52,7 @@ class IconScoreMapper(object):
         """Constructor
         """
         self._score_mapper = IconScoreMapperObject()
-        self._lock = Lock()
+        self._lock = RLock()
         self._is_lock = is_lock
 
     def __contains__(self, address: 'Address'):
@@ -75,6 +76,24 @@ class IconScoreMapper(object):
         else:
             return self._score_mapper.get(key)
 
+    def items(self) -> list:
+        """Returns (address, IconScoreInfo) of the scores in the mapper
+        """
+        if self._is_lock:
+            with self._lock:
+                return list(self._score_mapper.items())
+        else:
+            return list(self._score_mapper.items())
+
+    def delete(self, address: 'Address') -> None:
+        """Drops a score so that it is loaded again with its current deploy info
+        """
+        if self._is_lock:
+            with self._lock:
+                self._score_mapper.pop(address, None)
+        else:
+            self._score_mapper.pop(address, None)
+
     def update(self, mapper: 'IconScoreMapper'):
         if self._is_lock:
             with self._lock:
@@ -83,6 +102,13 @@ class IconScoreMapper(object):
             self._score_mapper.update(mapper._score_mapper)
 
     def close(self):
+        if self._is_lock:
+            with self._lock:
+                self._close()
+        else:
+            self._close()
+
+    def _close(self):
         for addr, info in self._score_mapper.items():
             info.icon_score.db.close()
 
@@ -96,18 +122,26 @@ class IconScoreMapper(object):
         :param tx_hash:
         :return: IconScoreBase object
         """
-        score = None
         icon_score_info = self.get(address)
+        if icon_score_info is not None:
+            return icon_score_info.icon_score
 
-        if icon_score_info is None:
-            score = self.load_score(address, tx_hash)
-            if score is None:
-                raise InvalidParamsException(f"score is None address: {address}")
-            self.put_score_info(address, score, tx_hash)
+        if self._is_lock:
+            # Prevents the same score from being loaded by several threads at once
+            with self._lock:
+                return self._get_or_load_icon_score(address, tx_hash)
+        else:
+            return self._get_or_load_icon_score(address, tx_hash)
 
+    def _get_or_load_icon_score(self, address: 'Address', tx_hash: bytes) -> 'IconScoreBase':
+        icon_score_info = self.get(address)
         if icon_score_info is not None:
-            score = icon_score_info.icon_score
+            return icon_score_info.icon_score
 
+        score = self.load_score(address, tx_hash)
+        if score is None:
+            raise InvalidParamsException(f"score is None address: {address}")
+        self.put_score_info(address, score, tx_hash)
         return score
 
     def try_score_package_validate(self, address: 'Address', tx_hash: bytes):
@@ -34,21 +34,26 @@ BLACKLIST_RESERVED_KEYWORD = ['exec', 'eval', 'compile']
 
 
 class ScorePackageValidator(object):
-    PREV_IMPORT_NAME = None
-    PREV_LOAD_BUILD_CLASS = None
-    WHITELIST_IMPORT = {}
-    CUSTOM_IMPORT_LIST = []
+    """Validates the imports and the keywords used in a SCORE package
 
-    @staticmethod
-    def execute(whitelist_table: dict, pkg_root_path: str, pkg_import_root: str) -> callable:
-        ScorePackageValidator.PREV_IMPORT_NAME = None
-        ScorePackageValidator.WHITELIST_IMPORT = whitelist_table
-        ScorePackageValidator.CUSTOM_IMPORT_LIST = ScorePackageValidator._make_custom_import_list(pkg_root_path)
+    The state of a validation is kept in an instance,
+    so create a new instance for each package to validate.
+    """
+
+    def __init__(self) -> None:
+        self._prev_import_name: str = None
+        self._whitelist_import: dict = {}
+        self._custom_import_list: list = []
+
+    def execute(self, whitelist_table: dict, pkg_root_path: str, pkg_import_root: str) -> callable:
+        self._prev_import_name = None
+        self._whitelist_import = whitelist_table
+        self._custom_import_list = ScorePackageValidator._make_custom_import_list(pkg_root_path)
 
         # in order for the new module to be noticed by the import system
         importlib.invalidate_caches()
 
-        for imp in ScorePackageValidator.CUSTOM_IMPORT_LIST:
+        for imp in self._custom_import_list:
             full_name = ''.join((pkg_import_root, '.', imp))
             spec = importlib.util.find_spec(full_name)
             code = spec.loader.get_code(full_name)
@@ -62,8 +67,8 @@ class ScorePackageValidator(object):
             # mode = ast.parse(source)
             # for node in ast.walk(mode):
             #     if isinstance(node, ast.Import) or isinstance(node, ast.ImportFrom):
-            #         if not ScorePackageValidator._is_contain_custom_import(node.module):
-            #             if node.module not in ScorePackageValidator.WHITELIST_IMPORT:
+            #         if not self._is_contain_custom_import(node.module):
+            #             if node.module not in self._whitelist_import:
             #                 raise ServerErrorException(f'invalid import '
             #                                            f'import_name: {node.module}')
             #     elif isinstance(node, ast.Name):
@@ -73,8 +78,8 @@ class ScorePackageValidator(object):
             #     else:
             #         pass
 
-            ScorePackageValidator._validate_import_from_code(code)
-            ScorePackageValidator._validate_import_from_const(code.co_consts)
+            self._validate_import_from_code(code)
+            self._validate_import_from_const(code.co_consts)
             ScorePackageValidator._validate_blacklist_keyword_from_names(code.co_names)
 
     @staticmethod
@@ -99,8 +104,7 @@ class ScorePackageValidator(object):
             if co_name in BLACKLIST_RESERVED_KEYWORD:
                 raise ServerErrorException(f'invalid blacklist keyword: {co_name}')
 
-    @staticmethod
-    def _validate_import_from_code(code):
+    def _validate_import_from_code(self, code):
         if not hasattr(code, CODE_ATTR):
             return
 
@@ -109,50 +113,47 @@ class ScorePackageValidator(object):
         for index in range(0, int(len(byte_code_list)), 2):
             key = byte_code_list[index]
             value = byte_code_list[index + 1]
-            ScorePackageValidator._validate_import(key, value, code.co_names)
+            self._validate_import(key, value, code.co_names)
 
-    @staticmethod
-    def _validate_import_from_const(co_consts: tuple):
+    def _validate_import_from_const(self, co_consts: tuple):
         for co_const in co_consts:
             if not hasattr(co_const, CODE_ATTR):
                 continue
-            ScorePackageValidator._validate_import_from_code(co_const)
-            ScorePackageValidator._validate_import_from_const(co_const.co_consts)
+            self._validate_import_from_code(co_const)
+            self._validate_import_from_const(co_const.co_consts)
             if hasattr(co_const, CODE_NAMES_ATTR):
                 ScorePackageValidator._validate_blacklist_keyword_from_names(co_const.co_names)
 
-    @staticmethod
-    def _validate_import(key: int, value: int, co_names: tuple):
+    def _validate_import(self, key: int, value: int, co_names: tuple):
         if key not in IMPORT_TABLE:
             return
 
         if key == IMPORT_NAME:
             import_name = co_names[value]
-            ScorePackageValidator.PREV_IMPORT_NAME = import_name
-            if import_name not in ScorePackageValidator.WHITELIST_IMPORT:
-                if not ScorePackageValidator._is_contain_custom_import(import_name):
+            self._prev_import_name = import_name
+            if import_name not in self._whitelist_import:
+                if not self._is_contain_custom_import(import_name):
                     raise ServerErrorException(f'invalid import '
                                                f'import_name: {import_name}')
         elif key == IMPORT_STAR:
-            if ScorePackageValidator.PREV_IMPORT_NAME not in ScorePackageValidator.WHITELIST_IMPORT:
-                if not ScorePackageValidator._is_contain_custom_import(ScorePackageValidator.PREV_IMPORT_NAME):
+            if self._prev_import_name not in self._whitelist_import:
+                if not self._is_contain_custom_import(self._prev_import_name):
                     raise ServerErrorException(f'invalid import '
-                                               f'import_name: {ScorePackageValidator.PREV_IMPORT_NAME}')
+                                               f'import_name: {self._prev_import_name}')
         elif key == IMPORT_FROM:
-            if ScorePackageValidator.PREV_IMPORT_NAME in ScorePackageValidator.WHITELIST_IMPORT:
-                from_list = ScorePackageValidator.WHITELIST_IMPORT[ScorePackageValidator.PREV_IMPORT_NAME]
+            if self._prev_import_name in self._whitelist_import:
+                from_list = self._whitelist_import[self._prev_import_name]
                 if co_names[value] not in from_list:
                     raise ServerErrorException(f'invalid import '
-                                               f'import_name: {ScorePackageValidator.PREV_IMPORT_NAME}')
-            elif ScorePackageValidator._is_contain_custom_import(ScorePackageValidator.PREV_IMPORT_NAME):
+                                               f'import_name: {self._prev_import_name}')
+            elif self._is_contain_custom_import(self._prev_import_name):
                 pass
             else:
                 raise ServerErrorException(f'invalid import '
-                                           f'import_name: {ScorePackageValidator.PREV_IMPORT_NAME}')
+                                           f'import_name: {self._prev_import_name}')
 
-    @staticmethod
-    def _is_contain_custom_import(import_name: str) -> bool:
-        for custom_import in ScorePackageValidator.CUSTOM_IMPORT_LIST:
+    def _is_contain_custom_import(self, import_name: str) -> bool:
+        for custom_import in self._custom_import_list:
             if import_name == custom_import:
                 return True
             else:
@@ -162,4 +163,3 @@ class ScorePackageValidator(object):
                         if import_name == imp:
                             return True
         return False
-
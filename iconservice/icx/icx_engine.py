@@ -180,6 +180,7 @@ class IcxEngine(object):
         :param address: account address
         :return: the balance of address in loop (1 icx  == 1e18 loop)
         """
+        self._deposit_fee_before_read(context, address)
         account = self._storage.get_account(context, address)
 
         # If the address is not present, its balance is 0.
@@ -199,6 +200,10 @@ class IcxEngine(object):
         """
         return self._total_supply_amount
 
+    @property
+    def fee_treasury_address(self) -> Address:
+        return self._fee_treasury_address
+
     def charge_fee(self,
                    context: 'IconScoreContext',
                    from_: Address,
@@ -206,12 +211,56 @@ class IcxEngine(object):
         """Charge a fee for a tx
         It MUST NOT raise any exceptions
 
+        The fee is only withdrawn from the sender here.
+        The treasury receives the fees of a block by add_fee() and deposit_fee().
+
         :param context:
         :param from_:
         :param fee:
         :return:
         """
-        self._transfer(context, from_, self._fee_treasury_address, fee)
+        if from_ != self._fee_treasury_address and fee > 0:
+            account = self._storage.get_account(context, from_)
+            account.withdraw(fee)
+            self._storage.put_account(context, from_, account)
+
+    def add_fee(self,
+                context: 'IconScoreContext',
+                from_: Address,
+                fee: int) -> None:
+        """Adds the fee charged for a tx to the fees of the block which the treasury has not received yet
+
+        It is called after the states of the tx are merged into the block batch.
+        The first fee of a block is deposited at once,
+        so that the treasury account keeps its place in the block batch.
+
+        :param context: invoke context
+        :param from_: the sender who has paid the fee
+        :param fee: fee charged by charge_fee()
+        """
+        if from_ == self._fee_treasury_address or fee <= 0:
+            return
+
+        context.pending_fee += fee
+        if self._fee_treasury_address.to_bytes() not in context.block_batch:
+            self.deposit_fee(context)
+
+    def deposit_fee(self, context: Optional['IconScoreContext']) -> None:
+        """Deposits the fees added by add_fee() to the treasury account in the block batch
+
+        :param context: invoke context
+        """
+        if context is None or context.pending_fee == 0:
+            return
+
+        account = self._storage.get_account(context, self._fee_treasury_address)
+        account.deposit(context.pending_fee)
+        self._storage.put_account_to_batch(context.block_batch, account)
+        context.pending_fee = 0
+
+    def _deposit_fee_before_read(self, context: Optional['IconScoreContext'], *addresses: Address) -> None:
+        if context is not None and context.pending_fee > 0 and self._fee_treasury_address in addresses:
+            self.deposit_fee(context)
 
     def transfer(self,
                  context: 'IconScoreContext',
@@ -237,9 +286,10 @@ class IcxEngine(object):
         :return True
         """
         if from_ != to and amount > 0:
+            self._deposit_fee_before_read(context, from_, to)
+
             # get account info from state db.
-            from_account = self._storage.get_account(context, from_)
-            to_account = self._storage.get_account(context, to)
+            from_account, to_account = self._storage.get_accounts(context, [from_, to])
 
             from_account.withdraw(amount)
             to_account.deposit(amount)
@@ -259,4 +309,5 @@ class IcxEngine(object):
         :param address:
         :return: Account
         """
+        self._deposit_fee_before_read(context, address)
         return self._storage.get_account(context, address)
@@ -14,7 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, List
 
 from .icx_account import Account
 from ..base.address import Address
@@ -27,7 +27,7 @@ if TYPE_CHECKING:
 
 
 class IcxStorage(object):
-    _LAST_BLOCK_KEY = b'last_block'
+    LAST_BLOCK_KEY = b'last_block'
 
     """Icx coin state manager embedding a state db wrapper
     """
@@ -53,14 +53,23 @@ class IcxStorage(object):
         return self._last_block
 
     def load_last_block_info(self, context: Optional['IconScoreContext']) -> None:
-        block_bytes = self._db.get(context, self._LAST_BLOCK_KEY)
+        block_bytes = self._db.get(context, self.LAST_BLOCK_KEY)
         if block_bytes is None:
             return
 
         self._last_block = Block.from_bytes(block_bytes)
 
     def put_block_info(self, context: 'IconScoreContext', block: 'Block') -> None:
-        self._db.put(context, self._LAST_BLOCK_KEY, bytes(block))
+        self._db.put(context, self.LAST_BLOCK_KEY, bytes(block))
+        self._last_block = block
+
+    def put_block_info_to_batch(self, states: dict, block: 'Block') -> None:
+        """Puts the block info to the states which will be written to db at once
+
+        :param states: key/value pairs to write
+        :param block: the last committed block
+        """
+        states[self.LAST_BLOCK_KEY] = bytes(block)
         self._last_block = block
 
     def get_text(self, context: 'IconScoreContext', name: str) -> Optional[str]:
@@ -114,6 +123,30 @@ class IcxStorage(object):
         account.address = address
         return account
 
+    def get_accounts(self,
+                     context: 'IconScoreContext',
+                     addresses: List['Address']) -> List['Account']:
+        """Returns the accounts indicated by addresses at once.
+
+        :param context:
+        :param addresses: account addresses
+        :return: (list) accounts in the order of addresses
+            A new account is created for the address not present.
+        """
+        values = self._db.get_many(context, [address.to_bytes() for address in addresses])
+
+        accounts = []
+        for address, value in zip(addresses, values):
+            if value:
+                account = Account.from_bytes(value)
+            else:
+                account = Account()
+
+            account.address = address
+            accounts.append(account)
+
+        return accounts
+
     def put_account(self,
                     context: 'IconScoreContext',
                     address: 'Address',
@@ -128,6 +161,15 @@ class IcxStorage(object):
         value = account.to_bytes()
         self._db.put(context, key, value)
 
+    @staticmethod
+    def put_account_to_batch(states: dict, account: 'Account') -> None:
+        """Puts account info to the states of a block bypassing the tx batch
+
+        :param states: block batch
+        :param account: account to save
+        """
+        states[account.address.to_bytes()] = account.to_bytes()
+
     def delete_account(self,
                        context: 'IconScoreContext',
                        address: 'Address') -> None:
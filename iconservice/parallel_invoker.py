@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+
+from iconcommons.logger import Logger
+from .base.address import GOVERNANCE_SCORE_ADDRESS
+from .database.batch import BlockBatch, TransactionBatch
+from .icon_constant import ICON_SERVICE_LOG_TAG
+from .iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+from .iconscore.icon_score_mapper import IconScoreMapper
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from .base.address import Address
+    from .iconscore.icon_score_result import TransactionResult
+
+# (context, tx request, index) -> tx result
+InvokeRequest = Callable[['IconScoreContext', dict, int], 'TransactionResult']
+
+
+def is_speculative(tx_request: dict) -> bool:
+    """Returns True if a tx can be executed ahead of the txs before it
+
+    A deploy changes the SCOREs and a governance tx changes the revision and the step properties,
+    which are not states tracked by TransactionBatch.
+    """
+    params: dict = tx_request['params']
+    return params.get('dataType') != 'deploy' and params['to'] != GOVERNANCE_SCORE_ADDRESS
+
+
+class _SpeculativeScoreMapper(IconScoreMapper):
+    """Keeps the SCOREs put by a speculative tx apart from the ones of the block
+
+    The SCOREs of the block are read through it.
+    """
+
+    def __init__(self, parent: 'IconScoreMapper') -> None:
+        super().__init__()
+        self._parent = parent
+
+    def __contains__(self, address: 'Address'):
+        return super().__contains__(address) or address in self._parent
+
+    def get(self, key):
+        value = super().get(key)
+        if value is None:
+            value = self._parent.get(key)
+        return value
+
+
+class Speculation(object):
+    """Txs executed in parallel against the states of a block at the start of them
+
+    The results are taken in the order of the txs.
+    A result is thrown away if the tx has read a state written by a tx before it in the block
+    or if it has put a SCORE such as a deploy through an internal call to the governance SCORE.
+    """
+
+    def __init__(self,
+                 executor: 'ThreadPoolExecutor',
+                 context: 'IconScoreContext',
+                 tx_requests: list,
+                 start: int,
+                 invoke_request: 'InvokeRequest') -> None:
+        """Constructor
+
+        The txs from start to the next tx which can not be executed speculatively are submitted
+
+        :param executor: worker threads
+        :param context: invoke context of the block
+        :param tx_requests: txs in the block
+        :param start: the index of the first tx to execute
+        :param invoke_request: executes a tx on a context
+        """
+        end = start
+        while end < len(tx_requests) and is_speculative(tx_requests[end]):
+            end += 1
+        self._start = start
+        self._end = end
+
+        # The workers read a copy, as the block batch of the context is updated by every tx
+        block_batch = BlockBatch(context.block_batch.block, context.block_batch.parent)
+        block_batch.update(context.block_batch)
+
+        # Each worker gets its own copy of the tx, as the params are converted in place by the SCORE engine
+        # and the tx is executed again serially when the speculation is dropped
+        self._futures = {
+            index: executor.submit(
+                self._run, context, block_batch, copy.deepcopy(tx_requests[index]), index, invoke_request)
+            for index in range(start, end)}
+        self._block = context.block
+        # Keys written by the txs of the block since start
+        self._written_keys = set()
+        self._conflict_count = 0
+
+    @property
+    def end(self) -> int:
+        """The index of the tx which is next to the last one
+        """
+        return self._end
+
+    @staticmethod
+    def _run(context: 'IconScoreContext',
+             block_batch: 'BlockBatch',
+             tx_request: dict,
+             index: int,
+             invoke_request: 'InvokeRequest') -> Tuple['TransactionResult', 'TransactionBatch', 'IconScoreMapper']:
+        spec_context = IconScoreContext(IconScoreContextType.INVOKE)
+        spec_context.block = context.block
+        spec_context.revision = context.revision
+        spec_context.governance_snapshot = context.governance_snapshot
+        spec_context.step_counter = copy.copy(context.step_counter)
+        spec_context.block_batch = block_batch
+        spec_context.tx_batch = TransactionBatch(track_reads=True)
+        # The SCOREs of the block are not changed until the next deploy, which ends the speculation
+        score_mapper = _SpeculativeScoreMapper(context.new_icon_score_mapper)
+        spec_context.new_icon_score_mapper = score_mapper
+
+        tx_result = invoke_request(spec_context, tx_request, index)
+        return tx_result, spec_context.tx_batch, score_mapper
+
+    def take(self, context: 'IconScoreContext', index: int) -> Optional['TransactionResult']:
+        """Puts the states written by a tx into context.tx_batch if its result is still valid
+
+        :param context: invoke context of the block
+        :param index: the index of the tx
+        :return: tx result or None if the tx has to be executed again
+        """
+        future: 'Future' = self._futures.pop(index)
+        try:
+            tx_result, tx_batch, score_mapper = future.result()
+        except BaseException as e:
+            Logger.warning(f'Speculative execution failed: {e}', ICON_SERVICE_LOG_TAG)
+            tx_result = None
+        else:
+            if self._written_keys and tx_batch.has_read_any(self._written_keys):
+                tx_result = None
+            elif score_mapper.items():
+                # The SCOREs put by the tx are loaded again on the context of the block
+                tx_result = None
+
+        if tx_result is None:
+            self._conflict_count += 1
+            return None
+
+        for key in tx_batch:
+            context.tx_batch[key] = tx_batch[key]
+
+        context.cumulative_step_used += tx_result.step_used
+        tx_result.cumulative_step_used = context.cumulative_step_used
+        return tx_result
+
+    def on_merged(self, tx_batch: 'TransactionBatch') -> None:
+        """Records the states of a tx which are about to be merged into the block batch
+        """
+        self._written_keys.update(tx_batch)
+
+    def on_written(self, key: bytes) -> None:
+        """Records a state written to the block batch outside of the txs such as the fee treasury
+        """
+        self._written_keys.add(key)
+
+    def close(self) -> None:
+        """Drops the results which have not been taken
+        """
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+
+        if self._conflict_count > 0:
+            Logger.info(f'{self._conflict_count}/{self._end - self._start} txs invoked again: block({self._block})',
+                        ICON_SERVICE_LOG_TAG)
+
+
+class ParallelInvoker(object):
+    """Executes the txs of a block in worker threads ahead of the block order
+
+    The block batch, the tx results and the state root hash are the same as the ones of serial execution.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        """Constructor
+
+        :param max_workers: the number of invoke threads
+        """
+        if max_workers < 1:
+            raise ValueError(f'Invalid max_workers: {max_workers}')
+
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='invoke')
+
+    def speculate(self,
+                  context: 'IconScoreContext',
+                  tx_requests: list,
+                  start: int,
+                  invoke_request: 'InvokeRequest') -> 'Speculation':
+        return Speculation(self._executor, context, tx_requests, start, invoke_request)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown()
@@ -13,15 +13,29 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+from collections import deque
 from enum import IntFlag
+from struct import Struct
 from threading import Lock
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, List, Optional
 
+from iconcommons.logger import Logger
 from .base.block import Block
-from .base.exception import ServerErrorException
+from .base.exception import DatabaseException, ServerErrorException
 from .database.batch import BlockBatch
+from .icon_constant import ICON_SERVICE_LOG_TAG
 from .iconscore.icon_score_mapper import IconScoreMapper
 
+if TYPE_CHECKING:
+    from .iconscore.icon_score_mapper_object import IconScoreInfo
+    from .iconscore.icon_score_result import TransactionResult
+    from .governance_snapshot import GovernanceSnapshot
+
 
 class PrecommitFlag(IntFlag):
     # Empty
@@ -36,37 +50,360 @@ class PrecommitFlag(IntFlag):
     STEP_ALL_CHANGED = 0xf0
 
 
+class TransactionCheckpoint(object):
+    """What a transaction in a candidate block has done on top of the previous transactions
+
+    Another candidate block on the same parent with the same leading transactions
+    can take it instead of executing the transaction again.
+    """
+
+    def __init__(self,
+                 tx_hash: bytes,
+                 states: dict,
+                 tx_result: 'TransactionResult',
+                 precommit_flag: PrecommitFlag,
+                 block_independent: bool,
+                 score_info: Optional['IconScoreInfo'] = None,
+                 pending_fee: int = 0):
+        """
+
+        :param tx_hash: transaction hash
+        :param states: states changed by the transaction in the order of writes
+        :param tx_result: transaction result
+        :param precommit_flag: precommit flag generated by the transaction
+        :param block_independent: True if the result does not depend on the block timestamp
+        :param score_info: the SCORE deployed by the transaction
+        :param pending_fee: fees of the previous transactions which the treasury had not received
+            when the transaction ended
+        """
+        self.tx_hash = tx_hash
+        self.states = states
+        self.tx_result = tx_result
+        self.precommit_flag = precommit_flag
+        self.block_independent = block_independent
+        self.score_info = score_info
+        self.pending_fee = pending_fee
+
+
 class PrecommitData(object):
     def __init__(self,
                  block_batch: 'BlockBatch',
                  block_result: list,
                  score_mapper: Optional['IconScoreMapper']=None,
-                 precommit_flag: PrecommitFlag = PrecommitFlag.NONE):
+                 precommit_flag: PrecommitFlag = PrecommitFlag.NONE,
+                 parent: Optional['PrecommitData'] = None):
         """
 
         :param block_batch: changed states for a block
         :param block_result: tx_results made from transactions in a block
         :param score_mapper: newly deployed scores in a block
         :param precommit_flag: precommit flag
+        :param parent: precommit data of the parent block. None if the parent block has been committed
 
         """
+        self.parent = parent
         self.block_batch = block_batch
         self.block_result = block_result
         self.score_mapper = score_mapper
         self.precommit_flag = precommit_flag
         self.block = block_batch.block
         self.state_root_hash: bytes = self.block_batch.digest()
+        # The nodes and the root of the state tree to write on commit. None if the tree is disabled
+        self.state_tree_nodes: Optional[dict] = None
+        # One for each transaction in the block
+        self.checkpoints: List['TransactionCheckpoint'] = []
+        # Governance parameters at the end of the block. None if they have to be read again
+        self.governance_snapshot: Optional['GovernanceSnapshot'] = None
+        # True while block_batch, block_result and state_tree_nodes are in PrecommitSpillStore
+        self.spilled = False
+
+    def estimate_size(self) -> int:
+        """Estimates the memory used by the states in bytes
+
+        :return:
+        """
+        size = _get_states_size(self.block_batch)
+        if self.state_tree_nodes:
+            size += _get_states_size(self.state_tree_nodes)
+        for checkpoint in self.checkpoints:
+            size += _get_states_size(checkpoint.states)
+        return size
+
+    def get_chain(self) -> List['PrecommitData']:
+        """Returns this precommit data and the ones of its uncommitted ancestors from the nearest
+
+        :return:
+        """
+        chain = []
+        precommit_data = self
+        while precommit_data is not None:
+            chain.append(precommit_data)
+            precommit_data = precommit_data.parent
+        return chain
+
+    def is_descendant_of(self, ancestor: 'PrecommitData') -> bool:
+        return any(precommit_data is ancestor for precommit_data in self.get_chain()[1:])
+
+
+def _get_states_size(states: dict) -> int:
+    return sum(len(key) + (len(value) if value else 0) for key, value in states.items())
+
+
+class PrecommitSpillStore(object):
+    """Keeps the precommit data of candidate blocks in local files while they are not needed
+
+    A file is named after the block hash and removed once it is loaded or the block is discarded.
+    """
+
+    def __init__(self, path: str = '') -> None:
+        """Constructor
+
+        :param path: directory for the files. An empty path means a temporary directory
+        """
+        self._is_temp = not path
+        if self._is_temp:
+            path = tempfile.mkdtemp(prefix='precommit_spill_')
+        else:
+            os.makedirs(path, exist_ok=True)
+        self._path = path
+
+        # The bytes and the number of the blocks in the store now
+        self.spilled_bytes = 0
+        self.spilled_count = 0
+        self.total_spilled_bytes = 0
+        self.spill_count = 0
+        self.reload_count = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _get_file_path(self, block_hash: bytes) -> str:
+        return os.path.join(self._path, block_hash.hex())
+
+    def save(self, precommit_data: 'PrecommitData') -> int:
+        """Moves the states and the results of a block to a file
+
+        :param precommit_data:
+        :return: the size of the file
+        """
+        data: bytes = pickle.dumps(
+            (list(precommit_data.block_batch.items()),
+             precommit_data.block_result,
+             precommit_data.state_tree_nodes),
+            pickle.HIGHEST_PROTOCOL)
+
+        with open(self._get_file_path(precommit_data.block.hash), 'wb') as f:
+            f.write(data)
+
+        precommit_data.block_batch = None
+        precommit_data.block_result = None
+        precommit_data.state_tree_nodes = None
+        # Checkpoints are only for reuse, so they are not worth the disk write
+        precommit_data.checkpoints = []
+        precommit_data.spilled = True
+
+        self.spilled_bytes += len(data)
+        self.spilled_count += 1
+        self.total_spilled_bytes += len(data)
+        self.spill_count += 1
+        return len(data)
+
+    def load(self, precommit_data: 'PrecommitData') -> None:
+        """Moves the states and the results of a block back from its file
+
+        :param precommit_data:
+        """
+        file_path: str = self._get_file_path(precommit_data.block.hash)
+        with open(file_path, 'rb') as f:
+            data: bytes = f.read()
+        states, block_result, state_tree_nodes = pickle.loads(data)
+
+        parent: Optional['PrecommitData'] = precommit_data.parent
+        block_batch = BlockBatch(precommit_data.block, None if parent is None else parent.block_batch)
+        block_batch.update(states)
+
+        precommit_data.block_batch = block_batch
+        precommit_data.block_result = block_result
+        precommit_data.state_tree_nodes = state_tree_nodes
+        precommit_data.spilled = False
+        self._remove(file_path, len(data))
+        self.reload_count += 1
+
+    def delete(self, precommit_data: 'PrecommitData') -> None:
+        """Removes the file of a discarded block
+
+        :param precommit_data:
+        """
+        file_path: str = self._get_file_path(precommit_data.block.hash)
+        self._remove(file_path, os.path.getsize(file_path))
+
+    def _remove(self, file_path: str, size: int) -> None:
+        os.remove(file_path)
+        self.spilled_bytes -= size
+        self.spilled_count -= 1
+
+    def close(self) -> None:
+        if self._is_temp:
+            shutil.rmtree(self._path, ignore_errors=True)
+
+    def get_stats(self) -> dict:
+        return {
+            'spilledBytes': self.spilled_bytes,
+            'spilledCount': self.spilled_count,
+            'totalSpilledBytes': self.total_spilled_bytes,
+            'spillCount': self.spill_count,
+            'reloadCount': self.reload_count
+        }
+
+
+class PrecommitDataStore(object):
+    """Persists precommit data so that candidate blocks survive a restart
+
+    A file named after the block hash is written when a block is invoked
+    and removed when the block is discarded or its successor is committed.
+
+    file: crc32 of payload(4) | payload, payload is a pickled record
+    """
+    _HEADER = Struct('>I')
+
+    def __init__(self, path: str) -> None:
+        """Constructor
+
+        :param path: directory for the files
+        """
+        os.makedirs(path, exist_ok=True)
+        self._path = path
+
+    def _get_file_path(self, block_hash: bytes) -> str:
+        return os.path.join(self._path, block_hash.hex())
+
+    def put(self, precommit_data: 'PrecommitData') -> None:
+        """A block which fails to be persisted is only kept in memory
+
+        :param precommit_data: precommit data which has just been invoked
+        """
+        parent: Optional['PrecommitData'] = precommit_data.parent
+        scores = []
+        if precommit_data.score_mapper:
+            scores = [(address, info.tx_hash) for address, info in precommit_data.score_mapper.items()]
+
+        record = {
+            'block': precommit_data.block,
+            'parentHash': None if parent is None else parent.block.hash,
+            'states': list(precommit_data.block_batch.items()),
+            'blockResult': precommit_data.block_result,
+            'precommitFlag': int(precommit_data.precommit_flag),
+            'stateTreeNodes': precommit_data.state_tree_nodes,
+            'scores': scores
+        }
+
+        # A half-written file never replaces a complete one
+        file_path: str = self._get_file_path(precommit_data.block.hash)
+        try:
+            payload: bytes = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+            with open(file_path + '.tmp', 'wb') as f:
+                f.write(self._HEADER.pack(zlib.crc32(payload)))
+                f.write(payload)
+            os.replace(file_path + '.tmp', file_path)
+        except Exception as e:
+            Logger.warning(f'Failed to persist precommit data: block({precommit_data.block}) {e}',
+                           ICON_SERVICE_LOG_TAG)
+
+    def delete(self, block_hash: bytes) -> None:
+        try:
+            os.remove(self._get_file_path(block_hash))
+        except FileNotFoundError:
+            pass
+
+    def load_all(self) -> List[dict]:
+        """Returns the records of all persisted blocks in the ascending order of block height
+
+        Unreadable or corrupted files are removed.
+
+        :return: records. See put()
+        """
+        records = []
+        for name in os.listdir(self._path):
+            file_path = os.path.join(self._path, name)
+            if name.endswith('.tmp'):
+                os.remove(file_path)
+                continue
+
+            try:
+                records.append(self._read(file_path))
+            except BaseException as e:
+                Logger.warning(f'Failed to read precommit data: {file_path} {e}', ICON_SERVICE_LOG_TAG)
+                os.remove(file_path)
+
+        records.sort(key=lambda record: record['block'].height)
+        return records
+
+    def _read(self, file_path: str) -> dict:
+        with open(file_path, 'rb') as f:
+            data: bytes = f.read()
+
+        if len(data) < self._HEADER.size:
+            raise DatabaseException('Truncated precommit data')
+        crc, = self._HEADER.unpack_from(data)
+        payload: bytes = data[self._HEADER.size:]
+        if zlib.crc32(payload) != crc:
+            raise DatabaseException('Corrupted precommit data')
+
+        return pickle.loads(payload)
 
 
 class PrecommitDataManager(object):
-    """Manages multiple precommit data made from next candidate block
+    """Manages multiple precommit data made from next candidate blocks
+
+    A block can be invoked on top of an uncommitted block,
+    so precommit data form a tree whose root is the last committed block.
 
+    With a memory budget, the oldest candidate blocks beyond it are spilled to PrecommitSpillStore
+    and loaded again when they are needed.
     """
+    # The number of rolled back candidate blocks whose checkpoints are kept
+    MAX_DISCARDED_CANDIDATES = 4
 
     def __init__(self):
         self._lock = Lock()
         self._precommit_data_mapper = {}
         self._last_block: 'Block' = None
+        # (block, checkpoints) of rolled back candidate blocks
+        self._discarded = deque(maxlen=self.MAX_DISCARDED_CANDIDATES)
+
+        # 0 means no limit
+        self._memory_budget = 0
+        # Estimated bytes of the precommit data in memory
+        self._memory_size = 0
+        self._spill_store: Optional['PrecommitSpillStore'] = None
+
+        self._store: Optional['PrecommitDataStore'] = None
+        # The file of the last committed block is kept until the next commit,
+        # because its states may not have been written to StateDB yet
+        self._committed_hash: Optional[bytes] = None
+
+    def open_spill_store(self, memory_budget: int, path: str = '') -> None:
+        """Limits the memory used by precommit data
+
+        :param memory_budget: bytes. 0 means no limit
+        :param path: directory where precommit data are spilled. An empty path means a temporary directory
+        """
+        self.close_spill_store()
+        if memory_budget <= 0:
+            return
+
+        self._memory_budget = memory_budget
+        self._spill_store = PrecommitSpillStore(path)
+        Logger.info(f'precommit memory budget: {memory_budget} spill path: {self._spill_store.path}',
+                    ICON_SERVICE_LOG_TAG)
+
+    def close_spill_store(self) -> None:
+        if self._spill_store is not None:
+            self._spill_store.close()
+            self._spill_store = None
+        self._memory_budget = 0
+        self._memory_size = 0
 
     @property
     def last_block(self) -> 'Block':
@@ -83,24 +420,228 @@ class PrecommitDataManager(object):
         with self._lock:
             self._last_block = block
 
+    def open_store(self, path: str, load_score_mapper: Callable[[list], 'IconScoreMapper']) -> int:
+        """Starts persisting precommit data and restores the blocks persisted before a restart
+
+        Only the blocks on top of the last committed block are restored.
+
+        :param path: directory where precommit data are persisted
+        :param load_score_mapper: makes IconScoreMapper from [(score address, tx hash)] of deployed scores
+        :return: the number of restored blocks
+        """
+        self._store = PrecommitDataStore(path)
+
+        for record in self._store.load_all():
+            block: 'Block' = record['block']
+            parent: Optional['PrecommitData'] = None
+
+            if self._last_block is None:
+                on_last_block: bool = record['parentHash'] is None
+            else:
+                on_last_block: bool = \
+                    block.prev_hash == self._last_block.hash and block.height == self._last_block.height + 1
+
+            if not on_last_block:
+                parent = self._precommit_data_mapper.get(block.prev_hash)
+                if parent is None or parent.block.height + 1 != block.height:
+                    # Committed or orphaned
+                    self._store.delete(block.hash)
+                    continue
+
+            try:
+                score_mapper = load_score_mapper(record['scores'])
+            except BaseException as e:
+                Logger.exception(f'Failed to load SCOREs of precommit data: block({block}) {e}',
+                                 ICON_SERVICE_LOG_TAG)
+                self._store.delete(block.hash)
+                continue
+
+            block_batch = BlockBatch(block, None if parent is None else parent.block_batch)
+            block_batch.update(record['states'])
+            precommit_data = PrecommitData(block_batch, record['blockResult'], score_mapper,
+                                           PrecommitFlag(record['precommitFlag']), parent)
+            precommit_data.state_tree_nodes = record['stateTreeNodes']
+            self._add(precommit_data)
+            Logger.info(f'Restore precommit data: block({block})', ICON_SERVICE_LOG_TAG)
+
+        return len(self._precommit_data_mapper)
+
+    def close_store(self) -> None:
+        self._store = None
+
     def push(self, precommit_data: 'PrecommitData'):
+        if self._store is not None:
+            self._store.put(precommit_data)
+        self._add(precommit_data)
+
+    def _add(self, precommit_data: 'PrecommitData') -> None:
         block: 'Block' = precommit_data.block_batch.block
         self._precommit_data_mapper[block.hash] = precommit_data
 
+        if self._spill_store is not None:
+            self._memory_size += precommit_data.estimate_size()
+            self._spill_if_necessary(precommit_data)
+
     def get(self, block_hash: 'bytes') -> Optional['PrecommitData']:
+        """Returns the precommit data of a block loading it from PrecommitSpillStore if it has been spilled
+
+        :param block_hash:
+        :return:
+        """
         precommit_data = self._precommit_data_mapper.get(block_hash)
+        if precommit_data is not None and precommit_data.spilled:
+            self._spill_store.load(precommit_data)
+            self._memory_size += precommit_data.estimate_size()
+            self._spill_if_necessary(precommit_data)
+
         return precommit_data
 
+    def _spill_if_necessary(self, in_use: 'PrecommitData') -> None:
+        """Spills the oldest candidate blocks until the memory size is within the budget
+
+        The block in use and the blocks which have children are never spilled,
+        because the children read the states of their ancestors.
+
+        :param in_use: precommit data which is about to be used
+        """
+        if self._memory_size <= self._memory_budget:
+            return
+
+        parents = {id(data.parent) for data in self._precommit_data_mapper.values() if data.parent is not None}
+
+        for precommit_data in self._precommit_data_mapper.values():
+            if self._memory_size <= self._memory_budget:
+                break
+            if precommit_data is in_use or precommit_data.spilled or id(precommit_data) in parents:
+                continue
+
+            size: int = precommit_data.estimate_size()
+            self._spill_store.save(precommit_data)
+            self._memory_size -= size
+            Logger.info(f'Spill precommit data: block({precommit_data.block}) size({size})', ICON_SERVICE_LOG_TAG)
+
+    def _discard(self, precommit_data: 'PrecommitData') -> None:
+        """Releases the memory or the file of the precommit data which is not used anymore
+        """
+        if self._store is not None and precommit_data.block.hash != self._committed_hash:
+            self._store.delete(precommit_data.block.hash)
+
+        if self._spill_store is None:
+            return
+
+        if precommit_data.spilled:
+            self._spill_store.delete(precommit_data)
+        else:
+            self._memory_size -= precommit_data.estimate_size()
+
+    def get_stats(self) -> dict:
+        """Returns the memory usage of precommit data and the metrics of spilling
+
+        :return:
+        """
+        stats = {
+            'count': len(self._precommit_data_mapper),
+            'memoryBudget': self._memory_budget,
+            'memoryBytes': self._memory_size
+        }
+        if self._spill_store is not None:
+            stats.update(self._spill_store.get_stats())
+        return stats
+
     def commit(self, block: 'Block'):
+        """Makes a committed block the new root of the precommit data tree
+
+        The states of the block MUST have been handed to StateDB before,
+        because its children read them from StateDB from now on.
+
+        :param block: committed block
+        """
         with self._lock:
             self._last_block = block
 
-        # Clear remaining precommit data which have the same block height
-        self._precommit_data_mapper.clear()
+        # The states of the previous committed block have been written to StateDB
+        # because a commit waits for the pending write
+        if self._store is not None:
+            if self._committed_hash is not None:
+                self._store.delete(self._committed_hash)
+            self._committed_hash = block.hash
+
+        committed = self._precommit_data_mapper.get(block.hash)
+
+        # Prunes the other branches including the remaining blocks of the same height
+        remaining = {}
+        for block_hash, precommit_data in self._precommit_data_mapper.items():
+            if committed is not None and precommit_data.is_descendant_of(committed):
+                remaining[block_hash] = precommit_data
+
+        for precommit_data in remaining.values():
+            if precommit_data.parent is committed:
+                precommit_data.parent = None
+                if not precommit_data.spilled:
+                    precommit_data.block_batch.parent = None
+
+        for block_hash, precommit_data in self._precommit_data_mapper.items():
+            if block_hash not in remaining:
+                self._discard(precommit_data)
+
+        self._precommit_data_mapper = remaining
+
+        # Candidates at the committed height or below can not be proposed anymore
+        self._discarded = deque(
+            (item for item in self._discarded if item[0].height > block.height),
+            maxlen=self.MAX_DISCARDED_CANDIDATES)
 
     def rollback(self, block: 'Block'):
-        if block.hash in self._precommit_data_mapper:
-            del self._precommit_data_mapper[block.hash]
+        """Drops the precommit data of a block and all its descendants
+
+        :param block:
+        """
+        precommit_data = self._precommit_data_mapper.get(block.hash)
+        if precommit_data is None:
+            raise ServerErrorException(f'No precommit data: precommit_block({block})')
+
+        remaining = {}
+        for block_hash, data in self._precommit_data_mapper.items():
+            if data is precommit_data or data.is_descendant_of(precommit_data):
+                self._discard(data)
+            else:
+                remaining[block_hash] = data
+        self._precommit_data_mapper = remaining
+
+        # The descendants are not kept because no block will be proposed on top of a rolled back block
+        if precommit_data.checkpoints:
+            self._discarded.append((precommit_data.block, precommit_data.checkpoints))
+
+    def find_checkpoints(self, block: 'Block', tx_hashes: List[bytes]) -> List['TransactionCheckpoint']:
+        """Finds the longest run of checkpoints which a block can resume from
+
+        The checkpoints are taken from the candidate blocks on the same parent
+        whose leading transactions are the same as the ones of the block.
+        If the block timestamp is different, the run stops at a transaction depending on it.
+
+        :param block: block to invoke
+        :param tx_hashes: the hashes of the transactions in the block
+        :return: checkpoints for tx_hashes[:len(checkpoints)]
+        """
+        candidates = [(data.block, data.checkpoints) for data in self._precommit_data_mapper.values()]
+        candidates.extend(self._discarded)
+
+        longest = []
+        for candidate, checkpoints in candidates:
+            if candidate.prev_hash != block.prev_hash or candidate.height != block.height:
+                continue
+
+            same_timestamp: bool = candidate.timestamp == block.timestamp
+            count = 0
+            for checkpoint, tx_hash in zip(checkpoints, tx_hashes):
+                if checkpoint.tx_hash != tx_hash or not (same_timestamp or checkpoint.block_independent):
+                    break
+                count += 1
+
+            if count > len(longest):
+                longest = checkpoints[:count]
+
+        return longest
 
     def empty(self) -> bool:
         return len(self._precommit_data_mapper) == 0
@@ -110,19 +651,30 @@ class PrecommitDataManager(object):
 
         :return:
         """
+        for precommit_data in self._precommit_data_mapper.values():
+            self._discard(precommit_data)
         self._precommit_data_mapper.clear()
+        self._discarded.clear()
 
-    def validate_block_to_invoke(self, block: 'Block'):
+    def validate_block_to_invoke(self, block: 'Block') -> Optional['PrecommitData']:
         """Check if the block to invoke is valid before invoking it
 
+        The parent of the block is either the last committed block or an uncommitted block.
+
         :param block: block to invoke
+        :return: precommit data of the parent block. None if the parent block has been committed
         """
         if self._last_block is None:
-            return
+            return None
 
         if block.prev_hash == self._last_block.hash and \
                 block.height == self._last_block.height + 1:
-            return
+            return None
+
+        parent: Optional['PrecommitData'] = self._precommit_data_mapper.get(block.prev_hash)
+        if parent is not None and block.height == parent.block.height + 1:
+            # The parent is never spilled again once it has a child
+            return self.get(block.prev_hash)
 
         raise ServerErrorException(
             f'Failed to invoke a block: '
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import Executor, Future
+from concurrent.futures.thread import ThreadPoolExecutor
+from threading import Lock
+from typing import List
+
+
+class QueryWorkerPool(Executor):
+    """Executor which runs queries on several single-threaded workers
+
+    A query is dispatched to the worker which has the fewest pending queries.
+    The number of pending queries of each worker is reported with queue_depths.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        """Constructor
+
+        :param max_workers: the number of query threads
+        """
+        if max_workers < 1:
+            raise ValueError(f'Invalid max_workers: {max_workers}')
+
+        self._lock = Lock()
+        self._workers: List[ThreadPoolExecutor] = \
+            [ThreadPoolExecutor(1, thread_name_prefix=f'query-{i}') for i in range(max_workers)]
+        self._pending: List[int] = [0] * max_workers
+
+    @property
+    def max_workers(self) -> int:
+        return len(self._workers)
+
+    @property
+    def queue_depths(self) -> List[int]:
+        """The number of pending queries including a running one per worker
+        """
+        with self._lock:
+            return list(self._pending)
+
+    def submit(self, fn, *args, **kwargs) -> 'Future':
+        with self._lock:
+            index = self._pending.index(min(self._pending))
+            self._pending[index] += 1
+
+        try:
+            future = self._workers[index].submit(fn, *args, **kwargs)
+        except BaseException:
+            self._on_done(index)
+            raise
+
+        future.add_done_callback(lambda _: self._on_done(index))
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        for worker in self._workers:
+            worker.shutdown(wait)
+
+    def _on_done(self, index: int) -> None:
+        with self._lock:
+            self._pending[index] -= 1
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from iconservice.base.exception import DatabaseException
+from iconservice.database.backend import BackendType, open_backend, make_level_db_options
+from iconservice.database.db import KeyValueDatabase
+from iconservice.icon_constant import ConfigKey
+from tests import rmtree
+
+
+class _TestBackend(object):
+    """Common tests run against every backend
+    """
+    BACKEND: str = None
+
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        path = os.path.join(self.state_db_root_path, 'db')
+        self.db = KeyValueDatabase.from_path(path, True, self.BACKEND)
+
+    def tearDown(self):
+        self.db.close()
+        rmtree(self.state_db_root_path)
+
+    def test_get_put_delete(self):
+        db = self.db
+
+        db.put(b'key0', b'value0')
+        self.assertEqual(b'value0', db.get(b'key0'))
+        self.assertIsNone(db.get(b'key1'))
+
+        db.delete(b'key0')
+        self.assertIsNone(db.get(b'key0'))
+
+    def test_write_batch(self):
+        db = self.db
+        db.put(b'key2', b'value2')
+
+        db.write_batch({b'key0': b'value0', b'key1': b'value1', b'key2': None})
+
+        self.assertEqual(b'value0', db.get(b'key0'))
+        self.assertEqual(b'value1', db.get(b'key1'))
+        self.assertIsNone(db.get(b'key2'))
+
+    def test_iterate(self):
+        db = self.db
+        db.write_batch({b'a': b'0', b'ab': b'1', b'ac': b'2', b'b': b'3'})
+
+        self.assertEqual([(b'a', b'0'), (b'ab', b'1'), (b'ac', b'2'), (b'b', b'3')], list(db.iterator()))
+        self.assertEqual([b'ac', b'ab', b'a'], [key for key, _ in db.iterate(b'a', reverse=True)])
+        self.assertEqual([b'ab'], [key for key, _ in db.iterate(start=b'aa', stop=b'ac')])
+
+    def test_snapshot(self):
+        db = self.db
+        db.put(b'key0', b'value0')
+
+        snapshot = db.get_snapshot()
+        db.write_batch({b'key0': b'value1', b'key1': b'value1'})
+
+        self.assertEqual(b'value0', snapshot.get(b'key0'))
+        self.assertIsNone(snapshot.get(b'key1'))
+        self.assertEqual([(b'key0', b'value0')], list(snapshot.iterate()))
+        self.assertEqual(b'value1', db.get(b'key0'))
+
+    def test_sub_db(self):
+        db = self.db
+        sub_db = db.get_sub_db(b'sub|')
+
+        sub_db.put(b'key0', b'value0')
+        sub_db.write_batch({b'key1': b'value1'})
+        db.put(b'su', b'other')
+
+        self.assertEqual(b'value0', db.get(b'sub|key0'))
+        self.assertEqual(b'value1', sub_db.get(b'key1'))
+        self.assertEqual([(b'key0', b'value0'), (b'key1', b'value1')], list(sub_db.iterate()))
+
+
+class TestLevelDBBackend(_TestBackend, unittest.TestCase):
+    BACKEND = BackendType.LEVELDB
+
+
+class TestMemoryBackend(_TestBackend, unittest.TestCase):
+    BACKEND = BackendType.MEMORY
+
+
+class TestSqliteBackend(_TestBackend, unittest.TestCase):
+    BACKEND = BackendType.SQLITE
+
+    def test_reopen(self):
+        self.db.put(b'key0', b'value0')
+        self.db.close()
+
+        path = os.path.join(self.state_db_root_path, 'db')
+        self.db = KeyValueDatabase.from_path(path, False, self.BACKEND)
+        self.assertEqual(b'value0', self.db.get(b'key0'))
+
+
+class TestOpenBackend(unittest.TestCase):
+    def test_unknown_backend(self):
+        self.assertRaises(DatabaseException, open_backend, 'path', 'unknown')
+
+    def test_make_level_db_options(self):
+        conf = {
+            ConfigKey.LEVEL_DB_BLOCK_CACHE_SIZE: 512 * 1024 * 1024,
+            ConfigKey.LEVEL_DB_WRITE_BUFFER_SIZE: None,
+            ConfigKey.LEVEL_DB_BLOOM_FILTER_BITS: 10,
+            ConfigKey.LEVEL_DB_MAX_OPEN_FILES: 5000,
+            ConfigKey.LEVEL_DB_COMPRESSION: 'none'
+        }
+        expected = {
+            'lru_cache_size': 512 * 1024 * 1024,
+            'bloom_filter_bits': 10,
+            'max_open_files': 5000,
+            'compression': None
+        }
+        self.assertEqual(expected, make_level_db_options(conf))
+        self.assertEqual({}, make_level_db_options(None))
+
+        self.assertRaises(DatabaseException, make_level_db_options, {'unknown': 1})
+        self.assertRaises(DatabaseException, make_level_db_options, {ConfigKey.LEVEL_DB_MAX_OPEN_FILES: -1})
+        self.assertRaises(DatabaseException, make_level_db_options, {ConfigKey.LEVEL_DB_COMPRESSION: 'zlib'})
+
+
+if __name__ == '__main__':
+    unittest.main()
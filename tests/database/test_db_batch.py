@@ -119,6 +119,7 @@ class TestBatch(unittest.TestCase):
 
         block_batch[key2] = None
         hash1 = block_batch.digest()
+        self.assertEqual(sha3_256(b'|'.join(data[:-1])), hash1)
         block_batch[key2] = b''
         hash2 = block_batch.digest()
         self.assertNotEqual(hash1, hash2)
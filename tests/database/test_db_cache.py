@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.cache import LRUCache
+from iconservice.database.db import ContextDatabase
+from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
+from tests import rmtree
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_and_put(self):
+        cache = LRUCache(2)
+
+        hit, value = cache.get(b'key0')
+        self.assertFalse(hit)
+        self.assertIsNone(value)
+        self.assertEqual(1, cache.misses)
+
+        self.assertTrue(cache.put(b'key0', b'value0', cache.version))
+        self.assertTrue(cache.put(b'key1', None, cache.version))
+
+        self.assertEqual((True, b'value0'), cache.get(b'key0'))
+        # None is cached for an absent key
+        self.assertEqual((True, None), cache.get(b'key1'))
+        self.assertEqual(2, cache.hits)
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.put(b'key0', b'value0', cache.version)
+        cache.put(b'key1', b'value1', cache.version)
+
+        # key0 becomes the most recently used item
+        cache.get(b'key0')
+        cache.put(b'key2', b'value2', cache.version)
+
+        self.assertEqual(2, len(cache))
+        self.assertTrue(cache.get(b'key0')[0])
+        self.assertFalse(cache.get(b'key1')[0])
+        self.assertTrue(cache.get(b'key2')[0])
+
+    def test_update(self):
+        cache = LRUCache(10)
+        version = cache.version
+        cache.put(b'key0', b'value0', version)
+
+        cache.update({b'key0': b'new_value0', b'key1': b'', b'key2': None})
+        self.assertNotEqual(version, cache.version)
+
+        self.assertEqual((True, b'new_value0'), cache.get(b'key0'))
+        self.assertEqual((True, None), cache.get(b'key1'))
+        self.assertEqual((True, None), cache.get(b'key2'))
+
+        # A value read before update() is not cached
+        self.assertFalse(cache.put(b'key3', b'old_value3', version))
+        self.assertFalse(cache.get(b'key3')[0])
+
+
+class TestContextDatabaseWithCache(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        db_path = os.path.join(self.state_db_root_path, 'db')
+        self.context_db = ContextDatabase.from_path(db_path, True, cache_size=100)
+
+    def tearDown(self):
+        self.context_db.close(None)
+        rmtree(self.state_db_root_path)
+
+    def test_read_through(self):
+        db = self.context_db
+        cache = db.cache
+        db.key_value_db.put(b'key0', b'value0')
+
+        self.assertEqual(b'value0', db.get(None, b'key0'))
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(b'value0', db.get(None, b'key0'))
+        self.assertEqual(1, cache.hits)
+
+        self.assertIsNone(db.get(None, b'key1'))
+        self.assertIsNone(db.get(None, b'key1'))
+        self.assertEqual(2, cache.hits)
+
+    def test_write_batch_updates_cache(self):
+        db = self.context_db
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+
+        db.put(None, b'key0', b'value0')
+        self.assertEqual(b'value0', db.get(context, b'key0'))
+
+        db.put(context, b'key0', b'value1')
+        db.delete(context, b'key1')
+        context.block_batch.update(context.tx_batch)
+
+        # Uncommitted states are not visible to a query
+        query_context = IconScoreContext(IconScoreContextType.QUERY)
+        self.assertEqual(b'value0', db.get(query_context, b'key0'))
+
+        db.write_batch(None, context.block_batch)
+        self.assertEqual(b'value1', db.get(query_context, b'key0'))
+        self.assertIsNone(db.get(query_context, b'key1'))
+
+        db.delete(None, b'key0')
+        self.assertIsNone(db.get(None, b'key0'))
+        self.assertIsNone(db.key_value_db.get(b'key0'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,7 +16,10 @@
 
 
 import os
+import threading
 import unittest
+from concurrent.futures.thread import ThreadPoolExecutor
+from unittest.mock import Mock
 
 from iconservice.base.address import Address, AddressPrefix
 from iconservice.base.exception import DatabaseException
@@ -65,6 +68,16 @@ class TestKeyValueDatabase(unittest.TestCase):
         self.assertEqual(b'value1', db.get(b'key1'))
         self.assertEqual(b'value0', db.get(b'key0'))
 
+    def test_iterate(self):
+        db = self.db
+        db.write_batch({b'a': b'0', b'ab': b'1', b'ac': b'2', b'b\xff': b'3', b'c': b'4'})
+
+        self.assertEqual([b'a', b'ab', b'ac', b'b\xff', b'c'], [key for key, _ in db.iterate()])
+        self.assertEqual([(b'a', b'0'), (b'ab', b'1'), (b'ac', b'2')], list(db.iterate(prefix=b'a')))
+        self.assertEqual([b'ac', b'ab'], [key for key, _ in db.iterate(b'a', start=b'ab', reverse=True)])
+        self.assertEqual([b'ab'], [key for key, _ in db.iterate(b'a', start=b'aa', stop=b'ac')])
+        self.assertEqual([b'b\xff'], [key for key, _ in db.iterate(b'b\xff')])
+
 
 class TestContextDatabaseOnWriteMode(unittest.TestCase):
     def setUp(self):
@@ -203,6 +216,28 @@ class TestContextDatabaseOnWriteMode(unittest.TestCase):
         self.assertIsNone(tx_batch[b'key0'])
 
 
+    def test_track_reads(self):
+        context = self.context
+        db = self.context_db
+        context.tx_batch = TransactionBatch(track_reads=True)
+
+        db.get(context, b'key0')
+        db.get_many(context, [b'key1', b'key2'])
+        list(db.iterate(context, prefix=b'prefix|'))
+        # A failed tx keeps what it has read
+        context.tx_batch.clear()
+
+        self.assertEqual({b'key0', b'key1', b'key2'}, context.tx_batch.read_keys)
+        self.assertEqual([(b'prefix|', b'prefix}')], context.tx_batch.read_ranges)
+        self.assertTrue(context.tx_batch.has_read_any({b'key1', b'key3'}))
+        self.assertTrue(context.tx_batch.has_read_any({b'prefix|a'}))
+        self.assertFalse(context.tx_batch.has_read_any({b'key3', b'prefix}'}))
+
+        # Reads are not tracked by default
+        context.tx_batch = TransactionBatch()
+        db.get(context, b'key0')
+        self.assertIsNone(context.tx_batch.read_keys)
+
 class TestIconScoreDatabase(unittest.TestCase):
     def setUp(self):
         state_db_root_path = 'state_db'
@@ -234,3 +269,209 @@ class TestIconScoreDatabase(unittest.TestCase):
 
         db.put(key, value.to_bytes(32, DATA_BYTE_ORDER))
         self.assertEqual(value.to_bytes(32, DATA_BYTE_ORDER), db.get(key))
+
+    def test_iterate(self):
+        db = self.db
+        sub_db = db.get_sub_db(b'sub')
+        other_db = IconScoreDatabase(Address.from_data(AddressPrefix.CONTRACT, b'1'), db._context_db)
+
+        for key in (b'key0', b'key1', b'key2', b'other'):
+            sub_db.put(key, key + b'_value')
+        db.put(b'key', b'value')
+        other_db.put(b'key0', b'value0')
+
+        self.assertEqual([(b'key0', b'key0_value'), (b'key1', b'key1_value'), (b'key2', b'key2_value')],
+                         list(sub_db.iterate(b'key')))
+        self.assertEqual([b'key2', b'key1'], [key for key, _ in sub_db.iterate(start=b'key1', stop=b'key3', reverse=True)])
+        self.assertEqual(4, len(list(sub_db.iterate())))
+
+        self.assertEqual([b'key1_value', None], sub_db.get_many([b'key1', b'key3']))
+
+        observer = Mock()
+        sub_db.set_observer(observer)
+        self.assertEqual([b'key2_value', b'key0_value'], list(sub_db.iter_values([b'key2', b'key0'], chunk_size=1)))
+        self.assertEqual(2, observer.on_get.call_count)
+
+        observer.reset_mock()
+        list(sub_db.iterate(b'key'))
+        self.assertEqual(3, observer.on_get.call_count)
+        observer.on_get.assert_called_with(None, b'key2', b'key2_value')
+
+
+class TestContextDatabaseIterate(unittest.TestCase):
+    def setUp(self):
+        state_db_root_path = 'state_db'
+        self.state_db_root_path = state_db_root_path
+        rmtree(state_db_root_path)
+        os.mkdir(state_db_root_path)
+
+        db_path = os.path.join(state_db_root_path, 'db')
+        self.context_db = ContextDatabase.from_path(db_path, True)
+        self.context_db.write_batch(None, {b'key0': b'0', b'key2': b'2', b'key4': b'4', b'other': b'5'})
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        self.context = context
+
+    def tearDown(self):
+        self.context_db.close(None)
+        rmtree(self.state_db_root_path)
+
+    def test_iterate_with_batch(self):
+        context = self.context
+        db = self.context_db
+
+        # block_batch
+        context.block_batch[b'key1'] = b'1'
+        context.block_batch[b'key2'] = None
+        # tx_batch overrides block_batch
+        context.tx_batch[b'key1'] = b'1-tx'
+        context.tx_batch[b'key5'] = b'5-tx'
+        context.tx_batch.enter_call()
+        context.tx_batch[b'key4'] = None
+
+        expected = [(b'key0', b'0'), (b'key1', b'1-tx'), (b'key5', b'5-tx')]
+        self.assertEqual(expected, list(db.iterate(context, b'key')))
+        self.assertEqual(expected[::-1], list(db.iterate(context, b'key', reverse=True)))
+        self.assertEqual(expected[1:2], list(db.iterate(context, b'key', start=b'key1', stop=b'key5')))
+
+        # Uncommitted states are not visible on DIRECT context
+        self.assertEqual([(b'key0', b'0'), (b'key2', b'2'), (b'key4', b'4')], list(db.iterate(None, b'key')))
+
+    def test_get_many(self):
+        context = self.context
+        db = self.context_db
+
+        context.block_batch[b'key1'] = b'1'
+        context.block_batch[b'key2'] = None
+        context.tx_batch[b'key1'] = b'1-tx'
+
+        keys = [b'key4', b'key1', b'key2', b'key3', b'key0']
+        self.assertEqual([b'4', b'1-tx', None, None, b'0'], db.get_many(context, keys))
+        self.assertEqual([b'4', None, b'2', None, b'0'], db.get_many(None, keys))
+
+    def test_iterate_on_pinned_snapshot(self):
+        db = self.context_db
+        query_context = IconScoreContext(IconScoreContextType.QUERY)
+        query_context.db_snapshots = {db: db.take_snapshot()}
+
+        db.write_batch(None, {b'key1': b'1', b'key0': None})
+        self.assertEqual([b'key0', b'key2', b'key4'], [key for key, _ in db.iterate(query_context, b'key')])
+
+
+class TestContextDatabaseAsyncWrite(unittest.TestCase):
+    def setUp(self):
+        state_db_root_path = 'state_db'
+        self.state_db_root_path = state_db_root_path
+        rmtree(state_db_root_path)
+        os.mkdir(state_db_root_path)
+
+        db_path = os.path.join(state_db_root_path, 'db')
+        self.context_db = ContextDatabase.from_path(db_path, True)
+        self.context_db.write_batch(None, {b'key0': b'0', b'key2': b'2'})
+
+        # Holds the writer until the event is set
+        self.event = threading.Event()
+        self.executor = ThreadPoolExecutor(1)
+        self.executor.submit(self.event.wait, 5)
+
+    def tearDown(self):
+        self.event.set()
+        self.executor.shutdown()
+        self.context_db.close(None)
+        rmtree(self.state_db_root_path)
+
+    def test_pending_states_are_visible(self):
+        db = self.context_db
+        states = {b'key0': b'0-new', b'key1': b'1', b'key2': None}
+        db.write_batch_async(None, states, self.executor)
+
+        # Not written yet
+        self.assertEqual(b'0', db.key_value_db.get(b'key0'))
+
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        query_context = IconScoreContext(IconScoreContextType.QUERY)
+        query_context.db_snapshots = {db: db.take_snapshot()}
+
+        for ctx in (None, context, query_context):
+            self.assertEqual(b'0-new', db.get(ctx, b'key0'))
+            self.assertIsNone(db.get(ctx, b'key2'))
+            self.assertEqual([b'0-new', b'1', None], db.get_many(ctx, [b'key0', b'key1', b'key2']))
+            self.assertEqual([(b'key0', b'0-new'), (b'key1', b'1')], list(db.iterate(ctx, b'key')))
+
+        self.event.set()
+        db.wait_for_pending_write()
+
+        self.assertEqual(b'0-new', db.key_value_db.get(b'key0'))
+        self.assertIsNone(db.key_value_db.get(b'key2'))
+        self.assertEqual(b'1', db.get(None, b'key1'))
+
+    def test_fence(self):
+        db = self.context_db
+        db.write_batch_async(None, {b'key0': b'0-new'}, self.executor)
+
+        # A synchronous write waits for the pending write
+        threading.Timer(0.1, self.event.set).start()
+        db.put(None, b'key0', b'0-direct')
+        self.assertEqual(b'0-direct', db.key_value_db.get(b'key0'))
+
+    def test_write_error(self):
+        db = self.context_db
+        db.key_value_db.write_batch = Mock(side_effect=DatabaseException('write error'))
+
+        db.write_batch_async(None, {b'key0': b'0-new'}, self.executor)
+        self.event.set()
+
+        self.assertRaises(DatabaseException, db.wait_for_pending_write)
+        self.assertEqual(b'0-new', db.get(None, b'key0'))
+
+        # db is closed even if the pending write has failed
+        self.assertRaises(DatabaseException, db.close, None)
+        self.context_db = ContextDatabase.from_path(os.path.join(self.state_db_root_path, 'db'), True)
+
+
+class TestContextDatabaseSnapshot(unittest.TestCase):
+    def setUp(self):
+        state_db_root_path = 'state_db'
+        self.state_db_root_path = state_db_root_path
+        rmtree(state_db_root_path)
+        os.mkdir(state_db_root_path)
+
+        db_path = os.path.join(state_db_root_path, 'db')
+        self.context_db = ContextDatabase.from_path(db_path, True, cache_size=10)
+
+    def tearDown(self):
+        self.context_db.close(None)
+        rmtree(self.state_db_root_path)
+
+    def _create_query_context(self) -> 'IconScoreContext':
+        context = IconScoreContext(IconScoreContextType.QUERY)
+        context.db_snapshots = {self.context_db: self.context_db.snapshot}
+        return context
+
+    def test_query_on_pinned_snapshot(self):
+        db = self.context_db
+        db.write_batch(None, {b'key0': b'value0', b'key1': b'value1'})
+        db.take_snapshot()
+
+        context = self._create_query_context()
+        self.assertEqual(b'value0', db.get(context, b'key0'))
+
+        db.write_batch(None, {b'key0': b'new_value0', b'key1': None, b'key2': b'value2'})
+
+        # A pinned snapshot does not see the states written after it
+        self.assertEqual(b'value0', db.get(context, b'key0'))
+        self.assertEqual(b'value1', db.get(context, b'key1'))
+        self.assertIsNone(db.get(context, b'key2'))
+
+        # Contexts without a snapshot read the latest committed states
+        self.assertEqual(b'new_value0', db.get(None, b'key0'))
+
+        db.take_snapshot()
+        context = self._create_query_context()
+        self.assertEqual(b'new_value0', db.get(context, b'key0'))
+        self.assertIsNone(db.get(context, b'key1'))
+        self.assertEqual(b'value2', db.get(context, b'key2'))
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from iconservice.base.address import AddressPrefix
+from iconservice.base.exception import DatabaseException
+from iconservice.database.factory import ContextDatabaseFactory, _encode_commit_record, _decode_commit_record
+from iconservice.icon_constant import ICON_DEX_DB_NAME, ICON_DEPLOY_DB_NAME
+from iconservice.iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+from tests import create_address, rmtree
+
+Mode = ContextDatabaseFactory.Mode
+
+
+class TestContextDatabaseFactory(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        self.context = IconScoreContext(IconScoreContextType.DIRECT)
+        self.eoa = create_address(AddressPrefix.EOA)
+        self.scores = [create_address(AddressPrefix.CONTRACT, bytes([i])) for i in range(8)]
+
+    def tearDown(self):
+        ContextDatabaseFactory.close()
+        rmtree(self.state_db_root_path)
+
+    def _open(self, mode: 'Mode' = Mode.MULTIPLE_DB, score_db_shard_count: int = 2):
+        ContextDatabaseFactory.open(
+            self.state_db_root_path, mode, score_db_shard_count=score_db_shard_count)
+
+    def _make_states(self) -> dict:
+        states = {
+            self.eoa.to_bytes(): b'account',
+            b'isds|di|' + self.scores[0].to_bytes(): b'deploy_info'
+        }
+        for score in self.scores:
+            states[score.to_bytes() + b'|key'] = score.to_bytes()
+        return states
+
+    def test_commit_record(self):
+        batches = {'a': {b'key0': b'value0', b'key1': None}, 'b': {b'key2': b''}}
+        self.assertEqual(
+            {'a': {b'key0': b'value0', b'key1': b''}, 'b': {b'key2': b''}},
+            _decode_commit_record(_encode_commit_record(batches)))
+
+    def test_single_db(self):
+        self._open(Mode.SINGLE_DB)
+
+        icx_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
+        self.assertIs(icx_db, ContextDatabaseFactory.create_by_address(self.scores[0]))
+
+        ContextDatabaseFactory.write_batch(self.context, self._make_states())
+        self.assertEqual(b'account', icx_db.get(None, self.eoa.to_bytes()))
+        self.assertEqual([icx_db], list(ContextDatabaseFactory.take_snapshots()))
+
+    def test_write_batch(self):
+        self._open()
+
+        ContextDatabaseFactory.write_batch(self.context, self._make_states())
+
+        icx_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
+        deploy_db = ContextDatabaseFactory.create_by_name(ICON_DEPLOY_DB_NAME)
+        self.assertEqual(b'account', icx_db.get(None, self.eoa.to_bytes()))
+        self.assertIsNone(icx_db.get(None, b'isds|di|' + self.scores[0].to_bytes()))
+        self.assertEqual(b'deploy_info', deploy_db.get(None, b'isds|di|' + self.scores[0].to_bytes()))
+
+        score_dbs = set()
+        for score in self.scores:
+            score_db = ContextDatabaseFactory.create_by_address(score)
+            self.assertEqual(score.to_bytes(), score_db.get(None, score.to_bytes() + b'|key'))
+            self.assertIsNone(icx_db.get(None, score.to_bytes() + b'|key'))
+            score_dbs.add(score_db)
+        self.assertEqual(2, len(score_dbs))
+        self.assertEqual(4, len(ContextDatabaseFactory.take_snapshots()))
+
+        # The commit record is removed by the next commit which writes the main db only
+        self.assertIsNotNone(icx_db.key_value_db.get(ContextDatabaseFactory._COMMIT_RECORD_KEY))
+        ContextDatabaseFactory.write_batch(self.context, {self.eoa.to_bytes(): b'account1'})
+        self.assertIsNone(icx_db.key_value_db.get(ContextDatabaseFactory._COMMIT_RECORD_KEY))
+
+    def test_write_batch_async(self):
+        self._open()
+        executor = ThreadPoolExecutor(1)
+
+        try:
+            states = self._make_states()
+            ContextDatabaseFactory.write_batch_async(self.context, states, executor)
+
+            score = self.scores[0]
+            score_db = ContextDatabaseFactory.create_by_address(score)
+            self.assertEqual(score.to_bytes(), score_db.get(None, score.to_bytes() + b'|key'))
+
+            ContextDatabaseFactory.wait_for_pending_write()
+            self.assertEqual(score.to_bytes(), score_db.key_value_db.get(score.to_bytes() + b'|key'))
+        finally:
+            executor.shutdown()
+
+    def test_recover_commit(self):
+        self._open()
+
+        # Crash right after the main db is written
+        batches = ContextDatabaseFactory._split_states(self._make_states())
+        icx_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
+        icx_db.key_value_db.write_batch(batches[ICON_DEX_DB_NAME])
+        ContextDatabaseFactory.close()
+
+        self._open()
+
+        icx_db = ContextDatabaseFactory.create_by_name(ICON_DEX_DB_NAME)
+        self.assertIsNone(icx_db.key_value_db.get(ContextDatabaseFactory._COMMIT_RECORD_KEY))
+        for score in self.scores:
+            score_db = ContextDatabaseFactory.create_by_address(score)
+            self.assertEqual(score.to_bytes(), score_db.get(None, score.to_bytes() + b'|key'))
+
+    def test_layout(self):
+        self._open(Mode.SINGLE_DB)
+        ContextDatabaseFactory.write_batch(self.context, self._make_states())
+        ContextDatabaseFactory.close()
+
+        self.assertRaises(DatabaseException, self._open)
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        self._open(score_db_shard_count=2)
+        ContextDatabaseFactory.close()
+        self.assertRaises(DatabaseException, self._open, Mode.MULTIPLE_DB, 3)
+
+        self._open(Mode.SINGLE_DB)
+        self.assertRaises(DatabaseException, ContextDatabaseFactory.get_shared_db)
+
+    def test_unknown_name(self):
+        self._open()
+        self.assertRaises(DatabaseException, ContextDatabaseFactory.create_by_name, 'unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from iconservice.base.address import AddressPrefix
+from iconservice.database.db import IconScoreDatabase
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.database.inspector import classify_key, inspect_state, GROUP_ICX, GROUP_OTHER
+from iconservice.iconscore.icon_container_db import ArrayDB, DictDB, VarDB
+from iconservice.iconscore.icon_score_context import ContextContainer, IconScoreContext, IconScoreContextType
+from tests import create_address, rmtree
+
+Mode = ContextDatabaseFactory.Mode
+
+
+class TestStateInspector(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        self.context = IconScoreContext(IconScoreContextType.DIRECT)
+        ContextContainer._push_context(self.context)
+
+        self.eoa = create_address(AddressPrefix.EOA)
+        self.scores = [create_address(AddressPrefix.CONTRACT, bytes([i])) for i in range(4)]
+
+    def tearDown(self):
+        ContextContainer._clear_context()
+        ContextDatabaseFactory.close()
+        rmtree(self.state_db_root_path)
+
+    def _write_states(self):
+        for i, score in enumerate(self.scores):
+            db = IconScoreDatabase(score, ContextDatabaseFactory.create_by_address(score))
+
+            array = ArrayDB('array', db, value_type=int)
+            for j in range(i + 1):
+                array.put(j)
+            DictDB('dict', db, value_type=bytes, depth=2)['a']['b'] = os.urandom(100)
+            VarDB('var', db, value_type=str).set('value')
+            db.put(b'raw', b'raw')
+
+        states = {
+            self.eoa.to_bytes(): os.urandom(36),
+            b'last_block': os.urandom(64),
+            b'isds|di|' + self.scores[0].to_bytes(): os.urandom(100)
+        }
+        ContextDatabaseFactory.write_batch(self.context, states)
+
+    def _test_inspect_state(self, mode: 'Mode'):
+        ContextDatabaseFactory.open(self.state_db_root_path, mode, score_db_shard_count=2)
+        self._write_states()
+
+        report = inspect_state(max_workers=2)
+        self.assertEqual(len(self.scores), report['scoreCount'])
+        self.assertEqual(1, report[GROUP_ICX]['keys'])
+        self.assertEqual(1, report[GROUP_OTHER]['keys'])
+
+        # SCOREs are sorted by key count
+        score = self.scores[-1]
+        self.assertEqual(str(score), next(iter(report['scores'])))
+
+        # size(1) + items(4) + dict(1) + var(1) + raw(1)
+        stats = report['scores'][str(score)]
+        self.assertEqual(8, stats['keys'])
+        containers = stats['containers']
+        self.assertEqual({'keys': 5, 'names': {'array': 5}}, containers['ArrayDB'])
+        self.assertEqual({'keys': 1, 'names': {'dict': 1}}, containers['DictDB'])
+        self.assertEqual({'keys': 1, 'names': {'var': 1}}, containers['VarDB'])
+        self.assertEqual({'keys': 1, 'names': {'': 1}}, containers['raw'])
+        self.assertEqual(1, stats['valueSizes']['<=256'])
+
+        stats = report['scores'][str(self.scores[0])]
+        self.assertEqual({'keys': 1, 'names': {'di': 1}}, stats['containers']['deploy'])
+
+        self.assertEqual(
+            sum(stats['keys'] for stats in report['scores'].values()) + 2, report['total']['keys'])
+        self.assertEqual(1, len(inspect_state(top=1)['scores']))
+
+    def test_inspect_state_single_db(self):
+        self._test_inspect_state(Mode.SINGLE_DB)
+
+    def test_inspect_state_multiple_db(self):
+        self._test_inspect_state(Mode.MULTIPLE_DB)
+
+    def test_classify_key(self):
+        score = self.scores[0]
+        tx_params = bytes(6) + score.to_bytes() + os.urandom(32)
+
+        self.assertEqual((str(score), 'deploy', 'dtp'), classify_key(b'isds|dtp|' + os.urandom(32), tx_params))
+        self.assertEqual((GROUP_ICX, None, None), classify_key(score.to_bytes(), b''))
+        self.assertEqual((str(score), 'DictDB', 'a'), classify_key(score.to_bytes() + b'|\x01|a|\x01|b|c', b''))
+        self.assertEqual((GROUP_OTHER, None, None), classify_key(b'total_supply', b''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from iconservice.base.block import Block
+from iconservice.base.exception import DatabaseException
+from iconservice.database.backend import BackendType
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.database.journal import ReverseDiffJournal, make_reverse_diff
+from iconservice.iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+from tests import create_block_hash, rmtree
+
+Mode = ContextDatabaseFactory.Mode
+
+
+class TestReverseDiffJournal(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+        ContextDatabaseFactory.open(self.state_db_root_path, Mode.SINGLE_DB)
+        self.context = IconScoreContext(IconScoreContextType.DIRECT)
+        self.journal = ReverseDiffJournal.from_path('', 3, BackendType.MEMORY)
+
+    def tearDown(self):
+        self.journal.close()
+        ContextDatabaseFactory.close()
+        rmtree(self.state_db_root_path)
+
+    def _commit(self, block: 'Block', states: dict) -> None:
+        self.journal.record(block, make_reverse_diff(states))
+        ContextDatabaseFactory.write_batch(self.context, states)
+
+    def test_revert(self):
+        history = []
+        blocks = []
+        for height in range(1, 6):
+            history.append(dict(ContextDatabaseFactory.iterate_states()))
+            block = Block(height, create_block_hash(), 0, None)
+            states = {os.urandom(8): os.urandom(8) for _ in range(5)}
+            # Update and delete the states of the previous blocks
+            for key in list(history[-1])[:3]:
+                states[key] = os.urandom(8)
+            for key in list(history[-1])[3:4]:
+                states[key] = None
+
+            self._commit(block, states)
+            blocks.append(block)
+
+        # Only the last 3 blocks can be reverted
+        self.assertEqual([3, 4, 5], self.journal.get_heights())
+
+        for block in reversed(blocks[2:]):
+            self.journal.revert(self.context, block)
+            self.assertEqual(history[block.height - 1], dict(ContextDatabaseFactory.iterate_states()))
+
+        self.assertRaises(DatabaseException, self.journal.revert, self.context, blocks[1])
+
+    def test_discard_uncommitted(self):
+        block = Block(1, create_block_hash(), 0, None)
+        self._commit(block, {b'key': b'value'})
+        self.journal.record(Block(2, create_block_hash(), 0, None), {b'key': b'value'})
+        self.journal.record(Block(1, create_block_hash(), 0, None), {b'key': None})
+
+        # The diff of block 2 has been left by a crash before its states were written
+        self.journal.discard_uncommitted(block)
+        self.assertEqual([], self.journal.get_heights())
+
+        self._commit(block, {b'key': b'value2'})
+        self.journal.record(Block(2, create_block_hash(), 0, None), {b'key': b'value2'})
+        self.journal.discard_uncommitted(block)
+        self.assertEqual([1], self.journal.get_heights())
+        self.assertEqual((block.hash, {b'key': b'value'}), self.journal.get(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
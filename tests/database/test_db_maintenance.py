@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from iconservice.database.backend import BackendType
+from iconservice.database.db import KeyValueDatabase
+from iconservice.database.maintenance import CompactionScheduler, get_level_stats
+from tests import rmtree
+
+
+class TestGetLevelStats(unittest.TestCase):
+    def setUp(self):
+        self.state_db_root_path = 'state_db'
+        rmtree(self.state_db_root_path)
+        os.mkdir(self.state_db_root_path)
+
+    def tearDown(self):
+        rmtree(self.state_db_root_path)
+
+    def test_level_db(self):
+        db = KeyValueDatabase.from_path(os.path.join(self.state_db_root_path, 'db'))
+        try:
+            db.write_batch({os.urandom(20): os.urandom(100) for _ in range(1000)})
+            db.compact_range()
+
+            levels = get_level_stats(db)
+            self.assertTrue(len(levels) > 0)
+            self.assertTrue(sum(level['files'] for level in levels) > 0)
+        finally:
+            db.close()
+
+    def test_memory(self):
+        db = KeyValueDatabase.from_path('', backend=BackendType.MEMORY)
+        db.compact_range()
+        self.assertEqual([], get_level_stats(db))
+
+
+class TestCompactionScheduler(unittest.TestCase):
+    def setUp(self):
+        self.compacted = threading.Event()
+        self.db = Mock(spec=KeyValueDatabase)
+        self.db.compact_range.side_effect = lambda start, stop: self.compacted.set()
+        self.db.get_property.return_value = None
+        self.scheduler = None
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def _start(self, block_interval: int = 0, idle_time: float = 0):
+        self.scheduler = CompactionScheduler(lambda: {'db': self.db}, block_interval, idle_time)
+        self.scheduler.start()
+
+    def _commit(self):
+        self.scheduler.on_commit_begin()
+        self.scheduler.on_commit_end()
+
+    def test_request(self):
+        self._start()
+
+        self.scheduler.request()
+        self.assertTrue(self.compacted.wait(5))
+
+        # Every slice of the key space is compacted
+        while self.scheduler.get_stats()['compactionCount'] == 0:
+            time.sleep(0.01)
+        calls = [call[0] for call in self.db.compact_range.call_args_list]
+        self.assertEqual((None, b'\x10'), calls[0])
+        self.assertEqual((b'\xf0', None), calls[-1])
+
+    def test_block_interval(self):
+        self._start(block_interval=2)
+
+        self._commit()
+        self.assertFalse(self.compacted.wait(0.1))
+
+        self._commit()
+        self.assertTrue(self.compacted.wait(5))
+        self.assertEqual(0, self.scheduler.get_stats()['blocksSinceCompaction'])
+
+    def test_idle_time(self):
+        self._start(idle_time=0.05)
+        self.assertFalse(self.compacted.wait(0.1))
+
+        self._commit()
+        self.assertTrue(self.compacted.wait(5))
+
+    def test_commit_in_progress(self):
+        self._start()
+
+        self.scheduler.on_commit_begin()
+        self.scheduler.request()
+        self.assertFalse(self.compacted.wait(0.1))
+
+        self.scheduler.on_commit_end()
+        self.assertTrue(self.compacted.wait(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
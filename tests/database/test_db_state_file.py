@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from iconservice.base.address import AddressPrefix
+from iconservice.base.exception import DatabaseException
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.database.state_file import export_state, import_state, StateDigest
+from iconservice.iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+from tests import create_address, rmtree
+
+Mode = ContextDatabaseFactory.Mode
+
+
+class TestStateFile(unittest.TestCase):
+    def setUp(self):
+        self.root_path = 'state_file_test'
+        rmtree(self.root_path)
+        os.mkdir(self.root_path)
+        self.file_path = os.path.join(self.root_path, 'state.dat')
+
+        self.states = {b'last_block': os.urandom(100), b'isds|di|' + os.urandom(21): os.urandom(100)}
+        for i in range(100):
+            self.states[create_address(AddressPrefix.EOA, bytes([i])).to_bytes()] = os.urandom(36)
+            score = create_address(AddressPrefix.CONTRACT, bytes([i]))
+            self.states[score.to_bytes() + b'|' + os.urandom(32)] = os.urandom(64)
+
+        self._open('src', Mode.SINGLE_DB)
+        ContextDatabaseFactory.write_batch(IconScoreContext(IconScoreContextType.DIRECT), self.states)
+
+    def tearDown(self):
+        ContextDatabaseFactory.close()
+        rmtree(self.root_path)
+
+    def _open(self, name: str, mode: 'Mode'):
+        path = os.path.join(self.root_path, name)
+        os.makedirs(path, exist_ok=True)
+        ContextDatabaseFactory.open(path, mode, score_db_shard_count=2)
+
+    def test_export_import(self):
+        count, digest = export_state(self.file_path, chunk_size=1024)
+        self.assertEqual(len(self.states), count)
+        ContextDatabaseFactory.close()
+
+        # The db layout can be changed on import
+        self._open('dst', Mode.MULTIPLE_DB)
+        self.assertEqual((count, digest), import_state(self.file_path, batch_size=4096))
+
+        for key, value in self.states.items():
+            self.assertEqual(value, ContextDatabaseFactory.get_db_by_key(key).get(None, key))
+        self.assertEqual(self.states, dict(ContextDatabaseFactory.iterate_states()))
+
+        # Importing into non-empty StateDB is not allowed
+        self.assertRaises(DatabaseException, import_state, self.file_path)
+
+    def test_corrupted_file(self):
+        export_state(self.file_path, chunk_size=1024)
+        ContextDatabaseFactory.close()
+
+        with open(self.file_path, 'rb') as f:
+            data = bytearray(f.read())
+
+        data[100] ^= 0xff
+        with open(self.file_path, 'wb') as f:
+            f.write(data)
+
+        self._open('dst', Mode.SINGLE_DB)
+        self.assertRaises(DatabaseException, import_state, self.file_path)
+
+    def test_truncated_file(self):
+        export_state(self.file_path)
+        ContextDatabaseFactory.close()
+
+        with open(self.file_path, 'rb') as f:
+            data = f.read()
+        with open(self.file_path, 'wb') as f:
+            f.write(data[:-10])
+
+        self._open('dst', Mode.SINGLE_DB)
+        self.assertRaises(DatabaseException, import_state, self.file_path)
+
+    def test_digest(self):
+        digest0 = StateDigest()
+        digest1 = StateDigest()
+
+        items = list(self.states.items())
+        for key, value in items:
+            digest0.add(key, value)
+        for key, value in reversed(items):
+            digest1.add(key, value)
+        self.assertEqual(digest0.digest, digest1.digest)
+
+        digest1.add(b'key', b'value')
+        self.assertNotEqual(digest0.digest, digest1.digest)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+
+from iconservice.base.exception import DatabaseException
+from iconservice.database.backend import BackendType
+from iconservice.database.db import ContextDatabase
+from iconservice.database.state_tree import StateTree, EMPTY_HASH, STATE_TREE_ROOT_KEY, verify_proof
+
+
+class TestStateTree(unittest.TestCase):
+    def setUp(self):
+        self.db = ContextDatabase.from_path('', backend=BackendType.MEMORY)
+        self.tree = StateTree(self.db, node_cache_size=16, excluded_keys=[b'last_block'])
+        self.rand = random.Random(0)
+
+    def _commit(self, states: dict) -> bytes:
+        root_hash, nodes = self.tree.update(self.tree.get_root_hash() or EMPTY_HASH, states)
+        self.db.write_batch(None, {**states, **nodes})
+        return root_hash
+
+    def _random_states(self, count: int) -> dict:
+        return {self.rand.getrandbits(64).to_bytes(8, 'big'): bytes([self.rand.randrange(256)]) * 4
+                for _ in range(count)}
+
+    def test_update(self):
+        states = {}
+
+        for _ in range(10):
+            changes = self._random_states(20)
+            # Update and delete some of the existing states
+            for key in self.rand.sample(sorted(states), min(10, len(states))):
+                changes[key] = self.rand.choice([None, b'', b'changed'])
+
+            root_hash = self._commit(changes)
+            for key, value in changes.items():
+                if value:
+                    states[key] = value
+                else:
+                    states.pop(key, None)
+
+            # The root only depends on the set of states
+            other_tree = StateTree(ContextDatabase.from_path('', backend=BackendType.MEMORY))
+            self.assertEqual(other_tree.update(EMPTY_HASH, states)[0], root_hash)
+            self.assertEqual(root_hash, self.tree.get_root_hash())
+
+        self.assertEqual(16, self.tree.node_cache.max_size)
+        self.assertTrue(len(self.tree.node_cache) <= 16)
+
+        # Deleting all states makes the tree empty
+        self.assertEqual(EMPTY_HASH, self._commit({key: None for key in states}))
+
+    def test_excluded_keys(self):
+        root_hash = self._commit(self._random_states(10))
+        root_hash1, nodes = self.tree.update(root_hash, {b'last_block': b'block', STATE_TREE_ROOT_KEY: b'root'})
+        self.assertEqual(root_hash, root_hash1)
+        self.assertEqual({STATE_TREE_ROOT_KEY: root_hash}, nodes)
+
+    def test_proof(self):
+        states = self._random_states(100)
+        root_hash = self._commit(states)
+
+        for key, value in list(states.items())[:20]:
+            proof = self.tree.get_proof(key)
+            self.assertEqual(root_hash, proof['root'])
+            self.assertTrue(verify_proof(root_hash, key, value, proof))
+            self.assertFalse(verify_proof(root_hash, key, value + b'0', proof))
+            self.assertFalse(verify_proof(root_hash, key, None, proof))
+            self.assertFalse(verify_proof(EMPTY_HASH, key, value, proof))
+
+        for key in self._random_states(20):
+            proof = self.tree.get_proof(key)
+            self.assertTrue(verify_proof(root_hash, key, None, proof))
+            self.assertFalse(verify_proof(root_hash, key, b'value', proof))
+
+    def test_no_tree(self):
+        self.assertIsNone(self.tree.get_root_hash())
+        self.assertRaises(DatabaseException, self.tree.get_proof, b'key')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,10 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
 import unittest
+from collections import OrderedDict
 
 from iconservice.base.exception import ServerErrorException
-from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.batch import BlockBatch, TransactionBatch, digest
 
 
 class TestTransactionBatch(unittest.TestCase):
@@ -84,11 +86,11 @@ class TestTransactionBatch(unittest.TestCase):
         tx_batch[b'key0'] = None
         tx_batch[b'key1'] = b'key1'
         tx_batch[b'key2'] = b'value2'
-        self.assertEqual(5, len(tx_batch))
+        self.assertEqual(3, len(tx_batch))
         self.assertEqual(init_call_count + 2, tx_batch.call_count)
 
         tx_batch.leave_call()
-        self.assertEqual(4, len(tx_batch))
+        self.assertEqual(3, len(tx_batch))
         self.assertEqual(b'key1', tx_batch[b'key1'])
         self.assertEqual(init_call_count + 1, tx_batch.call_count)
 
@@ -124,7 +126,7 @@ class TestTransactionBatch(unittest.TestCase):
         tx_batch[b'key0'] = None
         tx_batch[b'key1'] = b'key1'
         tx_batch[b'key2'] = b'value2'
-        self.assertEqual(5, len(tx_batch))
+        self.assertEqual(3, len(tx_batch))
         self.assertEqual(init_call_count + 2, tx_batch.call_count)
 
         keys = [b'key0', b'key1', b'key2']
@@ -150,3 +152,61 @@ class TestTransactionBatch(unittest.TestCase):
         block_batch = BlockBatch()
         block_batch.update(tx_batch)
         self.assertEqual(b'value0', block_batch[b'key0'])
+
+    def test_revert_call(self):
+        tx_batch = TransactionBatch()
+        tx_batch[b'key0'] = b'value0'
+        tx_batch[b'key1'] = b'value1'
+
+        tx_batch.enter_call()
+        tx_batch[b'key0'] = None
+        tx_batch[b'key2'] = b'value2'
+
+        tx_batch.enter_call()
+        tx_batch[b'key1'] = b''
+        tx_batch[b'key3'] = b'value3'
+        tx_batch.leave_call()
+
+        # The changes of the nested call which has been left are reverted too
+        tx_batch.revert_call()
+        tx_batch.leave_call()
+        self.assertEqual([(b'key0', b'value0'), (b'key1', b'value1')], list(tx_batch.items()))
+
+        tx_batch.revert_call()
+        self.assertEqual(0, len(tx_batch))
+
+    def test_digest_order(self):
+        """The order of states is the same as the one of merging a dict per call into its caller
+        """
+        rand = random.Random(0)
+        keys = [bytes([i]) for i in range(8)]
+
+        for _ in range(200):
+            tx_batch = TransactionBatch()
+            call_batches = [OrderedDict()]
+
+            for _ in range(50):
+                op = rand.randrange(10)
+                if op == 0:
+                    tx_batch.enter_call()
+                    call_batches.append(OrderedDict())
+                elif op == 1 and len(call_batches) > 1:
+                    tx_batch.leave_call()
+                    call_batch = call_batches.pop()
+                    call_batches[-1].update(call_batch)
+                elif op == 2 and len(call_batches) > 1:
+                    tx_batch.revert_call()
+                    call_batches[-1].clear()
+                else:
+                    key = rand.choice(keys)
+                    value = rand.choice([None, b'', rand.choice(keys)])
+                    tx_batch[key] = value
+                    call_batches[-1][key] = value
+
+            while len(call_batches) > 1:
+                tx_batch.leave_call()
+                call_batch = call_batches.pop()
+                call_batches[-1].update(call_batch)
+
+            self.assertEqual(list(call_batches[0].items()), list(tx_batch.items()))
+            self.assertEqual(digest(call_batches[0]), tx_batch.digest())
@@ -15,8 +15,10 @@
 # limitations under the License.
 
 import unittest
+from unittest.mock import Mock
 
 from iconservice import Address
+from iconservice.database.batch import BlockBatch, TransactionBatch
 from iconservice.database.db import ContextDatabase, IconScoreDatabase
 from iconservice.iconscore.icon_score_context import IconScoreContextType, IconScoreContext
 from iconservice.base.address import AddressPrefix
@@ -228,6 +230,44 @@ class TestIconContainerDB(unittest.TestCase):
         self.assertEqual(5, testarray.pop())
         self.assertEqual(2, len(testarray))
 
+    def test_array_db_iter(self):
+        testarray = ArrayDB('test_array', self.db, value_type=int)
+        for i in range(100):
+            testarray.put(i)
+
+        # Changes made during the iteration are visible to it
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        ContextContainer._push_context(context)
+
+        observer = Mock()
+        testarray._db.set_observer(observer)
+
+        values = []
+        for value in testarray:
+            values.append(value)
+            if value == 70:
+                testarray.pop()
+                testarray.put(1000)
+                testarray.put(2000)
+
+        self.assertEqual(list(range(99)) + [1000, 2000], values)
+        # 101 values and the value removed by pop()
+        self.assertEqual(102, observer.on_get.call_count)
+
+        # Stops early without reading the rest
+        observer.reset_mock()
+        self.assertTrue(3 in testarray)
+        self.assertEqual(4, observer.on_get.call_count)
+
+    def test_dict_db_get_many(self):
+        test_dict = DictDB('test_dict', self.db, value_type=int)
+        test_dict['a'] = 1
+        test_dict['c'] = 3
+
+        self.assertEqual([3, 0, 1], test_dict.get_many(['c', 'b', 'a']))
+
     def test_container_util(self):
         prefix: bytes = ContainerUtil.create_db_prefix(ArrayDB, 'a')
         self.assertEqual(b'\x00|a', prefix)
@@ -23,6 +23,7 @@ from unittest.mock import Mock
 
 from iconservice.icx.icx_account import Account
 from iconservice.base.address import Address, MalformedAddress
+from iconservice.database.batch import BlockBatch, TransactionBatch
 from iconservice.database.db import ContextDatabase
 from iconservice.iconscore.icon_score_context import ContextContainer, IconScoreContext
 from iconservice.iconscore.icon_score_context import IconScoreContextType
@@ -170,8 +171,31 @@ class TestIcxEngine(unittest.TestCase, ContextContainer):
 
         self.assertEqual(self.total_supply, total_supply)
 
-    def test_get_charge_fee(self):
-        pass
+    def test_charge_fee(self):
+        context = IconScoreContext(IconScoreContextType.INVOKE)
+        context.block_batch = BlockBatch()
+        context.tx_batch = TransactionBatch()
+        fee = 10 ** 16
+
+        for _ in range(2):
+            self.engine.charge_fee(context, self.genesis_address, fee)
+            context.block_batch.update(context.tx_batch)
+            context.tx_batch.clear()
+            self.engine.add_fee(context, self.genesis_address, fee)
+
+        # The first fee of the block is deposited at once
+        self.assertEqual(fee, context.pending_fee)
+        self.assertEqual(fee, self.engine._storage.get_account(context, self.fee_treasury_address).icx)
+
+        # The treasury is read with all the fees
+        self.assertEqual(fee * 2, self.engine.get_balance(context, self.fee_treasury_address))
+        self.assertEqual(0, context.pending_fee)
+        self.assertEqual(self.total_supply - fee * 2, self.engine.get_balance(context, self.genesis_address))
+
+        # The treasury pays no fee
+        self.engine.charge_fee(context, self.fee_treasury_address, fee)
+        self.engine.add_fee(context, self.fee_treasury_address, fee)
+        self.assertEqual(fee * 2, self.engine.get_balance(context, self.fee_treasury_address))
 
     def test_get_account(self):
         pass
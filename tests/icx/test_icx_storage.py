@@ -60,6 +60,20 @@ class TestIcxStorage(unittest.TestCase):
         account2 = self.storage.get_account(context, account.address)
         self.assertEqual(account, account2)
 
+    def test_get_accounts(self):
+        context = self.context
+        account = Account()
+        account.address = self.address
+        account.deposit(10 ** 19)
+        self.storage.put_account(context, account.address, account)
+
+        address = create_address(AddressPrefix.EOA)
+        accounts = self.storage.get_accounts(context, [address, self.address])
+
+        self.assertEqual(address, accounts[0].address)
+        self.assertEqual(0, accounts[0].icx)
+        self.assertEqual(account, accounts[1])
+
     def test_delete_account(self):
         context = self.context
         account = Account()
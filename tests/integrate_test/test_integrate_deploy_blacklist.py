@@ -17,10 +17,12 @@
 """IconScoreEngine testcase
 """
 
+import os
 import unittest
 
 from iconservice.base.address import ZERO_SCORE_ADDRESS, GOVERNANCE_SCORE_ADDRESS
 from iconservice.base.exception import ExceptionCode
+from iconservice.builtin_scores.governance import governance
 from tests import raise_exception_start_tag, raise_exception_end_tag, create_address
 from tests.integrate_test.test_integrate_base import TestIntegrateBase
 
@@ -96,6 +98,123 @@ class TestIntegrateDeployBlackList(TestIntegrateBase):
         self.assertEqual(tx_result.failure.code, ExceptionCode.SCORE_ERROR)
         self.assertEqual(tx_result.failure.message, "Invalid address: already SCORE blacklist")
 
+    def test_governance_call_about_remove_blacklist(self):
+        score_addrs = [create_address(1) for _ in range(3)]
+        for score_addr in score_addrs:
+            tx_result = self._external_call(self._admin,
+                                            GOVERNANCE_SCORE_ADDRESS,
+                                            'addToScoreBlackList',
+                                            {"address": str(score_addr)})
+            self.assertEqual(tx_result.status, int(True))
+
+        # the topmost one takes the place of the removed one
+        tx_result = self._external_call(self._admin,
+                                        GOVERNANCE_SCORE_ADDRESS,
+                                        'removeFromScoreBlackList',
+                                        {"address": str(score_addrs[0])})
+        self.assertEqual(tx_result.status, int(True))
+
+        tx_result = self._external_call(self._admin,
+                                        GOVERNANCE_SCORE_ADDRESS,
+                                        'removeFromScoreBlackList',
+                                        {"address": str(score_addrs[0])})
+        self.assertEqual(tx_result.status, int(False))
+        self.assertEqual(tx_result.failure.message, f"Invalid address: not in list")
+
+        tx_result = self._external_call(self._admin,
+                                        GOVERNANCE_SCORE_ADDRESS,
+                                        'removeFromScoreBlackList',
+                                        {"address": str(score_addrs[2])})
+        self.assertEqual(tx_result.status, int(True))
+
+        for score_addr, expected in zip(score_addrs, [False, True, False]):
+            query_request = {
+                "version": self._version,
+                "from": self._admin,
+                "to": GOVERNANCE_SCORE_ADDRESS,
+                "dataType": "call",
+                "data": {
+                    "method": "isInScoreBlackList",
+                    "params": {"address": str(score_addr)}
+                }
+            }
+            self.assertEqual(expected, self._query(query_request))
+
+    def _query_governance(self, method: str, params: dict) -> Any:
+        query_request = {
+            "version": self._version,
+            "from": self._admin,
+            "to": GOVERNANCE_SCORE_ADDRESS,
+            "dataType": "call",
+            "data": {
+                "method": method,
+                "params": params
+            }
+        }
+        return self._query(query_request)
+
+    def test_governance_migrate_address_lists(self):
+        score_addrs = [create_address(1) for _ in range(4)]
+        for score_addr in score_addrs[:3]:
+            tx_result = self._external_call(self._admin,
+                                            GOVERNANCE_SCORE_ADDRESS,
+                                            'addToScoreBlackList',
+                                            {"address": str(score_addr)})
+            self.assertEqual(tx_result.status, int(True))
+
+        # the lists are changed by the governance without indexes
+        self._update_governance()
+
+        # the topmost one takes the place of the removed one and their indexes get stale
+        tx_result = self._external_call(self._admin,
+                                        GOVERNANCE_SCORE_ADDRESS,
+                                        'removeFromScoreBlackList',
+                                        {"address": str(score_addrs[0])})
+        self.assertEqual(tx_result.status, int(True))
+        tx_result = self._external_call(self._admin,
+                                        GOVERNANCE_SCORE_ADDRESS,
+                                        'addToScoreBlackList',
+                                        {"address": str(score_addrs[3])})
+        self.assertEqual(tx_result.status, int(True))
+
+        deployer, auditor = self._addr_array[0], self._addr_array[1]
+        tx_result = self._external_call(self._admin, GOVERNANCE_SCORE_ADDRESS, 'addDeployer',
+                                        {"address": str(deployer)})
+        self.assertEqual(tx_result.status, int(True))
+        tx_result = self._external_call(self._admin, GOVERNANCE_SCORE_ADDRESS, 'addAuditor',
+                                        {"address": str(auditor)})
+        self.assertEqual(tx_result.status, int(True))
+
+        # update to the governance with indexes
+        tx = self._make_deploy_tx(os.path.dirname(os.path.dirname(governance.__file__)),
+                                  "governance",
+                                  self._admin,
+                                  GOVERNANCE_SCORE_ADDRESS)
+        prev_block, tx_results = self._make_and_req_block([tx])
+        self._write_precommit_state(prev_block)
+        self.assertEqual(tx_results[0].status, int(True))
+
+        for score_addr, expected in zip(score_addrs, [False, True, True, True]):
+            self.assertEqual(expected, self._query_governance('isInScoreBlackList', {"address": str(score_addr)}))
+        self.assertTrue(self._query_governance('isDeployer', {"address": str(deployer)}))
+        self.assertTrue(self._query_governance('isDeployer', {"address": str(self._admin)}))
+        self.assertFalse(self._query_governance('isDeployer', {"address": str(self._addr_array[2])}))
+
+        # the auditor passes the permission check
+        tx_result = self._external_call(auditor, GOVERNANCE_SCORE_ADDRESS, 'acceptScore',
+                                        {"txHash": f'0x{bytes(32).hex()}'})
+        self.assertEqual(tx_result.status, int(False))
+        self.assertEqual(tx_result.failure.message, "Invalid txHash")
+
+        # the migrated indexes are kept up to date
+        tx_result = self._external_call(self._admin,
+                                        GOVERNANCE_SCORE_ADDRESS,
+                                        'removeFromScoreBlackList',
+                                        {"address": str(score_addrs[2])})
+        self.assertEqual(tx_result.status, int(True))
+        for score_addr, expected in zip(score_addrs, [False, True, False, True]):
+            self.assertEqual(expected, self._query_governance('isInScoreBlackList', {"address": str(score_addr)}))
+
     def test_governance_call_about_blacklist_invalid_address(self):
         self._update_governance()
 
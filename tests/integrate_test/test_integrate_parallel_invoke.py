@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IconServiceEngine testcase
+"""
+
+import unittest
+
+from iconservice.base.address import ZERO_SCORE_ADDRESS
+from iconservice.icon_constant import ConfigKey
+from tests.integrate_test.test_integrate_base import TestIntegrateBase
+
+
+class TestIntegrateSerialInvoke(TestIntegrateBase):
+    """The txs calling the same SCORE conflict with each other,
+    so they have to end up with the same results whether they are executed in parallel or not
+    """
+
+    def _invoke_score_calls(self) -> tuple:
+        tx = self._make_deploy_tx("test_scores", "test_array_db", self._addr_array[0], ZERO_SCORE_ADDRESS)
+        prev_block, tx_results = self._make_and_req_block([tx])
+        self._write_precommit_state(prev_block)
+        self.assertEqual(tx_results[0].status, int(True))
+        score_addr = tx_results[0].score_address
+
+        tx_list = [
+            self._make_score_call_tx(self._addr_array[0], score_addr, 'add', {"value": hex(10)}),
+            self._make_score_call_tx(self._addr_array[0], score_addr, 'push', {}),
+            self._make_score_call_tx(self._addr_array[0], score_addr, 'add', {"value": hex(20)}),
+            self._make_score_call_tx(self._addr_array[0], score_addr, 'push', {}),
+            self._make_score_call_tx(self._addr_array[0], score_addr, 'push', {})
+        ]
+        prev_block, tx_results = self._make_and_req_block(tx_list)
+        self._write_precommit_state(prev_block)
+
+        query_request = {
+            "from": self._admin,
+            "to": score_addr,
+            "dataType": "call",
+            "data": {
+                "method": "size",
+                "params": {}
+            }
+        }
+        size = self._query(query_request)
+
+        values = []
+        for index in range(size):
+            query_request["data"] = {"method": "get", "params": {"index": hex(index)}}
+            values.append(self._query(query_request))
+
+        return [tx_result.status for tx_result in tx_results], values
+
+    def test_score_calls(self):
+        statuses, values = self._invoke_score_calls()
+
+        self.assertEqual([int(True)] * 5, statuses)
+        self.assertEqual([10, 1, 20, 3, 4], values)
+
+
+class TestIntegrateParallelInvoke(TestIntegrateSerialInvoke):
+
+    def _make_init_config(self) -> dict:
+        return {ConfigKey.INVOKE_THREAD_COUNT: 4}
+
+
+if __name__ == '__main__':
+    unittest.main()
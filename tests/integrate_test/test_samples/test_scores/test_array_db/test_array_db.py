@@ -0,0 +1,30 @@
+from iconservice import *
+
+
+class TestArrayDb(IconScoreBase):
+
+    def __init__(self, db: IconScoreDatabase) -> None:
+        super().__init__(db)
+        self._values = ArrayDB('values', db, value_type=int)
+
+    def on_install(self) -> None:
+        super().on_install()
+
+    def on_update(self) -> None:
+        super().on_update()
+
+    @external(readonly=False)
+    def add(self, value: int) -> None:
+        self._values.put(value)
+
+    @external(readonly=False)
+    def push(self) -> None:
+        self._values.put(len(self._values))
+
+    @external(readonly=True)
+    def size(self) -> int:
+        return len(self._values)
+
+    @external(readonly=True)
+    def get(self, index: int) -> int:
+        return self._values.get(index)
@@ -56,8 +56,10 @@ class MockPlyvelDB(object):
     def get_sub_db(self, key: bytes):
         return MockPlyvelDB(self.make_db())
 
-    def iterator(self) -> iter:
-        return iter(self._db)
+    def iterator(self, start: bytes=None, stop: bytes=None, reverse: bool=False, *args, **kwargs) -> iter:
+        keys = sorted(self._db, reverse=reverse)
+        return iter([(key, self._db[key]) for key in keys
+                     if (start is None or key >= start) and (stop is None or key < stop)])
 
     def prefixed_db(self, bytes_prefix) -> 'MockPlyvelDB':
         return MockPlyvelDB(MockPlyvelDB.make_db())
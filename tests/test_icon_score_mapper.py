@@ -15,7 +15,9 @@
 # limitations under the License.
 
 
+import time
 import unittest
+from concurrent.futures.thread import ThreadPoolExecutor
 from unittest.mock import Mock
 
 from iconservice.base.address import AddressPrefix
@@ -42,6 +44,26 @@ class TestIconScoreMapper(unittest.TestCase):
         self.icon_score_mapper.load_score = Mock(return_value=TestScore())
         self.icon_score_mapper.get_icon_score(create_address(AddressPrefix.CONTRACT), tx_hash)
 
+    def test_get_icon_score_loads_once_in_threads(self):
+        icon_score_mapper = IconScoreMapper(is_lock=True)
+        address = create_address(AddressPrefix.CONTRACT)
+        tx_hash = create_tx_hash()
+
+        def load_score(*args):
+            # Gives the other threads a chance to find no score in the mapper
+            time.sleep(0.01)
+            return TestScore()
+
+        icon_score_mapper.load_score = Mock(side_effect=load_score)
+
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(icon_score_mapper.get_icon_score, address, tx_hash) for _ in range(8)]
+            scores = [future.result() for future in futures]
+
+        icon_score_mapper.load_score.assert_called_once_with(address, tx_hash)
+        for score in scores:
+            self.assertIs(scores[0], score)
+
 
 class TestScore(IconScoreBase):
 
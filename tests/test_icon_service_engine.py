@@ -16,32 +16,40 @@
 
 """IconScoreEngine testcase
 """
+import copy
 import hashlib
 import os
 import time
 import unittest
-from unittest.mock import Mock
+from concurrent.futures.thread import ThreadPoolExecutor
+from unittest.mock import Mock, PropertyMock, patch
 
 from iconcommons.icon_config import IconConfig
 
-from iconservice.base.address import Address, AddressPrefix, MalformedAddress
+from iconservice.base.address import Address, AddressPrefix, MalformedAddress, GOVERNANCE_SCORE_ADDRESS
 from iconservice.base.block import Block
 from iconservice.base.exception import ExceptionCode, ServerErrorException, \
-    RevertException
+    RevertException, DatabaseException
 from iconservice.base.message import Message
 from iconservice.base.transaction import Transaction
 from iconservice.base.type_converter import TypeConverter
 from iconservice.base.type_converter_templates import ParamType
 from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.factory import ContextDatabaseFactory
+from iconservice.database.state_tree import EMPTY_HASH, verify_proof
+from iconservice.governance_snapshot import GovernanceSnapshot
 from iconservice.icon_config import default_icon_config
-from iconservice.icon_constant import IconServiceFlag, ConfigKey
+from iconservice.icon_constant import IconServiceFlag, ConfigKey, REVISION_4
 from iconservice.icon_service_engine import IconServiceEngine
+from iconservice.iconscore.icon_score_base import IconScoreBase
 from iconservice.iconscore.icon_score_context import IconScoreContext
 from iconservice.iconscore.icon_score_context import IconScoreContextType
 from iconservice.iconscore.icon_score_context_util import IconScoreContextUtil
+from iconservice.iconscore.icon_score_engine import IconScoreEngine
 from iconservice.iconscore.icon_score_result import TransactionResult
 from iconservice.iconscore.icon_score_step import IconScoreStepCounter
 from iconservice.iconscore.icon_score_step import StepType
+from iconservice.icx.icx_engine import IcxEngine
 from tests import create_block_hash, create_address, rmtree, create_tx_hash, \
     raise_exception_start_tag, raise_exception_end_tag
 
@@ -59,6 +67,9 @@ def _create_context(context_type: IconScoreContextType) -> IconScoreContext:
 
 
 class TestIconServiceEngine(unittest.TestCase):
+    # Additional engine config
+    CONF: dict = {}
+
     def setUp(self):
         self._state_db_root_path = '.db'
         self._score_root_path = '.score'
@@ -67,19 +78,22 @@ class TestIconServiceEngine(unittest.TestCase):
         rmtree(self._state_db_root_path)
 
         engine = IconServiceEngine()
-        conf = IconConfig("", default_icon_config)
+        # The nested configs of a subclass must not leak into default_icon_config
+        conf = IconConfig("", copy.deepcopy(default_icon_config))
         conf.load()
         conf.update_conf(
             {
                 ConfigKey.BUILTIN_SCORE_OWNER: str(create_address(AddressPrefix.EOA)),
                 ConfigKey.SCORE_ROOT_PATH: self._score_root_path,
-                ConfigKey.STATE_DB_ROOT_PATH: self._state_db_root_path
+                ConfigKey.STATE_DB_ROOT_PATH: self._state_db_root_path,
+                **self.CONF
             }
         )
         # engine._load_builtin_scores = Mock()
         # engine._init_global_value_by_governance_score = Mock()
         engine.open(conf)
         self._engine = engine
+        self._conf = conf
 
         self._genesis_address = create_address(AddressPrefix.EOA)
         self._treasury_address = create_address(AddressPrefix.EOA)
@@ -726,6 +740,59 @@ class TestIconServiceEngine(unittest.TestCase):
         self.assertEqual(ExceptionCode.SERVER_ERROR, e.code)
         self.assertTrue(e.message.startswith('No precommit data'))
 
+    def test_commit_async(self):
+        self._engine._commit_executor = ThreadPoolExecutor(1)
+
+        value = 1 * 10 ** 18
+        tx = {
+            'method': 'icx_sendTransaction',
+            'params': {
+                'version': 3,
+                'from': self._genesis_address,
+                'to': self._to,
+                'value': value,
+                'stepLimit': 1000000,
+                'timestamp': 1234567890,
+                'txHash': create_tx_hash()
+            }
+        }
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+
+        self._engine.invoke(block, [tx])
+        self._engine.commit(block)
+
+        # The committed states are visible before they are written to StateDB
+        self.assertEqual(value, self._engine.query('icx_getBalance', {'address': self._to}))
+        self.assertEqual(block.hash, self._engine._icx_storage.last_block.hash)
+
+        self._engine._wait_for_pending_commit()
+        self.assertEqual(value, self._engine._icx_engine.get_balance(None, self._to))
+
+    def test_close_after_failed_write(self):
+        """The resources are released even if the last committed block has failed to be written
+        """
+        self._engine._commit_executor = ThreadPoolExecutor(1)
+
+        with patch.object(ContextDatabaseFactory, 'wait_for_pending_write',
+                          side_effect=DatabaseException('Failed to write')):
+            self.assertRaises(DatabaseException, self._engine.close)
+
+        self.assertIsNone(self._engine._commit_executor)
+        self.assertIsNone(self._engine._reverse_diff_journal)
+        self.assertIsNone(self._engine._precommit_data_manager._spill_store)
+        self.assertEqual({}, ContextDatabaseFactory._context_dbs)
+
+        self._engine = IconServiceEngine()
+        self._engine.open(self._conf)
+
+    def test_compact_db(self):
+        self._engine.compact_db()
+
+        stats = self._engine.get_db_stats()
+        self.assertIn('icon_dex', stats['dbs'])
+        self.assertIn('compactionCount', stats)
+        self.assertEqual(0, stats['precommit']['count'])
+
     def test_rollback(self):
         block = Block(
             block_height=1,
@@ -740,6 +807,321 @@ class TestIconServiceEngine(unittest.TestCase):
         self._engine.rollback(block)
         self.assertIsNone(self._engine._precommit_data_manager.get(block))
 
+    def _make_transfer_tx(self, value: int) -> dict:
+        return {
+            'method': 'icx_sendTransaction',
+            'params': {
+                'version': 3,
+                'from': self._genesis_address,
+                'to': self._to,
+                'value': value,
+                'stepLimit': 1000000,
+                'timestamp': 1234567890,
+                'txHash': create_tx_hash()
+            }
+        }
+
+    def _make_v2_transfer_tx(self, from_: 'Address', to: 'Address', value: int) -> dict:
+        # No fee is charged to the treasury without the fee service flag
+        return {
+            'method': 'icx_sendTransaction',
+            'params': {
+                'from': from_,
+                'to': to,
+                'value': value,
+                'fee': 10 ** 16,
+                'timestamp': 1234567890,
+                'txHash': create_tx_hash()
+            }
+        }
+
+    def _invoke_and_rollback(self, block: 'Block', txs: list) -> tuple:
+        tx_results, state_root_hash = self._engine.invoke(block, txs)
+        precommit_data = self._engine._precommit_data_manager.get(block.hash)
+        states = list(precommit_data.block_batch.items())
+        self._engine.rollback(block)
+        # Nothing is reused by the next invoke
+        self._engine._precommit_data_manager._discarded.clear()
+        return [tx_result.to_dict() for tx_result in tx_results], state_root_hash, states
+
+    def test_invoke_transfer(self):
+        """Plain transfers give the same results as the ones through the generic handler
+        """
+        value = 1 * 10 ** 18
+        to = create_address(AddressPrefix.EOA)
+        out_of_step_tx = self._make_transfer_tx(value)
+        out_of_step_tx['params']['stepLimit'] = 1
+        out_of_balance_tx = self._make_transfer_tx(value)
+        out_of_balance_tx['params']['from'] = to
+        txs = [
+            self._make_transfer_tx(value),
+            self._make_v2_transfer_tx(self._genesis_address, to, value),
+            out_of_step_tx,
+            out_of_balance_tx,
+            self._make_v2_transfer_tx(to, self._to, value * 2)
+        ]
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        results = self._invoke_and_rollback(block, txs)
+        self.assertEqual([1, 1, 0, 0, 0], [tx_result['status'] for tx_result in results[0]])
+
+        with patch.object(IconServiceEngine, '_is_plain_transfer', return_value=False):
+            self.assertEqual(results, self._invoke_and_rollback(block, txs))
+
+    def test_accumulate_fee(self):
+        """The treasury receives the fees of a block at once with the same states as it does on every tx
+        """
+        value = 1 * 10 ** 18
+        self._engine._step_counter_factory.set_step_price(10 ** 10)
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        self._engine.invoke(block, [self._make_v2_transfer_tx(self._genesis_address, self._treasury_address, value)])
+        self._engine.commit(block)
+
+        to = create_address(AddressPrefix.EOA)
+        out_of_step_tx = self._make_transfer_tx(value)
+        out_of_step_tx['params']['stepLimit'] = 1
+        to_treasury_tx = self._make_transfer_tx(value)
+        to_treasury_tx['params']['to'] = self._treasury_address
+        txs = [
+            self._make_transfer_tx(value),
+            self._make_v2_transfer_tx(self._genesis_address, to, value),
+            out_of_step_tx,
+            # The treasury is read in the middle of the block
+            to_treasury_tx,
+            self._make_v2_transfer_tx(self._treasury_address, to, value // 2),
+            self._make_transfer_tx(value)
+        ]
+        block = Block(2, create_block_hash(), 0, block.hash)
+        results = self._invoke_and_rollback(block, txs)
+        self.assertEqual([1, 1, 0, 1, 1, 1], [tx_result['status'] for tx_result in results[0]])
+
+        def charge_fee(icx_engine, context, from_, fee):
+            icx_engine._transfer(context, from_, icx_engine.fee_treasury_address, fee)
+
+        with patch.object(IcxEngine, 'charge_fee', charge_fee), patch.object(IcxEngine, 'add_fee'):
+            self.assertEqual(results, self._invoke_and_rollback(block, txs))
+
+        treasury_balance = self._engine._icx_engine.get_balance(None, self._treasury_address)
+        tx_results, _ = self._engine.invoke(block, txs)
+        self._engine.commit(block)
+        fee = sum(tx_result.step_used * tx_result.step_price for tx_result in tx_results[:4] + tx_results[5:])
+        self.assertEqual(treasury_balance + value - value // 2 + fee,
+                         self._engine._icx_engine.get_balance(None, self._treasury_address))
+
+    def test_governance_snapshot(self):
+        """Governance parameters are read again only after a governance tx succeeds
+        """
+        owner = Address.from_string(self._conf[ConfigKey.BUILTIN_SCORE_OWNER])
+        score_address = create_address(AddressPrefix.CONTRACT)
+        blacklist_tx = self._make_transfer_tx(0)
+        blacklist_tx['params'].update({
+            'from': owner,
+            'to': GOVERNANCE_SCORE_ADDRESS,
+            'stepLimit': 10 ** 8,
+            'dataType': 'call',
+            'data': {'method': 'addToScoreBlackList', 'params': {'address': str(score_address)}}})
+        txs = [self._make_transfer_tx(1), blacklist_tx, self._make_transfer_tx(1)]
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+
+        def invoke(context, icon_score_address, data_type, data):
+            governance = IconScoreContextUtil.get_icon_score(context, icon_score_address)
+            governance._score_black_list.put(score_address)
+
+        committed_snapshot = self._engine._governance_snapshot
+        with patch.object(GovernanceSnapshot, 'from_context', side_effect=GovernanceSnapshot.from_context) as \
+                from_context, patch.object(IconScoreEngine, 'invoke', side_effect=invoke):
+            tx_results, _ = self._engine.invoke(block, txs)
+            self.assertEqual([1, 1, 1], [tx_result.status for tx_result in tx_results])
+            self.assertEqual(1, from_context.call_count)
+
+            snapshot = self._engine._precommit_data_manager.get(block.hash).governance_snapshot
+            self.assertTrue(snapshot.is_in_score_black_list(score_address))
+            self.assertFalse(committed_snapshot.is_in_score_black_list(score_address))
+
+            # The snapshot of the block is taken over on commit
+            self._engine.commit(block)
+            self.assertEqual(1, from_context.call_count)
+            self.assertIs(snapshot, self._engine._governance_snapshot)
+
+        context = IconScoreContext(IconScoreContextType.QUERY)
+        self._engine._pin_committed_snapshot(context)
+        self.assertTrue(IconScoreContextUtil.is_in_score_blacklist(context, score_address))
+        self.assertRaises(ServerErrorException, self._engine._validate_score_blacklist, context, {'to': score_address})
+
+    def test_governance_snapshot_step_used(self):
+        """The address lists are read from the snapshot without GET steps only from REVISION_4
+        """
+        score_addresses = [create_address(AddressPrefix.CONTRACT) for _ in range(3)]
+
+        def invoke(context, icon_score_address, data_type, data):
+            governance = IconScoreContextUtil.get_icon_score(context, icon_score_address)
+            for score_address in score_addresses:
+                governance._score_black_list.put(score_address)
+
+        tx = self._make_transfer_tx(0)
+        tx['params'].update({
+            'from': Address.from_string(self._conf[ConfigKey.BUILTIN_SCORE_OWNER]),
+            'to': GOVERNANCE_SCORE_ADDRESS,
+            'stepLimit': 10 ** 8,
+            'dataType': 'call',
+            'data': {'method': 'addToScoreBlackList', 'params': {}}})
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        with patch.object(IconScoreEngine, 'invoke', side_effect=invoke):
+            tx_results, _ = self._engine.invoke(block, [tx])
+        self.assertEqual(1, tx_results[0].status)
+        self._engine.commit(block)
+
+        def get_step_used(snapshot, revision: int) -> int:
+            context = IconScoreContext(IconScoreContextType.QUERY)
+            self._engine._pin_committed_snapshot(context)
+            context.governance_snapshot = snapshot
+            context.revision = revision
+            context.step_counter = IconScoreStepCounter(0, {StepType.GET: 25}, 10 ** 8)
+            context.step_counter.reset(10 ** 8)
+
+            # The blacklist check of a SCORE call
+            self._engine._push_context(context)
+            try:
+                self.assertFalse(
+                    IconScoreContextUtil.is_in_score_blacklist(context, create_address(AddressPrefix.CONTRACT)))
+            finally:
+                self._engine._pop_context()
+            return context.step_counter.step_used
+
+        snapshot = self._engine._governance_snapshot
+        self.assertTrue(snapshot.is_in_score_black_list(score_addresses[0]))
+
+        step_used = get_step_used(None, 0)
+        self.assertTrue(step_used > 0)
+        self.assertEqual(step_used, get_step_used(snapshot, 0))
+        self.assertEqual(step_used, get_step_used(snapshot, REVISION_4 - 1))
+        self.assertEqual(0, get_step_used(snapshot, REVISION_4))
+
+        # The governance SCORE without the lists is read on demand
+        snapshot = GovernanceSnapshot(0, 0, None, None, 0, {}, {})
+        self.assertFalse(snapshot.has_address_lists)
+        self.assertEqual(step_used, get_step_used(snapshot, REVISION_4))
+
+    def test_governance_snapshot_without_address_lists(self):
+        """The address lists are read on demand with the governance SCORE which does not provide them
+        """
+        context = IconScoreContext(IconScoreContextType.QUERY)
+        self._engine._pin_committed_snapshot(context)
+        self.assertTrue(GovernanceSnapshot.from_context(context).has_address_lists)
+
+        self._engine._push_context(context)
+        try:
+            governance_class = type(IconScoreContextUtil.get_icon_score(context, GOVERNANCE_SCORE_ADDRESS))
+        finally:
+            self._engine._pop_context()
+
+        with patch.object(governance_class, 'deployers', new_callable=PropertyMock, side_effect=AttributeError):
+            self.assertFalse(GovernanceSnapshot.from_context(context).has_address_lists)
+        with patch.object(governance_class, 'score_black_list', new_callable=PropertyMock, return_value=[]):
+            self.assertFalse(GovernanceSnapshot.from_context(context).has_address_lists)
+
+    def test_reuse_checkpoints(self):
+        value = 1 * 10 ** 18
+        call_tx = self._make_transfer_tx(0)
+        call_tx['params'].update({'to': GOVERNANCE_SCORE_ADDRESS, 'dataType': 'call', 'data': {'method': 'getRevision'}})
+        txs = [self._make_transfer_tx(value), self._make_transfer_tx(value), call_tx]
+
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        tx_results0, state_root_hash0 = self._engine.invoke(block, txs)
+        self._engine.rollback(block)
+
+        invoke_request = self._engine._invoke_request = Mock(wraps=self._engine._invoke_request)
+
+        # The same parent and timestamp: all txs are reused
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        tx_results, state_root_hash = self._engine.invoke(block, txs + [self._make_transfer_tx(value)])
+        self.assertEqual(1, invoke_request.call_count)
+        self.assertEqual(block.hash, tx_results[0].block_hash)
+        self.assertEqual([tx_result.step_used for tx_result in tx_results0],
+                         [tx_result.step_used for tx_result in tx_results[:3]])
+        self.assertEqual(sum(tx_result.step_used for tx_result in tx_results), tx_results[-1].cumulative_step_used)
+        self.assertNotEqual(state_root_hash0, state_root_hash)
+        self._engine.rollback(block)
+
+        # A different timestamp: the reuse stops at the SCORE call
+        invoke_request.reset_mock()
+        block = Block(1, create_block_hash(), 1, self.genesis_block.hash)
+        tx_results, state_root_hash = self._engine.invoke(block, txs)
+        self.assertEqual(1, invoke_request.call_count)
+        self.assertEqual(state_root_hash0, state_root_hash)
+
+        self._engine.commit(block)
+        self.assertEqual(value * 2, self._engine.query('icx_getBalance', {'address': self._to}))
+        self.assertEqual([], self._engine._precommit_data_manager.find_checkpoints(block, [txs[0]['params']['txHash']]))
+
+    def test_reuse_checkpoints_with_fee(self):
+        """The fees which a reused tx has deposited to the treasury are not deposited again
+        """
+        value = 1 * 10 ** 18
+        self._engine._step_counter_factory.set_step_price(10 ** 10)
+        to_treasury_tx = self._make_transfer_tx(value)
+        to_treasury_tx['params']['to'] = self._treasury_address
+        txs = [self._make_transfer_tx(value), self._make_transfer_tx(value), to_treasury_tx]
+
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        expected = self._invoke_and_rollback(block, txs)
+
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        self._engine.invoke(block, txs)
+        self._engine.rollback(block)
+
+        invoke_request = self._engine._invoke_request = Mock(wraps=self._engine._invoke_request)
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        actual = self._invoke_and_rollback(block, txs)
+        invoke_request.assert_not_called()
+        self.assertEqual(expected[1:], actual[1:])
+
+    def _invoke_chained_blocks(self, value: int) -> list:
+        """Invokes 2 blocks transferring value without committing the first one
+        """
+        blocks = []
+        prev_hash = self.genesis_block.hash
+        for height in (1, 2):
+            block = Block(height, create_block_hash(), 0, prev_hash)
+            tx_results, _ = self._engine.invoke(block, [self._make_transfer_tx(value)])
+            self.assertEqual(TransactionResult.SUCCESS, tx_results[0].status)
+
+            blocks.append(block)
+            prev_hash = block.hash
+
+        return blocks
+
+    def test_invoke_on_uncommitted_block(self):
+        value = 1 * 10 ** 18
+        block1, block2 = self._invoke_chained_blocks(value)
+
+        # A block whose parent is neither committed nor invoked
+        block = Block(3, create_block_hash(), 0, create_block_hash())
+        self.assertRaises(ServerErrorException, self._engine.invoke, block, [])
+        # The child can not be committed before its parent
+        self.assertRaises(ServerErrorException, self._engine.commit, block2)
+
+        sibling = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        self._engine.invoke(sibling, [])
+
+        self._engine.commit(block1)
+        self.assertEqual(value, self._engine.query('icx_getBalance', {'address': self._to}))
+        # The other branches are pruned on commit
+        self.assertIsNone(self._engine._precommit_data_manager.get(sibling.hash))
+
+        self._engine.commit(block2)
+        self.assertEqual(value * 2, self._engine.query('icx_getBalance', {'address': self._to}))
+        self.assertEqual(block2.hash, self._engine._icx_storage.last_block.hash)
+
+    def test_rollback_uncommitted_ancestor(self):
+        block1, block2 = self._invoke_chained_blocks(1 * 10 ** 18)
+
+        # The descendants are thrown away with the block
+        self._engine.rollback(block1)
+        self.assertIsNone(self._engine._precommit_data_manager.get(block1.hash))
+        self.assertIsNone(self._engine._precommit_data_manager.get(block2.hash))
+        self.assertRaises(ServerErrorException, self._engine.rollback, block2)
+        self.assertEqual(0, self._engine.query('icx_getBalance', {'address': self._to}))
+
     def test_invoke_v2_with_malformed_to_address_and_type_converter(self):
         to = ''
         to_address = MalformedAddress.from_string(to)
@@ -850,5 +1232,215 @@ class TestIconServiceEngine(unittest.TestCase):
             self.assertEqual(0, balance)
 
 
+class TestIconServiceEngineMultipleDB(TestIconServiceEngine):
+    """Runs the same tests with ICX, deploy storage and SCORE states in separate dbs
+    """
+    CONF = {ConfigKey.MULTIPLE_DB: True, ConfigKey.SCORE_DB_SHARD_COUNT: 2}
+
+
+class TestIconServiceEngineStateTree(TestIconServiceEngine):
+    """Runs the same tests with the state tree
+    """
+    CONF = {ConfigKey.STATE_TREE: {ConfigKey.STATE_TREE_ENABLED: True}}
+
+    def test_get_state_proof(self):
+        value = 1 * 10 ** 18
+        tx = {
+            'method': 'icx_sendTransaction',
+            'params': {
+                'version': 3,
+                'from': self._genesis_address,
+                'to': self._to,
+                'value': value,
+                'stepLimit': 1000000,
+                'timestamp': 1234567890,
+                'txHash': create_tx_hash()
+            }
+        }
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        self._engine.invoke(block, [tx])
+        self._engine.commit(block)
+
+        proof = self._engine.get_state_proof(self._to.to_bytes())
+        self.assertEqual(1, proof['blockHeight'])
+        self.assertIsNotNone(proof['value'])
+        self.assertTrue(verify_proof(proof['root'], self._to.to_bytes(), proof['value'], proof))
+        self.assertFalse(verify_proof(proof['root'], self._to.to_bytes(), None, proof))
+
+        absent = create_address(AddressPrefix.EOA).to_bytes()
+        proof = self._engine.get_state_proof(absent)
+        self.assertIsNone(proof['value'])
+        self.assertTrue(verify_proof(proof['root'], absent, None, proof))
+
+        # The tree updated block by block is the same as the one built from all states at once
+        state_tree = self._engine._state_tree
+        states = {
+            key: value for key, value in ContextDatabaseFactory.iterate_states() if state_tree.is_tree_key(key)}
+        root_hash, _ = state_tree.update(EMPTY_HASH, states)
+        self.assertEqual(state_tree.get_root_hash(), root_hash)
+
+    def test_chained_state_tree(self):
+        for block in self._invoke_chained_blocks(1 * 10 ** 18):
+            self._engine.commit(block)
+
+        # The tree of block2 is updated on top of the uncommitted nodes of block1
+        state_tree = self._engine._state_tree
+        states = {
+            key: value for key, value in ContextDatabaseFactory.iterate_states() if state_tree.is_tree_key(key)}
+        root_hash, _ = state_tree.update(EMPTY_HASH, states)
+        self.assertEqual(state_tree.get_root_hash(), root_hash)
+        self.assertIsNotNone(state_tree.get_proof(self._to.to_bytes()))
+
+
+class TestIconServiceEnginePersistPrecommit(TestIconServiceEngine):
+    """Runs the same tests with precommit data persisted
+    """
+    CONF = {ConfigKey.PRECOMMIT: {ConfigKey.PRECOMMIT_PERSIST: True}}
+
+    def _restart(self):
+        self._engine.close()
+        self._engine = IconServiceEngine()
+        self._engine.open(self._conf)
+
+    def test_restore_precommit_data(self):
+        value = 1 * 10 ** 18
+        block1, block2 = self._invoke_chained_blocks(value)
+        precommit_data = self._engine._precommit_data_manager.get(block2.hash)
+        block_result = precommit_data.block_result
+
+        self._restart()
+
+        # The results are restored instead of invoking the block again
+        self._engine._invoke_request = Mock()
+        tx_results, state_root_hash = self._engine.invoke(block2, [])
+        self._engine._invoke_request.assert_not_called()
+        self.assertEqual(precommit_data.state_root_hash, state_root_hash)
+        self.assertEqual([tx_result.tx_hash for tx_result in block_result],
+                         [tx_result.tx_hash for tx_result in tx_results])
+
+        # The committed block is not restored
+        self._engine.commit(block1)
+        self._restart()
+        self.assertIsNone(self._engine._precommit_data_manager.get(block1.hash))
+        self.assertIsNotNone(self._engine._precommit_data_manager.get(block2.hash))
+
+        self._engine.commit(block2)
+        self.assertEqual(value * 2, self._engine.query('icx_getBalance', {'address': self._to}))
+
+        # Rolled back blocks are not restored
+        block = Block(3, create_block_hash(), 0, block2.hash)
+        self._engine.invoke(block, [self._make_transfer_tx(value)])
+        self._engine.rollback(block)
+        self._restart()
+        self.assertTrue(self._engine._precommit_data_manager.empty())
+
+
+class TestIconServiceEngineParallelInvoke(TestIconServiceEngine):
+    """Runs the same tests with the txs of a block executed in parallel
+    """
+    CONF = {ConfigKey.INVOKE_THREAD_COUNT: 4}
+
+    def test_parallel_invoke(self):
+        value = 10 ** 18
+        accounts = [create_address(AddressPrefix.EOA) for _ in range(6)]
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        self._engine.invoke(block, [self._make_v2_transfer_tx(self._genesis_address, to, value) for to in accounts])
+        self._engine.commit(block)
+
+        governance_tx = self._make_transfer_tx(0)
+        governance_tx['params'].update(
+            {'to': GOVERNANCE_SCORE_ADDRESS, 'dataType': 'call', 'data': {'method': 'getRevision'}})
+        txs = [
+            self._make_v2_transfer_tx(accounts[0], accounts[1], value // 2),
+            # It reads the balance of accounts[1] written by the tx above
+            self._make_v2_transfer_tx(accounts[1], accounts[2], value // 4),
+            self._make_v2_transfer_tx(accounts[3], create_address(AddressPrefix.EOA), value // 4),
+            governance_tx,
+            self._make_v2_transfer_tx(accounts[4], accounts[5], value // 8),
+            self._make_v2_transfer_tx(accounts[5], accounts[3], value // 8),
+            # Out of balance with the committed states
+            self._make_v2_transfer_tx(accounts[2], accounts[0], value * 2),
+        ]
+        block = Block(2, create_block_hash(), 0, block.hash)
+
+        invoke_request = self._engine._invoke_request = Mock(wraps=self._engine._invoke_request)
+        parallel = self._invoke_and_rollback(block, txs)
+        serial_calls = [call for call in invoke_request.call_args_list if call[0][0].tx_batch.read_keys is None]
+        self.assertEqual([1, 3, 5], [call[0][2] for call in serial_calls])
+
+        parallel_invoker, self._engine._parallel_invoker = self._engine._parallel_invoker, None
+        try:
+            self.assertEqual(self._invoke_and_rollback(block, txs), parallel)
+        finally:
+            self._engine._parallel_invoker = parallel_invoker
+
+    def test_speculative_score_mapper(self):
+        """A tx which puts a SCORE is invoked again instead of changing the SCOREs of the block
+        """
+        score_address = create_address(AddressPrefix.CONTRACT)
+        invoke_request = self._engine._invoke_request
+
+        def put_score(context, tx_request, index):
+            if index == 1 and context.tx_batch.read_keys is not None:
+                # Such as a deploy through an internal call to the governance SCORE
+                context.new_icon_score_mapper.put_score_info(score_address, Mock(spec=IconScoreBase), create_tx_hash())
+            return invoke_request(context, tx_request, index)
+
+        value = 10 ** 18
+        accounts = [create_address(AddressPrefix.EOA) for _ in range(3)]
+        block = Block(1, create_block_hash(), 0, self.genesis_block.hash)
+        self._engine.invoke(block, [self._make_v2_transfer_tx(self._genesis_address, to, value) for to in accounts])
+        self._engine.commit(block)
+
+        txs = [self._make_v2_transfer_tx(from_, create_address(AddressPrefix.EOA), value // 2) for from_ in accounts]
+        block = Block(2, create_block_hash(), 0, block.hash)
+        with patch.object(self._engine, '_invoke_request', side_effect=put_score) as mocked:
+            parallel = self._invoke_and_rollback(block, txs)
+
+        serial_calls = [call for call in mocked.call_args_list if call[0][0].tx_batch.read_keys is None]
+        self.assertEqual([1], [call[0][2] for call in serial_calls])
+        self.assertNotIn(score_address, serial_calls[0][0][0].new_icon_score_mapper)
+
+        parallel_invoker, self._engine._parallel_invoker = self._engine._parallel_invoker, None
+        try:
+            self.assertEqual(self._invoke_and_rollback(block, txs), parallel)
+        finally:
+            self._engine._parallel_invoker = parallel_invoker
+
+
+class TestIconServiceEngineReverseDiff(TestIconServiceEngine):
+    """Runs the same tests with the reverse diffs of committed blocks recorded
+    """
+    CONF = {ConfigKey.REVERSE_DIFF_BLOCKS: 2}
+
+    def test_revert_block(self):
+        value = 1 * 10 ** 18
+        block1, block2 = self._invoke_chained_blocks(value)
+        self._engine.commit(block1)
+        self._engine.commit(block2)
+        self.assertEqual(value * 2, self._engine.query('icx_getBalance', {'address': self._to}))
+
+        # A candidate block on top of the reverted one is thrown away
+        block = Block(3, create_block_hash(), 0, block2.hash)
+        self._engine.invoke(block, [self._make_transfer_tx(value)])
+
+        self.assertEqual(block1.hash, self._engine.revert_block().hash)
+        self.assertEqual(value, self._engine.query('icx_getBalance', {'address': self._to}))
+        self.assertTrue(self._engine._precommit_data_manager.empty())
+
+        # Another block is committed in place of the reverted one
+        block = Block(2, create_block_hash(), 0, block1.hash)
+        self._engine.invoke(block, [self._make_transfer_tx(value * 3)])
+        self._engine.commit(block)
+        self.assertEqual(value * 4, self._engine.query('icx_getBalance', {'address': self._to}))
+
+        self.assertEqual(block1.hash, self._engine.revert_block().hash)
+        self.assertEqual(self.genesis_block.hash, self._engine.revert_block().hash)
+        self.assertEqual(0, self._engine.query('icx_getBalance', {'address': self._to}))
+
+        # The genesis block is not recorded
+        self.assertRaises(DatabaseException, self._engine.revert_block)
+
+
 if __name__ == '__main__':
     unittest.main()
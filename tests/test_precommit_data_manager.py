@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from iconservice.base.address import AddressPrefix
+from iconservice.base.block import Block
+from iconservice.base.exception import ExceptionCode
+from iconservice.base.transaction import Transaction
+from iconservice.database.batch import BlockBatch
+from iconservice.iconscore.icon_score_result import TransactionResult
+from iconservice.precommit_data_manager import PrecommitData, PrecommitDataManager
+from tests import create_address, create_block_hash, create_tx_hash, rmtree
+
+
+class TestPrecommitDataManager(unittest.TestCase):
+    def setUp(self):
+        self.spill_path = 'precommit_spill'
+        rmtree(self.spill_path)
+
+        self.last_block = Block(0, create_block_hash(), 0, None)
+        self.manager = PrecommitDataManager()
+        self.manager.last_block = self.last_block
+        # Room for 2 blocks
+        self.manager.open_spill_store(2500, self.spill_path)
+
+    def tearDown(self):
+        self.manager.close_spill_store()
+        rmtree(self.spill_path)
+
+    def _push(self, height: int, prev_hash: bytes, parent: PrecommitData = None) -> PrecommitData:
+        block = Block(height, create_block_hash(), 0, prev_hash)
+        block_batch = BlockBatch(block, None if parent is None else parent.block_batch)
+        for _ in range(10):
+            block_batch[os.urandom(32)] = os.urandom(68)
+
+        tx_result = TransactionResult(Transaction(create_tx_hash()), block, create_address(AddressPrefix.EOA))
+        tx_result.failure = TransactionResult.Failure(ExceptionCode.SERVER_ERROR, 'error')
+
+        precommit_data = PrecommitData(block_batch, [tx_result], parent=parent)
+        self.manager.push(precommit_data)
+        return precommit_data
+
+    def test_spill(self):
+        candidates = [self._push(1, self.last_block.hash) for _ in range(3)]
+
+        # The oldest one is spilled
+        self.assertTrue(candidates[0].spilled)
+        self.assertIsNone(candidates[0].block_batch)
+        stats = self.manager.get_stats()
+        self.assertEqual(1, stats['spilledCount'])
+        self.assertTrue(stats['spilledBytes'] > 0)
+        self.assertTrue(stats['memoryBytes'] <= 2500)
+
+        # It is loaded as it was on access
+        states = dict(candidates[2].block_batch)
+        precommit_data = self.manager.get(candidates[0].block.hash)
+        self.assertFalse(precommit_data.spilled)
+        self.assertEqual(precommit_data.state_root_hash, precommit_data.block_batch.digest())
+        self.assertEqual('error', precommit_data.block_result[0].failure.message)
+        self.assertEqual(1, self.manager.get_stats()['reloadCount'])
+
+        # Another one has been spilled instead and its file is removed on rollback
+        self.assertTrue(candidates[1].spilled)
+        self.assertEqual(states, dict(candidates[2].block_batch))
+        self.manager.rollback(candidates[1].block)
+        self.assertEqual(0, self.manager.get_stats()['spilledCount'])
+        self.assertEqual([], os.listdir(self.spill_path))
+
+        self.manager.commit(candidates[0].block)
+        stats = self.manager.get_stats()
+        self.assertEqual(0, stats['count'])
+        self.assertEqual(0, stats['memoryBytes'])
+
+    def test_parent_not_spilled(self):
+        parent = self._push(1, self.last_block.hash)
+        child = self._push(2, parent.block.hash, parent)
+        self._push(1, self.last_block.hash)
+
+        # The parent is read by its child
+        self.assertFalse(parent.spilled)
+        self.assertTrue(child.spilled)
+
+        # The child is loaded on top of the parent
+        self.assertIs(child, self.manager.get(child.block.hash))
+        self.assertIs(parent.block_batch, child.block_batch.parent)
+
+    def test_store(self):
+        store_path = os.path.join(self.spill_path, 'store')
+        self.manager.open_store(store_path, lambda scores: None)
+        parent = self._push(1, self.last_block.hash)
+        child = self._push(2, parent.block.hash, parent)
+        orphan = self._push(2, create_block_hash(), None)
+
+        manager = PrecommitDataManager()
+        manager.last_block = self.last_block
+        self.assertEqual(2, manager.open_store(store_path, lambda scores: None))
+        self.assertEqual(parent.state_root_hash, manager.get(parent.block.hash).state_root_hash)
+        self.assertIs(manager.get(parent.block.hash), manager.get(child.block.hash).parent)
+        self.assertIsNone(manager.get(orphan.block.hash))
+
+        # A block whose SCOREs can not be loaded is dropped with its descendants
+        def load_score_mapper(scores: list):
+            raise Exception(scores)
+
+        manager = PrecommitDataManager()
+        manager.last_block = self.last_block
+        self.assertEqual(0, manager.open_store(store_path, load_score_mapper))
+        self.assertEqual([], os.listdir(store_path))
+
+        # A corrupted block is dropped
+        corrupted = self._push(1, self.last_block.hash)
+        file_path = os.path.join(store_path, corrupted.block.hash.hex())
+        with open(file_path, 'rb') as f:
+            data = bytearray(f.read())
+        data[-1] ^= 0xff
+        with open(file_path, 'wb') as f:
+            f.write(data)
+
+        manager = PrecommitDataManager()
+        manager.last_block = self.last_block
+        self.assertEqual(0, manager.open_store(store_path, lambda scores: None))
+        self.assertEqual([], os.listdir(store_path))
+
+    def test_no_budget(self):
+        self.manager.open_spill_store(0)
+        for _ in range(10):
+            self.assertFalse(self._push(1, self.last_block.hash).spilled)
+        self.assertEqual(0, self.manager.get_stats()['memoryBudget'])
+
+
+if __name__ == '__main__':
+    unittest.main()
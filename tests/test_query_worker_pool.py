@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import unittest
+
+from iconservice.query_worker_pool import QueryWorkerPool
+
+
+class TestQueryWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = QueryWorkerPool(3)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_queries_run_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def query():
+            # Every query waits for the others, so it passes only if they run at once
+            barrier.wait()
+            return threading.current_thread().name
+
+        futures = [self.pool.submit(query) for _ in range(3)]
+        names = {future.result(timeout=5) for future in futures}
+        self.assertEqual(3, len(names))
+
+    def test_queue_depths(self):
+        event = threading.Event()
+
+        futures = [self.pool.submit(event.wait, 5) for _ in range(5)]
+        self.assertEqual([2, 2, 1], self.pool.queue_depths)
+
+        event.set()
+        # Waits for the done callbacks as well as the queries
+        self.pool.shutdown()
+        self.assertEqual([0, 0, 0], self.pool.queue_depths)
+
+    def test_exception(self):
+        def query():
+            raise ZeroDivisionError()
+
+        future = self.pool.submit(query)
+        self.assertRaises(ZeroDivisionError, future.result, 5)
+        self.pool.shutdown()
+        self.assertEqual([0, 0, 0], self.pool.queue_depths)
+
+    def test_invalid_max_workers(self):
+        self.assertRaises(ValueError, QueryWorkerPool, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Replays the same block workload against each storage backend
+
+usage: python -m tools.benchmark_db_backend [-b BLOCKS] [-t TXS] [-a ACCOUNTS] [backend ...]
+
+Each block runs transfer-like transactions on ContextDatabase:
+2 reads and 2 writes per tx through TransactionBatch and BlockBatch,
+then the block is committed with write_batch() and a snapshot is taken for queries.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from iconservice.database.backend import BackendType
+from iconservice.database.batch import BlockBatch, TransactionBatch
+from iconservice.database.db import ContextDatabase
+from iconservice.iconscore.icon_score_context import IconScoreContext, IconScoreContextType
+
+ALL_BACKENDS = [BackendType.LEVELDB, BackendType.MEMORY, BackendType.SQLITE]
+
+
+def _make_key(index: int) -> bytes:
+    # The same size as an EOA address
+    return b'\x00' + index.to_bytes(20, 'big')
+
+
+def run(backend: str, blocks: int, txs: int, accounts: int, seed: int) -> dict:
+    rand = random.Random(seed)
+    root_path = tempfile.mkdtemp(prefix=f'benchmark_{backend}_')
+    elapsed = {'genesis': 0.0, 'invoke': 0.0, 'commit': 0.0, 'query': 0.0}
+
+    try:
+        db = ContextDatabase.from_path(os.path.join(root_path, 'db'), backend=backend)
+
+        start = time.perf_counter()
+        db.write_batch(None, {_make_key(i): os.urandom(36) for i in range(accounts)})
+        elapsed['genesis'] += time.perf_counter() - start
+
+        for _ in range(blocks):
+            context = IconScoreContext(IconScoreContextType.INVOKE)
+            context.block_batch = BlockBatch()
+
+            start = time.perf_counter()
+            for _ in range(txs):
+                context.tx_batch = TransactionBatch()
+                for key in (_make_key(rand.randrange(accounts)), _make_key(rand.randrange(accounts))):
+                    value = db.get(context, key)
+                    db.put(context, key, value[::-1])
+                context.block_batch.update(context.tx_batch)
+            elapsed['invoke'] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            db.write_batch(context, context.block_batch)
+            snapshot = db.take_snapshot()
+            elapsed['commit'] += time.perf_counter() - start
+
+            query_context = IconScoreContext(IconScoreContextType.QUERY)
+            query_context.db_snapshots = {db: snapshot}
+
+            start = time.perf_counter()
+            for _ in range(txs):
+                db.get(query_context, _make_key(rand.randrange(accounts)))
+            elapsed['query'] += time.perf_counter() - start
+
+        db.close(None)
+    finally:
+        shutil.rmtree(root_path, ignore_errors=True)
+
+    elapsed['total'] = sum(elapsed.values())
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Storage backend benchmark')
+    parser.add_argument('backends', nargs='*', help=f'backends to run. default: {" ".join(ALL_BACKENDS)}')
+    parser.add_argument('-b', '--blocks', type=int, default=200, help='the number of blocks')
+    parser.add_argument('-t', '--txs', type=int, default=500, help='the number of txs in a block')
+    parser.add_argument('-a', '--accounts', type=int, default=100_000, help='the number of accounts')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='random seed of the workload')
+    args = parser.parse_args()
+
+    backends = args.backends or ALL_BACKENDS
+    for backend in backends:
+        if backend not in ALL_BACKENDS:
+            parser.error(f'invalid backend: {backend}')
+
+    print(f'blocks: {args.blocks}, txs/block: {args.txs}, accounts: {args.accounts}')
+    print(f'{"backend":<10}{"genesis":>10}{"invoke":>10}{"commit":>10}{"query":>10}{"total":>10}{"tps":>10}')
+
+    for backend in backends:
+        elapsed = run(backend, args.blocks, args.txs, args.accounts, args.seed)
+        tps = args.blocks * args.txs / (elapsed['invoke'] + elapsed['commit'])
+        print(f'{backend:<10}'
+              f'{elapsed["genesis"]:>10.3f}{elapsed["invoke"]:>10.3f}{elapsed["commit"]:>10.3f}'
+              f'{elapsed["query"]:>10.3f}{elapsed["total"]:>10.3f}{tps:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
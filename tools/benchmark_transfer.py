@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2018 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Invokes blocks of plain icx transfers with and without the transfer fast path
+
+usage: python -m tools.benchmark_transfer [-b BLOCKS] [-t TXS] [-a ACCOUNTS]
+
+The same blocks are invoked and committed by IconServiceEngine in each mode.
+The generic mode sends every transfer through the icx_sendTransaction handler.
+"""
+
+import argparse
+import copy
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from iconcommons.icon_config import IconConfig
+
+from iconservice.base.address import Address, AddressPrefix
+from iconservice.base.block import Block
+from iconservice.icon_config import default_icon_config
+from iconservice.icon_constant import ConfigKey
+from iconservice.icon_service_engine import IconServiceEngine
+
+MODES = ['generic', 'fast']
+
+
+def _make_address(index: int) -> 'Address':
+    return Address(AddressPrefix.EOA, index.to_bytes(20, 'big'))
+
+
+def _make_blocks(blocks: int, txs: int, accounts: int, seed: int) -> list:
+    rand = random.Random(seed)
+    prev_hash = os.urandom(32)
+    result = [(Block(0, prev_hash, 0, None), None)]
+
+    for height in range(1, blocks + 1):
+        tx_requests = []
+        for _ in range(txs):
+            params = {
+                'version': 3,
+                'from': _make_address(rand.randrange(accounts)),
+                'to': _make_address(rand.randrange(accounts)),
+                'value': rand.randrange(1, 10 ** 18),
+                'stepLimit': 1_000_000,
+                'timestamp': height,
+                'nonce': rand.getrandbits(32),
+                'txHash': rand.getrandbits(256).to_bytes(32, 'big')
+            }
+            tx_requests.append({'method': 'icx_sendTransaction', 'params': params})
+
+        block = Block(height, rand.getrandbits(256).to_bytes(32, 'big'), height, prev_hash)
+        result.append((block, tx_requests))
+        prev_hash = block.hash
+
+    return result
+
+
+def run(mode: str, blocks: list, accounts: int) -> dict:
+    root_path = tempfile.mkdtemp(prefix=f'benchmark_{mode}_')
+    elapsed = {'invoke': 0.0, 'commit': 0.0}
+
+    conf = IconConfig('', copy.deepcopy(default_icon_config))
+    conf.update_conf({
+        ConfigKey.BUILTIN_SCORE_OWNER: str(_make_address(accounts)),
+        ConfigKey.SCORE_ROOT_PATH: os.path.join(root_path, 'score'),
+        ConfigKey.STATE_DB_ROOT_PATH: os.path.join(root_path, 'statedb')
+    })
+
+    engine = IconServiceEngine()
+    engine.open(conf)
+    try:
+        genesis, _ = blocks[0]
+        balance = 10 ** 27
+        genesis_accounts = [
+            {'name': 'god', 'address': _make_address(accounts), 'balance': balance},
+            {'name': 'treasury', 'address': _make_address(accounts + 1), 'balance': 0}]
+        genesis_accounts += [
+            {'name': f'account{i}', 'address': _make_address(i), 'balance': balance} for i in range(accounts)]
+        engine.invoke(genesis, [{'method': '', 'params': {'txHash': os.urandom(32)},
+                                 'genesisData': {'accounts': genesis_accounts}}])
+        engine.commit(genesis)
+
+        with ExitStack() as stack:
+            if mode == 'generic':
+                stack.enter_context(patch.object(IconServiceEngine, '_is_plain_transfer', return_value=False))
+
+            for block, tx_requests in blocks[1:]:
+                start = time.perf_counter()
+                engine.invoke(block, tx_requests)
+                elapsed['invoke'] += time.perf_counter() - start
+
+                start = time.perf_counter()
+                engine.commit(block)
+                elapsed['commit'] += time.perf_counter() - start
+    finally:
+        engine.close()
+        shutil.rmtree(root_path, ignore_errors=True)
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Transfer fast path benchmark')
+    parser.add_argument('-b', '--blocks', type=int, default=20, help='the number of blocks')
+    parser.add_argument('-t', '--txs', type=int, default=1000, help='the number of txs in a block')
+    parser.add_argument('-a', '--accounts', type=int, default=10_000, help='the number of accounts')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='random seed of the workload')
+    args = parser.parse_args()
+
+    blocks = _make_blocks(args.blocks, args.txs, args.accounts, args.seed)
+
+    print(f'blocks: {args.blocks}, txs/block: {args.txs}, accounts: {args.accounts}')
+    print(f'{"mode":<10}{"invoke":>10}{"commit":>10}{"tps":>10}')
+
+    for mode in MODES:
+        elapsed = run(mode, blocks, args.accounts)
+        tps = args.blocks * args.txs / elapsed['invoke']
+        print(f'{mode:<10}{elapsed["invoke"]:>10.3f}{elapsed["commit"]:>10.3f}{tps:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()